@@ -551,6 +551,36 @@ class GalvoController:
             )
             self._active_index += 12
 
+    def _list_write_records(self, records):
+        """
+        Writes list records in bulk, filling and sending list packets as they are completed.
+
+        @param records: structured array of list records, see listcompiler.list_record
+        @return:
+        """
+        data = records.tobytes()
+        length = len(data)
+        position = 0
+        with self._list_lock:
+            while position < length:
+                if self._active_index >= 0xC00:
+                    self._list_end()
+                if self._active_list is None:
+                    self._list_new()
+                index = self._active_index
+                count = min(0xC00 - index, length - position)
+                self._active_list[index : index + count] = data[
+                    position : position + count
+                ]
+                self._active_index += count
+                position += count
+            commands = records["command"]
+            moves = ((commands == listJumpTo) | (commands == listMarkTo)).nonzero()[0]
+            if len(moves):
+                last = records[moves[-1]]
+                self._last_x = int(last["v1"])
+                self._last_y = int(last["v2"])
+
     def _command(self, command, v1=0, v2=0, v3=0, v4=0, v5=0, read=True):
         cmd = struct.pack(
             "<6H", int(command), int(v1), int(v2), int(v3), int(v4), int(v5)
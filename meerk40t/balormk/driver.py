@@ -7,6 +7,7 @@ driver.
 import time
 
 from meerk40t.balormk.controller import GalvoController
+from meerk40t.balormk.listcompiler import RECORDS_PER_PACKET, ListCompiler, list_moves
 from meerk40t.core.cutcode.cubiccut import CubicCut
 from meerk40t.core.cutcode.dwellcut import DwellCut
 from meerk40t.core.cutcode.gotocut import GotoCut
@@ -150,112 +151,20 @@ class BalorDriver:
         con._goto_speed = None
         con.program_mode()
         self._list_bits = con._port_bits
-        g = Geomstr()
-        for segment_type, start, c1, c2, end, sets in geom.as_lines():
-            con.set_settings(sets)
+        compiler = ListCompiler(self.service.interpolate)
+        for block in compiler.blocks(geom):
             # LOOP CHECKS
             if self._aborting:
                 con.abort()
                 self._aborting = False
                 return
-            if segment_type == "line":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                con.mark(end.real, end.imag)
-            elif segment_type == "end":
-                pass
-            elif segment_type == "quad":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                interp = self.service.interpolate
-
-                g.clear()
-                g.quad(start, c1, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
-            elif segment_type == "cubic":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                interp = self.service.interpolate
-
-                g.clear()
-                g.cubic(start, c1, c2, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
-            elif segment_type == "arc":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                interp = self.service.interpolate
-
-                g.clear()
-                g.arc(start, c1, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
-            elif segment_type == "point":
-                function = sets.get("function")
-                if function == "dwell":
-                    con.goto(start.real, start.imag)
-                    dwell_time = (
-                        sets.get("dwell_time") * 100
-                    )  # Dwell time in ms units in 10 us
-                    while dwell_time > 0:
-                        d = min(dwell_time, 60000)
-                        con.list_laser_on_point(int(d))
-                        dwell_time -= d
-                    con.list_delay_time(int(self.service.delay_end / 10.0))
-                elif function == "wait":
-                    dwell_time = (
-                        sets.get("dwell_time") * 100
-                    )  # Dwell time in ms units in 10 us
-                    while dwell_time > 0:
-                        d = min(dwell_time, 60000)
-                        con.list_delay_time(int(d))
-                        dwell_time -= d
-                elif function == "home":
-                    con.goto(0x8000, 0x8000)
-                elif function == "goto":
-                    con.goto(start.real, start.imag)
-                elif function == "input":
-                    if self.service.input_operation_hardware:
-                        con.list_wait_for_input(sets.get("input_mask"), 0)
-                    else:
-                        con.rapid_mode()
-                        self._wait_for_input_protocol(
-                            sets.get("input_mask"), sets.get("input_value")
-                        )
-                        con.program_mode()
-                elif function == "output":
-                    con.port_set(sets.get("output_mask"), sets.get("output_value"))
-                    con.list_write_port()
+            if block[0] == "settings":
+                con.set_settings(block[1])
+            elif block[0] == "moves":
+                if not self._geometry_moves(con, block[1], block[2]):
+                    return
+            elif block[0] == "point":
+                self._geometry_point(con, block[1], block[2])
         con.list_delay_time(int(self.service.delay_end / 10.0))
         self._list_bits = None
         con.rapid_mode()
@@ -267,6 +176,65 @@ class BalorDriver:
             con.light_off()
             con.write_port()
 
+    def _geometry_moves(self, con, points, marks):
+        """
+        Writes the jumps and marks to the points as list records, one list packet at a time.
+
+        @return: whether the moves were written, False if aborted
+        """
+        if con._mark_speed is not None:
+            # Marks set their own speed, the moves are written one at a time.
+            for p, m in zip(points.tolist(), marks.tolist()):
+                if m:
+                    con.mark(p.real, p.imag)
+                else:
+                    con.goto(p.real, p.imag)
+            return True
+        records = list_moves(points, marks, *con.get_last_xy())
+        for i in range(0, len(records), RECORDS_PER_PACKET):
+            # LOOP CHECKS
+            if self._aborting:
+                con.abort()
+                self._aborting = False
+                return False
+            while self.paused:
+                time.sleep(0.05)
+            con._list_write_records(records[i : i + RECORDS_PER_PACKET])
+        return True
+
+    def _geometry_point(self, con, start, sets):
+        function = sets.get("function")
+        if function == "dwell":
+            con.goto(start.real, start.imag)
+            dwell_time = sets.get("dwell_time") * 100  # Dwell time in ms units in 10 us
+            while dwell_time > 0:
+                d = min(dwell_time, 60000)
+                con.list_laser_on_point(int(d))
+                dwell_time -= d
+            con.list_delay_time(int(self.service.delay_end / 10.0))
+        elif function == "wait":
+            dwell_time = sets.get("dwell_time") * 100  # Dwell time in ms units in 10 us
+            while dwell_time > 0:
+                d = min(dwell_time, 60000)
+                con.list_delay_time(int(d))
+                dwell_time -= d
+        elif function == "home":
+            con.goto(0x8000, 0x8000)
+        elif function == "goto":
+            con.goto(start.real, start.imag)
+        elif function == "input":
+            if self.service.input_operation_hardware:
+                con.list_wait_for_input(sets.get("input_mask"), 0)
+            else:
+                con.rapid_mode()
+                self._wait_for_input_protocol(
+                    sets.get("input_mask"), sets.get("input_value")
+                )
+                con.program_mode()
+        elif function == "output":
+            con.port_set(sets.get("output_mask"), sets.get("output_value"))
+            con.list_write_port()
+
     def plot(self, plot):
         """
         This command is called with bits of cutcode as they are processed through the spooler. This should be optimized
@@ -0,0 +1,207 @@
+"""
+Galvo List Compiler
+
+Compiles geometry into list commands in bulk. Every list command is a 12 byte record of six little-endian words, the
+list packets sent to the controller are 0x100 of these records. Rather than writing each jump and mark of a geometry
+as a separate command, the moves of the geometry are compiled into a NumPy structured array of records which is copied
+into the list packets as a whole.
+
+The geometry is split into blocks of moves that share the same settings, so that settings changes, and their delays,
+are only written where the settings of the geometry change. Points (dwell, wait, home, goto, input, output) are
+returned separately since they need to be performed by the driver.
+"""
+
+import numpy as np
+
+from meerk40t.balormk.controller import listJumpTo, listMarkTo
+from meerk40t.tools.geomstr import (
+    TYPE_ARC,
+    TYPE_CALL,
+    TYPE_CUBIC,
+    TYPE_END,
+    TYPE_FUNCTION,
+    TYPE_LINE,
+    TYPE_NOP,
+    TYPE_POINT,
+    TYPE_QUAD,
+    Geomstr,
+)
+
+list_record = np.dtype(
+    [
+        ("command", "<u2"),
+        ("v1", "<u2"),
+        ("v2", "<u2"),
+        ("v3", "<u2"),
+        ("v4", "<u2"),
+        ("v5", "<u2"),
+    ]
+)
+
+RECORDS_PER_PACKET = 0x100
+
+
+def list_moves(points, marks, last_x, last_y):
+    """
+    Compiles the jumps and marks to points into list records.
+
+    As with GalvoController.goto() and GalvoController.mark(), moves out of range are not performed and moves to the
+    current position are skipped. Positions are truncated to integers and the distance of each move is measured from
+    the previous truncated position.
+
+    @param points: complex array of move destinations
+    @param marks: boolean array, True for marks and False for jumps
+    @param last_x: current x position
+    @param last_y: current y position
+    @return: records
+    """
+    x = points.real
+    y = points.imag
+    in_range = (x >= 0) & (x <= 0xFFFF) & (y >= 0) & (y <= 0xFFFF)
+    x = x[in_range]
+    y = y[in_range]
+    marks = marks[in_range]
+    ix = np.trunc(x)
+    iy = np.trunc(y)
+    previous_x = np.concatenate(([last_x], ix[:-1]))
+    previous_y = np.concatenate(([last_y], iy[:-1]))
+    moved = (x != previous_x) | (y != previous_y)
+    distance = np.hypot(x - previous_x, y - previous_y)[moved]
+    records = np.zeros(np.count_nonzero(moved), dtype=list_record)
+    records["command"] = np.where(marks[moved], listMarkTo, listJumpTo)
+    records["v1"] = ix[moved]
+    records["v2"] = iy[moved]
+    records["v4"] = np.minimum(distance, 0xFFFF)
+    return records
+
+
+class ListCompiler:
+    """
+    Compiles geometry into blocks of list moves.
+    """
+
+    def __init__(self, interpolate=50):
+        self.interpolate = interpolate
+        self._curve = Geomstr()
+
+    def blocks(self, geom):
+        """
+        Yields the blocks of the geometry in order:
+
+        ("settings", settings): the following blocks use these settings
+        ("moves", points, marks): jumps and marks to the points, see list_moves()
+        ("point", start, settings): point segment to be performed by the driver
+
+        @param geom: Geomstr
+        @return:
+        """
+        segments = geom.segments[: geom.index]
+        infos = segments[:, 2]
+        types = infos.real.astype(int)
+        if np.any(np.isin(types & 0xFF, (TYPE_FUNCTION, TYPE_CALL))):
+            # Functions are expanded by as_lines.
+            yield from self._blocks_of_lines(geom)
+            return
+        keep = types != TYPE_NOP
+        segments = segments[keep]
+        types = types[keep]
+        keys = infos[keep].imag
+        count = len(segments)
+        if not count:
+            return
+        # Blocks break where the settings change and around points.
+        is_point = types == TYPE_POINT
+        breaks = np.flatnonzero(
+            (keys[1:] != keys[:-1]) | is_point[1:] | is_point[:-1]
+        )
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks + 1, [count]))
+        default_settings = dict()
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            settings = geom._settings.get(keys[start], default_settings)
+            yield "settings", settings
+            if is_point[start]:
+                yield "point", segments[start][0], settings
+                continue
+            points, marks = self.moves(segments[start:end], types[start:end])
+            if len(points):
+                yield "moves", points, marks
+
+    def _blocks_of_lines(self, geom):
+        for segment_type, start, c1, c2, end, sets in geom.as_lines():
+            yield "settings", sets
+            if segment_type == "point":
+                yield "point", start, sets
+                continue
+            segment = np.array([[start, c1, 0, c2, end]], dtype=complex)
+            segment_type = {
+                "line": TYPE_LINE,
+                "quad": TYPE_QUAD,
+                "cubic": TYPE_CUBIC,
+                "arc": TYPE_ARC,
+            }.get(segment_type, TYPE_END)
+            points, marks = self.moves(segment, np.array([segment_type]))
+            if len(points):
+                yield "moves", points, marks
+
+    def moves(self, segments, types):
+        """
+        Returns the move destinations of the segments: a jump to the start of each segment followed by marks along it.
+
+        Lines mark to their end, curves mark to their points interpolated at the interpolate distance.
+
+        @param segments: segments without points or nops
+        @param types: segment types
+        @return: points, marks
+        """
+        drawn = np.isin(types, (TYPE_LINE, TYPE_QUAD, TYPE_CUBIC, TYPE_ARC))
+        segments = segments[drawn]
+        types = types[drawn]
+        is_line = types == TYPE_LINE
+        if np.all(is_line):
+            return self._line_moves(segments)
+        points = []
+        marks = []
+        # Runs of lines are compiled together, curves one at a time.
+        changes = np.flatnonzero(is_line[1:] != is_line[:-1]) + 1
+        run_starts = np.concatenate(([0], changes)).tolist()
+        run_ends = np.concatenate((changes, [len(segments)])).tolist()
+        for start, end in zip(run_starts, run_ends):
+            if is_line[start]:
+                p, m = self._line_moves(segments[start:end])
+                points.append(p)
+                marks.append(m)
+                continue
+            curves = zip(segments[start:end], types[start:end])
+            for segment, segment_type in curves:
+                p, m = self._curve_moves(segment, segment_type)
+                points.append(p)
+                marks.append(m)
+        return np.concatenate(points), np.concatenate(marks)
+
+    @staticmethod
+    def _line_moves(segments):
+        points = np.empty(2 * len(segments), dtype=complex)
+        points[0::2] = segments[:, 0]
+        points[1::2] = segments[:, 4]
+        marks = np.zeros(len(points), dtype=bool)
+        marks[1::2] = True
+        return points, marks
+
+    def _curve_moves(self, segment, segment_type):
+        start, c1, info, c2, end = segment
+        g = self._curve
+        g.clear()
+        if segment_type == TYPE_QUAD:
+            g.quad(start, c1, end)
+        elif segment_type == TYPE_CUBIC:
+            g.cubic(start, c1, c2, end)
+        else:
+            g.arc(start, c1, end)
+        interpolated = list(
+            g.as_equal_interpolated_points(distance=self.interpolate)
+        )
+        points = np.array([start] + interpolated[1:], dtype=complex)
+        marks = np.ones(len(points), dtype=bool)
+        marks[0] = False
+        return points, marks
@@ -8,6 +8,10 @@ any hardware.
 import random
 import struct
 
+# Status bits, as in meerk40t.balormk.controller
+BUSY = 0x04
+READY = 0x20
+
 
 class MockConnection:
     def __init__(self, channel):
@@ -97,6 +101,8 @@ class MockConnection:
         read = bytearray(8)
         for r in range(len(read)):
             read[r] = random.randint(0, 255)
+        # The status word reports the mock as ready and not busy.
+        read[6] = (read[6] | READY) & ~BUSY
         read = struct.pack("8B", *read)
         device = self.devices[index]
         if not device:
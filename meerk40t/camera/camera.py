@@ -55,6 +55,11 @@ class Camera(Service):
         self.setting(str, "preserve_aspect", "xMinYMin meet")
         self.fisheye_k = None
         self.fisheye_d = None
+        # Cached combined fisheye/perspective remap: (key, map1, map2)
+        self._remap = None
+        # Processing time of the last frame and its running average, in seconds.
+        self.frame_time = 0.0
+        self.frame_time_average = 0.0
         if self.fisheye is not None and len(self.fisheye) != 0:
             self.fisheye_k, self.fisheye_d = self.fisheye
 
@@ -183,28 +188,91 @@ class Camera(Service):
         """
         self.quit_thread = True
 
-    def process_frame(self):
-        frame = self._current_raw
+    def _remap_key(self, frame_size):
+        """
+        Key of the settings the remap tables depend upon, None if no correction applies.
+        """
+        fisheye = None
         if (
             self.fisheye_k is not None
             and self.fisheye_d is not None
             and self.correction_fisheye
         ):
-            # Unfisheye the drawing
-            K = np.array(self.fisheye_k)
-            D = np.array(self.fisheye_d)
-            DIM = frame.shape[:2][::-1]
-            map1, map2 = cv2.fisheye.initUndistortRectifyMap(
-                K, D, np.eye(3), K, DIM, cv2.CV_16SC2
+            fisheye = (
+                tuple(tuple(r) for r in self.fisheye_k),
+                tuple(tuple(r) for r in self.fisheye_d),
             )
-            frame = cv2.remap(
-                frame,
-                map1,
-                map2,
-                interpolation=cv2.INTER_LINEAR,
-                borderMode=cv2.BORDER_CONSTANT,
+        perspective = None
+        if self.correction_perspective:
+            perspective = (
+                tuple(tuple(p) for p in self.perspective),
+                self.width,
+                self.height,
             )
-        width, height = frame.shape[:2][::-1]
+        if fisheye is None and perspective is None:
+            return None
+        return fisheye, perspective, frame_size
+
+    def _build_remap(self, key):
+        """
+        Builds a single remap table performing the fisheye undistortion followed by the
+        perspective correction.
+
+        @param key: remap key, see _remap_key
+        @return: map1, map2 for cv2.remap
+        """
+        fisheye, perspective, frame_size = key
+        if perspective is None:
+            K = np.array(fisheye[0])
+            D = np.array(fisheye[1])
+            return cv2.fisheye.initUndistortRectifyMap(
+                K, D, np.eye(3), K, frame_size, cv2.CV_16SC2
+            )
+        corners, dest_width, dest_height = perspective
+        rect = np.array(corners, dtype="float32")
+        dst = np.array(
+            [
+                [0, 0],
+                [dest_width - 1, 0],
+                [dest_width - 1, dest_height - 1],
+                [0, dest_height - 1],
+            ],
+            dtype="float32",
+        )
+        # Inverse perspective maps each destination pixel into the undistorted frame.
+        M = np.linalg.inv(cv2.getPerspectiveTransform(rect, dst))
+        xs, ys = np.meshgrid(
+            np.arange(dest_width, dtype=np.float64),
+            np.arange(dest_height, dtype=np.float64),
+        )
+        pts = np.stack((xs.ravel(), ys.ravel(), np.ones(xs.size)))
+        pts = M @ pts
+        pts = (pts[:2] / pts[2]).T
+        width, height = frame_size
+        outside = (
+            (pts[:, 0] < 0)
+            | (pts[:, 0] > width - 1)
+            | (pts[:, 1] < 0)
+            | (pts[:, 1] > height - 1)
+        )
+        if fisheye is not None:
+            # Undistorted pixel -> normalized camera coordinates -> distorted pixel.
+            K = np.array(fisheye[0])
+            D = np.array(fisheye[1])
+            normalized = (pts - (K[0, 2], K[1, 2])) / (K[0, 0], K[1, 1])
+            pts = cv2.fisheye.distortPoints(
+                normalized.reshape(-1, 1, 2).astype(np.float64), K, D
+            ).reshape(-1, 2)
+        # The undistorted frame was black beyond its edges.
+        pts[outside] = -1
+        map_x = pts[:, 0].reshape(dest_height, dest_width).astype(np.float32)
+        map_y = pts[:, 1].reshape(dest_height, dest_width).astype(np.float32)
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+
+    def process_frame(self):
+        start = time.perf_counter()
+        frame = self._current_raw
+        height, width = frame.shape[:2]
         if self.perspective is None:
             self.perspective = [
                 [0, 0],
@@ -212,30 +280,31 @@ class Camera(Service):
                 [width, height],
                 [0, height],
             ]
-        if self.correction_perspective:
-            # Perspective the drawing.
-            dest_width = self.width
-            dest_height = self.height
-            rect = np.array(
-                self.perspective,
-                dtype="float32",
-            )
-            dst = np.array(
-                [
-                    [0, 0],
-                    [dest_width - 1, 0],
-                    [dest_width - 1, dest_height - 1],
-                    [0, dest_height - 1],
-                ],
-                dtype="float32",
+        key = self._remap_key((width, height))
+        if key is not None:
+            remap = self._remap
+            if remap is None or remap[0] != key:
+                remap = (key, *self._build_remap(key))
+                self._remap = remap
+            frame = cv2.remap(
+                frame,
+                remap[1],
+                remap[2],
+                interpolation=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_CONSTANT,
             )
-            M = cv2.getPerspectiveTransform(rect, dst)
-            frame = cv2.warpPerspective(frame, M, (dest_width, dest_height))
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         if self.autonormal:
             cv2.normalize(frame, frame, 0, 255, cv2.NORM_MINMAX)
         self._last_frame = self._current_frame
         self._current_frame = frame
+        self.frame_time = time.perf_counter() - start
+        if self.frame_time_average:
+            self.frame_time_average = (
+                0.9 * self.frame_time_average + 0.1 * self.frame_time
+            )
+        else:
+            self.frame_time_average = self.frame_time
 
     def _attempt_recovery(self):
         channel = self.channel("camera")
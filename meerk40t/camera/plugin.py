@@ -115,6 +115,34 @@ def plugin(kernel, lifecycle=None):
                 channel(f"{d}: {getattr(context, 'uri', '---')}")
             return "camera", data
 
+        @kernel.console_command(
+            "timing",
+            help="show camera frame processing time",
+            output_type="camera",
+            input_type="camera",
+        )
+        def camera_timing(
+            _,
+            channel,
+            data=None,
+            **kwargs,
+        ):
+            average = data.frame_time_average
+            channel(
+                _("Frames: {count}, last: {last:.2f}ms, average: {average:.2f}ms").format(
+                    count=data.frame_index,
+                    last=data.frame_time * 1000.0,
+                    average=average * 1000.0,
+                )
+            )
+            if average:
+                channel(
+                    _("Processing throughput: {fps:.1f} frames/s").format(
+                        fps=1.0 / average
+                    )
+                )
+            return "camera", data
+
         @kernel.console_command(
             "contrast",
             help="Turn on AutoContrast",
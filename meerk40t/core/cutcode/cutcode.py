@@ -1,6 +1,7 @@
-from ...svgelements import Color, Path, Point
+from ...svgelements import Color, Path
 from .cubiccut import CubicCut
 from .cutgroup import CutGroup
+from .cutstatistics import CutStatistics, StatisticsView
 from .dwellcut import DwellCut
 from .linecut import LineCut
 from .plotcut import PlotCut
@@ -23,6 +24,7 @@ class CutCode(CutGroup):
         CutGroup.__init__(self, None, seq, settings=settings)
         self.output = True
         self.mode = None
+        self._statistics = None
 
     def __str__(self):
         parts = list()
@@ -35,6 +37,52 @@ class CutCode(CutGroup):
     def __copy__(self):
         return CutCode(self)
 
+    # List modifications invalidate the statistics.
+
+    def __setitem__(self, key, value):
+        self._statistics = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._statistics = None
+        super().__delitem__(key)
+
+    def __iadd__(self, other):
+        self._statistics = None
+        return super().__iadd__(other)
+
+    def __imul__(self, other):
+        self._statistics = None
+        return super().__imul__(other)
+
+    def append(self, item):
+        self._statistics = None
+        super().append(item)
+
+    def extend(self, items):
+        self._statistics = None
+        super().extend(items)
+
+    def insert(self, index, item):
+        self._statistics = None
+        super().insert(index, item)
+
+    def pop(self, *args):
+        self._statistics = None
+        return super().pop(*args)
+
+    def remove(self, item):
+        self._statistics = None
+        super().remove(item)
+
+    def clear(self):
+        self._statistics = None
+        super().clear()
+
+    def sort(self, *args, **kwargs):
+        self._statistics = None
+        super().sort(*args, **kwargs)
+
     def as_elements(self):
         last = None
         path = None
@@ -84,99 +132,47 @@ class CutCode(CutGroup):
             self[q].direct_close()
             self[q].reverse()
         self[j:k] = self[j:k][::-1]
+        self._statistics = None
 
     def generate(self):
         for cutobject in self.flat():
             yield "plot", cutobject
         yield "plot_start"
 
+    def statistics(self):
+        """
+        Columnar statistics of the flattened cutcode. These are kept until the cutcode is modified.
+
+        Cut objects modified in place, rather than through the cutcode, require invalidate_statistics().
+        @return:
+        """
+        statistics = self._statistics
+        if statistics is None:
+            statistics = CutStatistics(self)
+            self._statistics = statistics
+        return statistics
+
+    def invalidate_statistics(self):
+        self._statistics = None
+
+    def _start_distance(self, statistics, include_start):
+        if not include_start:
+            return 0.0
+        return statistics.start_distance(self.start)
+
     def provide_statistics(self, include_start=False):
-        result = []
-        cutcode = list(self.flat())
-        if len(cutcode) == 0:
-            item = {
-                "type": "",
-                "total_distance_travel": 0,
-                "total_distance_cut": 0,
-                "total_time_extra": 0,
-                "total_time_travel": 0,
-                "total_time_cut": 0,
-                "time_at_start": 0,
-                "time_at_end_of_travel": 0,
-                "time_at_end_of_burn": 0,
-            }
-            result.append(item)
-            return result
-        stop_at = len(cutcode)
-        total_distance_travel = 0
-        total_distance_cut = 0
-        total_extra = 0
-        total_duration_cut = 0
-        total_duration_travel = 0
-        if include_start:
-            if self.start is not None:
-                total_distance_travel += abs(
-                    complex(*self.start) - complex(*cutcode[0].start)
-                )
-            else:
-                total_distance_travel += abs(0 - complex(*cutcode[0].start))
-        previous_total_time = 0
-        for i in range(0, stop_at):
-            duration_of_this_travel = 0
-            duration_of_this_burn = 0
-            length_of_previous_travel = 0
-            current = cutcode[i]
-            if i > 0:
-                prev = cutcode[i - 1]
-                length_of_previous_travel = Point.distance(prev.end, current.start)
-                total_distance_travel += length_of_previous_travel
-
-            rapid_speed = self._native_speed(cutcode)
-            if rapid_speed is not None:
-                total_duration_travel = total_distance_travel / rapid_speed
-                duration_of_this_travel = length_of_previous_travel / rapid_speed
-
-            cut_type = type(current).__name__
-            current_length = current.length()
-            total_distance_cut += current_length
-            current_extra = current.extra()
-            total_extra += current_extra
-            cs = current.settings
-            # Speed is in mm/sec while native_speed and distance need to be in native units!
-            native_mm = cs.get("native_mm", 39.3701)
-            default_speed = cs.get("speed", 0) * native_mm
-            native_speed = cs.get("native_speed", default_speed)
-            native_speed *= 0.91
-            default_speed *= 0.91
-            if native_speed != 0:
-                duration_of_this_burn = current_length / native_speed
-                total_duration_cut += duration_of_this_burn
-
-            end_of_this_travel = previous_total_time + duration_of_this_travel
-            end_of_this_burn = (
-                previous_total_time
-                + duration_of_this_travel
-                + current_extra
-                + duration_of_this_burn
-            )
-            item = {
-                "type": cut_type,
-                "total_distance_travel": total_distance_travel,
-                "total_distance_cut": total_distance_cut,
-                "total_time_extra": total_extra,
-                "total_time_travel": total_duration_travel,
-                "total_time_cut": total_duration_cut,
-                "time_at_start": previous_total_time,
-                "time_at_end_of_travel": end_of_this_travel,
-                "time_at_end_of_burn": end_of_this_burn,
-            }
-            # print (item)
-            result.append(item)
-            previous_total_time = (
-                total_duration_cut + total_duration_travel + total_extra
-            )
-
-        return result
+        """
+        Statistics of the cutcode, per cut the cumulative distances and times at that cut.
+
+        @param include_start: should the travel include the distance from the start
+        @return: sequence of statistics dictionaries
+        """
+        statistics = self.statistics()
+        return StatisticsView(
+            statistics,
+            start_distance=self._start_distance(statistics, include_start),
+            rapid_speed=self._rapid_speed(statistics),
+        )
 
     def length_travel(self, include_start=False, stop_at=-1):
         """
@@ -186,23 +182,12 @@ class CutCode(CutGroup):
         @param stop_at: stop position
         @return:
         """
-        cutcode = list(self.flat())
-        if len(cutcode) == 0:
+        statistics = self.statistics()
+        if len(statistics) == 0:
             return 0
-        if stop_at is None or stop_at < 0 or stop_at > len(cutcode):
-            stop_at = len(cutcode)
-        distance = 0
-        if include_start:
-            if self.start is not None:
-                distance += abs(complex(*self.start) - complex(*cutcode[0].start))
-            else:
-                distance += abs(0 - complex(*cutcode[0].start))
-        for i in range(1, stop_at):
-            prev = cutcode[i - 1]
-            curr = cutcode[i]
-            delta = Point.distance(prev.end, curr.start)
-            distance += delta
-        return distance
+        return statistics.length_travel(
+            stop_at, self._start_distance(statistics, include_start)
+        )
 
     def length_cut(self, stop_at=-1):
         """
@@ -211,14 +196,7 @@ class CutCode(CutGroup):
         @param stop_at: stop index
         @return:
         """
-        cutcode = list(self.flat())
-        distance = 0
-        if stop_at is None or stop_at < 0 or stop_at > len(cutcode):
-            stop_at = len(cutcode)
-        for i in range(0, stop_at):
-            curr = cutcode[i]
-            distance += curr.length()
-        return distance
+        return self.statistics().length_cut(stop_at)
 
     def extra_time(self, stop_at=-1):
         """
@@ -227,14 +205,7 @@ class CutCode(CutGroup):
         @param stop_at:
         @return:
         """
-        cutcode = list(self.flat())
-        extra = 0
-        if stop_at is None or stop_at < 0 or stop_at > len(cutcode):
-            stop_at = len(cutcode)
-        for i in range(0, stop_at):
-            current = cutcode[i]
-            extra += current.extra()
-        return extra
+        return self.statistics().extra_time(stop_at)
 
     def duration_cut(self, stop_at=None):
         """
@@ -244,18 +215,7 @@ class CutCode(CutGroup):
         @param stop_at: stop index
         @return:
         """
-        cutcode = list(self.flat())
-        duration = 0
-        if stop_at is None or stop_at < 0 or stop_at > len(cutcode):
-            stop_at = len(cutcode)
-        for current in cutcode[0:stop_at]:
-            cs = current.settings
-            native_mm = cs.get("native_mm", 39.3701)
-            default_speed = cs.get("speed", 0) * native_mm
-            native_speed = cs.get("native_speed", default_speed)
-            if native_speed != 0:
-                duration += current.length() / native_speed
-        return duration
+        return self.statistics().duration_cut(stop_at)
 
     def _native_speed(self, cutcode):
         if cutcode:
@@ -273,6 +233,12 @@ class CutCode(CutGroup):
         native_speed = cs.get("native_rapid_speed", cs.get("native_speed", None))
         return native_speed
 
+    def _rapid_speed(self, statistics):
+        if statistics.rapid_speed is not None:
+            return statistics.rapid_speed
+        # No element had a rapid speed value.
+        return self._native_speed(None)
+
     def duration_travel(self, stop_at=None):
         """
         Duration of travel time taken within the cutcode.
@@ -280,12 +246,11 @@ class CutCode(CutGroup):
         @param stop_at: stop index
         @return:
         """
-        travel = self.length_travel(stop_at=stop_at)
-        cutcode = list(self.flat())
-        rapid_speed = self._native_speed(cutcode)
+        statistics = self.statistics()
+        rapid_speed = self._rapid_speed(statistics)
         if rapid_speed is None:
             return 0
-        return travel / rapid_speed
+        return statistics.length_travel(stop_at) / rapid_speed
 
     def reordered(self, order):
         """
@@ -1,5 +1,5 @@
 from meerk40t.core.cutcode.cutobject import CutObject
-from meerk40t.tools.rasterplotter import RasterPlotter
+from meerk40t.tools.rasterplotter import NumpyRasterPlotter
 
 
 class RasterCut(CutObject):
@@ -57,8 +57,8 @@ class RasterCut(CutObject):
             def image_filter(pixel):
                 return (255 - pixel) / 255.0
 
-        self.plot = RasterPlotter(
-            data=image.load(),
+        self.plot = NumpyRasterPlotter(
+            data=image,
             width=self.width,
             height=self.height,
             horizontal=self.horizontal,
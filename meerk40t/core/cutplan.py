@@ -655,6 +655,10 @@ class CutPlan:
 
         channel = self.context.channel("optimize", timestamp=True)
         grouped_inner = self.context.opt_inner_first and self.context.opt_inners_grouped
+        if self.context.opt_spatial_index:
+            short_travel = short_travel_cutcode_indexed
+        else:
+            short_travel = short_travel_cutcode
         for i, c in enumerate(self.plan):
             if busy.shown:
                 busy.change(
@@ -673,7 +677,7 @@ class CutPlan:
                     c = self.plan[i]
                 if last is not None:
                     c._start_x, c._start_y = last
-                self.plan[i] = short_travel_cutcode(
+                self.plan[i] = short_travel(
                     c,
                     kernel=self.context.kernel,
                     channel=channel,
@@ -1227,6 +1231,393 @@ def short_travel_cutcode(
     return ordered
 
 
+class _CutPointIndex:
+    """
+    Uniform grid over the candidate start and end points of a cutcode.
+
+    Each entry is (x, y, order, cut, backwards, group). The order is the position the
+    point would have in the `CutCode.candidate()` iteration, which is used to break ties
+    exactly the way the linear scan in `short_travel_cutcode` does. Entries are removed
+    lazily once their cut has burned all its passes.
+    """
+
+    def __init__(self, entries):
+        self.count = len(entries)
+        self.cells = dict()
+        if not entries:
+            self.x0 = self.y0 = 0.0
+            self.cell = 1.0
+            return
+        xs = [e[0] for e in entries]
+        ys = [e[1] for e in entries]
+        self.x0 = min(xs)
+        self.y0 = min(ys)
+        width = max(xs) - self.x0
+        height = max(ys) - self.y0
+        # Aim for roughly two points per cell.
+        area = width * height
+        if area > 0:
+            cell = (2.0 * area / len(entries)) ** 0.5
+        else:
+            cell = 2.0 * max(width, height) / len(entries)
+        self.cell = max(cell, 1.0)
+        cells = self.cells
+        for e in entries:
+            key = (
+                int((e[0] - self.x0) // self.cell),
+                int((e[1] - self.y0) // self.cell),
+            )
+            try:
+                cells[key].append(e)
+            except KeyError:
+                cells[key] = [e]
+
+    def _ring(self, ix, iy, r):
+        if r == 0:
+            yield ix, iy
+            return
+        for x in range(ix - r, ix + r + 1):
+            yield x, iy - r
+            yield x, iy + r
+        for y in range(iy - r + 1, iy + r):
+            yield ix - r, y
+            yield ix + r, y
+
+    def _scan(self, key, cx, cy, state, allowed):
+        """
+        Scan a single cell, updating state = [close, best, best_d, best_order].
+        """
+        cell = self.cells.get(key)
+        if cell is None:
+            return
+        dead = False
+        for e in cell:
+            cut = e[3]
+            if cut.burns_done >= cut.passes:
+                dead = True
+                continue
+            if allowed is not None and not allowed[e[5]]:
+                continue
+            d = abs(complex(e[0] - cx, e[1] - cy))
+            if d <= 0.1:
+                if state[0] is None or e[2] < state[0][2]:
+                    state[0] = e
+                continue
+            if d < state[2] or (d == state[2] and e[2] < state[3]):
+                state[1] = e
+                state[2] = d
+                state[3] = e[2]
+        if dead:
+            alive = [e for e in cell if e[3].burns_done < e[3].passes]
+            self.count -= len(cell) - len(alive)
+            if alive:
+                self.cells[key] = alive
+            else:
+                del self.cells[key]
+
+    def nearest(self, curr, distance, allowed=None):
+        """
+        Find the candidate point nearest to curr that is strictly closer than distance.
+
+        Points within 0.1 of curr are taken in candidate order rather than by distance,
+        matching the early exit of the linear scan.
+
+        @param curr: complex current position
+        @param distance: exclusive upper bound on the distance
+        @param allowed: optional list of group flags, indexed by entry group
+        @return: (cut, backwards) or None
+        """
+        if self.count <= 0:
+            return None
+        cx = curr.real
+        cy = curr.imag
+        cell = self.cell
+        ix = int((cx - self.x0) // cell)
+        iy = int((cy - self.y0) // cell)
+        state = [None, None, distance, float("inf")]
+        r = 0
+        while self.cells:
+            # Points in ring r are at least (r - 1) cells away.
+            bound = 0.1 if state[0] is not None else max(state[2], 0.1)
+            if r > 0 and (r - 1) * cell > bound:
+                break
+            if 8 * r > len(self.cells):
+                # The ring is larger than the populated grid, scan what remains.
+                for key in list(self.cells.keys()):
+                    if max(abs(key[0] - ix), abs(key[1] - iy)) >= r:
+                        self._scan(key, cx, cy, state, allowed)
+                break
+            for key in self._ring(ix, iy, r):
+                self._scan(key, cx, cy, state, allowed)
+            r += 1
+        found = state[0] if state[0] is not None else state[1]
+        if found is None:
+            return None
+        return found[3], found[4]
+
+
+def _cut_point_entries(context: CutCode, complete_path):
+    """
+    Build the spatial index entries for the cuts of context in candidate order.
+
+    @return: entries, top-level groups, cut to group index map
+    """
+    entries = list()
+    groups = list(context)
+    group_of = dict()
+    order = 0
+    for gi, grp in enumerate(groups):
+        if complete_path and not grp.closed and isinstance(grp, CutGroup):
+            cuts = list(grp[:1]) if len(grp) <= 1 else [grp[0], grp[-1]]
+        else:
+            cuts = [seg for seg in grp.flat() if seg is not None]
+        for seg in grp.flat():
+            group_of[id(seg)] = gi
+        for cut in cuts:
+            s = cut.start
+            if not complete_path or cut.closed or cut.first:
+                entries.append((s[0], s[1], order, cut, False, gi))
+            order += 1
+            if not cut.reversible():
+                continue
+            e = cut.end
+            if not complete_path or cut.closed or cut.last:
+                entries.append((e[0], e[1], order, cut, True, gi))
+            order += 1
+    return entries, groups, group_of
+
+
+class _AllowedGroups:
+    """
+    Flags for the top-level groups which `CutCode.candidate()` would currently permit.
+
+    The flags of a group only depend on the burn state of that group, of the groups it
+    contains and of the other groups inside its outers. When the burn state of a group
+    changes only the flags of those groups are recalculated. The number of permitted
+    groups is kept, since no permitted group at all permits every group.
+    """
+
+    def __init__(self, groups, grouped_inner):
+        self.groups = groups
+        self.grouped_inner = grouped_inner
+        index = {id(grp): gi for gi, grp in enumerate(groups)}
+        # Groups containing each group, and the groups contained by each group.
+        self._outers = [list() for _ in groups]
+        self._inners = [list() for _ in groups]
+        for gi, grp in enumerate(groups):
+            if grp.contains is None:
+                continue
+            for inner in grp.contains:
+                ii = index.get(id(inner))
+                if ii is not None:
+                    self._outers[ii].append(gi)
+                    self._inners[gi].append(ii)
+        self.permitted = [False] * len(groups)
+        self.blocked = [False] * len(groups)
+        self.count = 0
+        for gi in range(len(groups)):
+            self._update(gi)
+
+    def __getitem__(self, gi):
+        if self.blocked[gi]:
+            return False
+        return self.permitted[gi] or self.count == 0
+
+    def _update(self, gi):
+        grp = self.groups[gi]
+        self.blocked[gi] = grp.contains_unburned_groups()
+        permitted = True
+        if self.grouped_inner:
+            if (
+                grp.is_burned()
+                or (grp.contains is None and grp.inside is None)
+                or (grp.contains is not None and self.blocked[gi])
+            ):
+                permitted = False
+            elif grp.inside is not None:
+                permitted = any(outer.contains_burned_groups() for outer in grp.inside)
+        if permitted != self.permitted[gi]:
+            self.permitted[gi] = permitted
+            self.count += 1 if permitted else -1
+
+    def changed(self, gi):
+        """
+        Recalculates the flags which depend on the burn state of group gi.
+        """
+        dirty = {gi}
+        for oi in self._outers[gi]:
+            dirty.add(oi)
+            dirty.update(self._inners[oi])
+        for di in dirty:
+            self._update(di)
+
+
+def _burn_state(cut):
+    return cut.burns_done, getattr(cut, "burn_started", None)
+
+
+def short_travel_cutcode_indexed(
+    context: CutCode,
+    kernel=None,
+    channel=None,
+    complete_path: Optional[bool] = False,
+    grouped_inner: Optional[bool] = False,
+):
+    """
+    Greedy short-travel optimization backed by a spatial index.
+
+    This makes the same choices as `short_travel_cutcode` but rather than scanning every
+    candidate for every cut it queries a uniform grid over the cut endpoints, removing
+    points as their cuts burn out. The permitted groups for inner-first and grouped
+    inner burns are only recalculated when the burn state of a top-level group changes.
+    """
+    if channel:
+        start_length = context.length_travel(True)
+        start_time = time()
+        start_times = times()
+        channel("Executing Greedy Short-Travel optimization (spatial index)")
+        channel(f"Length at start: {start_length:.0f} steps")
+
+    curr = context.start
+    if curr is None:
+        curr = 0
+    else:
+        curr = complex(curr[0], curr[1])
+
+    cutcode_len = 0
+    for c in context.flat():
+        cutcode_len += 1
+        c.burns_done = 0
+
+    entries, groups, group_of = _cut_point_entries(context, complete_path)
+    index = _CutPointIndex(entries)
+    constrained = any(
+        grp.contains is not None or grp.inside is not None for grp in groups
+    )
+    allowed = _AllowedGroups(groups, grouped_inner) if constrained else None
+    if channel:
+        channel(
+            f"Indexed {len(entries)} points of {cutcode_len} cuts "
+            f"in {len(index.cells)} cells of {index.cell:.1f} steps"
+        )
+
+    ordered = CutCode()
+    current_pass = 0
+    if kernel:
+        busy = kernel.busyinfo
+        _ = kernel.translation
+    else:
+        busy = None
+    while True:
+        current_pass += 1
+        if current_pass % 50 == 0 and busy and busy.shown:
+            message = _("Pass {cpass}/{tpass}").format(
+                cpass=current_pass, tpass=cutcode_len
+            )
+            busy.change(msg=message, keep=2)
+            busy.show()
+        closest = None
+        backwards = False
+        distance = float("inf")
+
+        try:
+            last_segment = ordered[-1]
+        except IndexError:
+            pass
+        else:
+            if last_segment.normal:
+                # Attempt to initialize value to next segment in subpath
+                cut = last_segment.next
+                if cut and cut.burns_done < cut.passes:
+                    closest = cut
+                    backwards = False
+                    start = closest.start
+                    distance = abs(complex(start[0], start[1]) - curr)
+            else:
+                # Attempt to initialize value to previous segment in subpath
+                cut = last_segment.previous
+                if cut and cut.burns_done < cut.passes:
+                    closest = cut
+                    backwards = True
+                    end = closest.end
+                    distance = abs(complex(end[0], end[1]) - curr)
+            # Gap or continuing on path not permitted, try reversing
+            if (
+                distance > 50
+                and last_segment.burns_done < last_segment.passes
+                and last_segment.reversible()
+                and last_segment.next is not None
+            ):
+                # last_segment is a copy, so we need to get original
+                closest = last_segment.next.previous
+                backwards = last_segment.normal
+                distance = 0  # By definition since we are reversing and reburning
+
+        # Stay on path in same direction if gap <= 1/20" i.e. path not quite closed
+        # Travel only if path is completely burned or gap > 1/20"
+        if distance > 50:
+            found = index.nearest(curr, distance, allowed)
+            if found is not None:
+                closest, backwards = found
+
+        if closest is None:
+            break
+
+        # Change direction if other direction is coincident and has more burns remaining
+        if backwards:
+            if (
+                closest.next
+                and closest.next.burns_done <= closest.burns_done
+                and closest.next.start == closest.end
+            ):
+                closest = closest.next
+                backwards = False
+        elif closest.reversible():
+            if (
+                closest.previous
+                and closest.previous is not closest
+                and closest.previous.burns_done < closest.burns_done
+                and closest.previous.end == closest.start
+            ):
+                closest = closest.previous
+                backwards = True
+
+        gi = group_of.get(id(closest)) if constrained else None
+        if gi is not None:
+            # Permits only depend on the burn state of the top-level groups.
+            before = _burn_state(groups[gi])
+            closest.burns_done += 1
+            if _burn_state(groups[gi]) != before:
+                allowed.changed(gi)
+        else:
+            closest.burns_done += 1
+        c = copy(closest)
+        if backwards:
+            c.reverse()
+        end = c.end
+        curr = complex(end[0], end[1])
+        ordered.append(c)
+    if context.start is not None:
+        ordered._start_x, ordered._start_y = context.start
+    else:
+        ordered._start_x = 0
+        ordered._start_y = 0
+    if channel:
+        end_times = times()
+        end_length = ordered.length_travel(True)
+        try:
+            delta = (end_length - start_length) / start_length
+        except ZeroDivisionError:
+            delta = 0
+        channel(
+            f"Length at end: {end_length:.0f} steps "
+            f"({delta:+.0%}), "
+            f"optimized in {time() - start_time:.3f} "
+            f"elapsed seconds using {end_times[0] - start_times[0]:.3f} seconds CPU"
+        )
+    return ordered
+
+
 def short_travel_cutcode_2opt(
     context: CutCode, kernel=None, passes: int = 50, channel=None
 ):
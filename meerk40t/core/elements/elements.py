@@ -21,7 +21,7 @@ from meerk40t.core.node.rootnode import RootNode
 from meerk40t.core.undos import Undo
 from meerk40t.core.units import Length
 from meerk40t.core.wordlist import Wordlist
-from meerk40t.kernel import ConsoleFunction, Service, Settings
+from meerk40t.kernel import ConsoleFunction, Service, Settings, signal_listener
 from meerk40t.svgelements import Color, Path, Point, SVGElement
 
 from . import offset_clpr, offset_mk
@@ -427,6 +427,33 @@ def plugin(kernel, lifecycle=None):
             },
         ]
         kernel.register_choices("preferences", choices)
+        choices = [
+            {
+                "attr": "undo_levels",
+                "object": elements,
+                "default": 0,
+                "type": int,
+                "label": _("Undo levels"),
+                "tip": _(
+                    "Maximum number of undo states that are kept, 0 for unlimited."
+                ),
+                "page": "Scene",
+                "section": "_95_Undo",
+            },
+            {
+                "attr": "undo_memory",
+                "object": elements,
+                "default": 512,
+                "type": int,
+                "label": _("Undo memory (MB)"),
+                "tip": _(
+                    "Oldest undo states are discarded once the undo states are estimated to use more memory than this, 0 for unlimited."
+                ),
+                "page": "Scene",
+                "section": "_95_Undo",
+            },
+        ]
+        kernel.register_choices("preferences", choices)
 
     elif lifecycle == "prestart":
         if hasattr(kernel.args, "input") and kernel.args.input is not None:
@@ -452,6 +479,26 @@ def reversed_enumerate(collection: list):
 
 OP_PRIORITIES = ["op dots", "op image", "op raster", "op engrave", "op cut"]
 
+_NO_ATTRIBUTE = object()
+
+
+def classify_key(node):
+    """
+    Key of everything the classification of a node depends on: its class, its type and the stroke and fill colors.
+    Nodes with the same key are classified into the same operations.
+
+    @param node: element node
+    @return: hashable key
+    """
+    key = [type(node), node.type]
+    for attribute in ("stroke", "fill"):
+        color = getattr(node, attribute, _NO_ATTRIBUTE)
+        if color is None or color is _NO_ATTRIBUTE:
+            key.append(color)
+        else:
+            key.append(("color", color.argb))
+    return tuple(key)
+
 
 # def is_dot(element):
 #     if not isinstance(element, Shape):
@@ -504,7 +551,14 @@ class Elemental(Service):
         self.points = list()
         self.segments = list()
 
-        self.undo = Undo(self, self._tree)
+        self.setting(int, "undo_levels", 0)
+        self.setting(int, "undo_memory", 512)
+        self.undo = Undo(
+            self,
+            self._tree,
+            levels=self.undo_levels,
+            budget=self.undo_memory * 1024 * 1024,
+        )
         self.do_undo = True
         self.suppress_updates = False
 
@@ -1555,6 +1609,12 @@ class Elemental(Service):
         if self.do_undo:
             self.schedule(self._save_restore_job)
 
+    @signal_listener("undo_levels")
+    @signal_listener("undo_memory")
+    def undo_settings_changed(self, origin=None, *args):
+        self.undo.levels = self.undo_levels
+        self.undo.budget = self.undo_memory * 1024 * 1024
+
     def emphasized(self, *args):
         self._emphasized_bounds_dirty = True
         self._emphasized_bounds = None
@@ -2446,11 +2506,29 @@ class Elemental(Service):
         if add_op_function is None:
             # add_op_function = self.add_op
             add_op_function = self.add_classify_op
+        # Classification index, classify_key -> operations the node was referenced by.
+        classify_index = dict()
+        operation_count = len(operations)
         for node in elements:
             # Following lines added to handle 0.7 special ops added to ops list
             if hasattr(node, "operation"):
                 add_op_function(node)
+                classify_index.clear()
+                continue
+            if len(operations) != operation_count:
+                # Added operations may classify nodes differently.
+                classify_index.clear()
+                operation_count = len(operations)
+            key = classify_key(node)
+            ops_of_key = classify_index.get(key)
+            if ops_of_key is not None:
+                # Classified as an earlier node with the same key.
+                if debug:
+                    debug(f"Indexed: {node.type} into {len(ops_of_key)} operations")
+                for op in ops_of_key:
+                    op.add_reference(node)
                 continue
+            first_reference = len(node._references)
             classif_info = [False, False]
             # Even for fuzzy we check first a direct hit
             if fuzzy:
@@ -2907,6 +2985,10 @@ class Elemental(Service):
                         new_operations_added = True
                         already_found = True
                     op.add_reference(node)
+            if len(operations) == operation_count:
+                classify_index[key] = [
+                    ref.parent for ref in node._references[first_reference:]
+                ]
 
         self.remove_unused_default_copies()
         if new_operations_added:
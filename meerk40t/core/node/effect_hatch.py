@@ -49,6 +49,9 @@ class HatchEffectNode(Node):
         self._angle = None
         self._angle_delta = 0
         self._effect = True
+        # Generated geometry and the key it was generated for.
+        self._hatch_geometry = None
+        self._hatch_key = None
         self.recalculate()
 
     @property
@@ -65,39 +68,46 @@ class HatchEffectNode(Node):
         return HatchEffectNode(**nd)
 
     def scaled(self, sx, sy, ox, oy):
+        self._hatch_geometry = None
         self.altered()
 
     def notify_attached(self, node=None, **kwargs):
+        self._hatch_geometry = None
         Node.notify_attached(self, node=node, **kwargs)
         if node is self:
             return
         self.altered()
 
     def notify_detached(self, node=None, **kwargs):
+        self._hatch_geometry = None
         Node.notify_detached(self, node=node, **kwargs)
         if node is self:
             return
         self.altered()
 
     def notify_modified(self, node=None, **kwargs):
+        self._hatch_geometry = None
         Node.notify_modified(self, node=node, **kwargs)
         if node is self:
             return
         self.altered()
 
     def notify_altered(self, node=None, **kwargs):
+        self._hatch_geometry = None
         Node.notify_altered(self, node=node, **kwargs)
         if node is self:
             return
         self.altered()
 
     def notify_scaled(self, node=None, sx=1, sy=1, ox=0, oy=0, **kwargs):
+        self._hatch_geometry = None
         Node.notify_scaled(self, node, sx, sy, ox, oy, **kwargs)
         if node is self:
             return
         self.altered()
 
     def notify_translated(self, node=None, dx=0, dy=0, **kwargs):
+        self._hatch_geometry = None
         Node.notify_translated(self, node, dx, dy, **kwargs)
         if node is self:
             return
@@ -232,9 +242,18 @@ class HatchEffectNode(Node):
             except AttributeError:
                 # If direct children lack as_geometry(), do nothing.
                 pass
-        path = Geomstr()
         if self._distance is None:
             self.recalculate()
+        key = (
+            self._distance,
+            self._angle,
+            self._angle_delta,
+            self.loops,
+            outlines.segments[: outlines.index].tobytes(),
+        )
+        if self._hatch_geometry is not None and self._hatch_key == key:
+            return copy(self._hatch_geometry)
+        path = Geomstr()
         for p in range(self.loops):
             path.append(
                 Geomstr.hatch(
@@ -243,7 +262,9 @@ class HatchEffectNode(Node):
                     angle=self._angle + p * self._angle_delta,
                 )
             )
-        return path
+        self._hatch_geometry = path
+        self._hatch_key = key
+        return copy(path)
 
     def modified(self):
         self.altered()
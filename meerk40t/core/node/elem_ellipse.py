@@ -1,7 +1,11 @@
 from copy import copy
 from math import cos, sin, sqrt, tau
 
-from meerk40t.core.node.mixins import FunctionalParameter, Stroked
+from meerk40t.core.node.mixins import (
+    CachedGeometry,
+    FunctionalParameter,
+    Stroked,
+)
 from meerk40t.core.node.node import Fillrule, Node
 from meerk40t.svgelements import (
     SVG_ATTR_VECTOR_EFFECT,
@@ -13,13 +17,14 @@ from meerk40t.svgelements import (
 from meerk40t.tools.geomstr import Geomstr
 
 
-class EllipseNode(Node, Stroked, FunctionalParameter):
+class EllipseNode(Node, Stroked, FunctionalParameter, CachedGeometry):
     """
     EllipseNode is the bootstrapped node type for the 'elem ellipse' type.
     """
 
     def __init__(self, **kwargs):
-        shape = kwargs.get("shape")
+        # Only read here, the node does not keep the shape.
+        shape = kwargs.pop("shape", None)
         if shape is not None:
             if "cx" not in kwargs:
                 kwargs["cx"] = shape.cx
@@ -132,10 +137,11 @@ class EllipseNode(Node, Stroked, FunctionalParameter):
         """
         return complex(self.cx + self.rx * cos(t), self.cy + self.ry * sin(t))
 
-    def as_geometry(self, **kws):
-        path = Geomstr.ellipse(self.rx, self.ry, self.cx, self.cy, 0, 12)
-        path.transform(self.matrix)
-        return path
+    def _untransformed_geometry(self):
+        return Geomstr.ellipse(self.rx, self.ry, self.cx, self.cy, 0, 12)
+
+    def _geometry_key(self):
+        return self.rx, self.ry, self.cx, self.cy
 
     def scaled(self, sx, sy, ox, oy):
         """
@@ -157,6 +163,7 @@ class EllipseNode(Node, Stroked, FunctionalParameter):
                 y1 = oy + sy * d2
             return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
 
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
@@ -173,12 +180,7 @@ class EllipseNode(Node, Stroked, FunctionalParameter):
         self.notify_scaled(self, sx=sx, sy=sy, ox=ox, oy=oy)
 
     def bbox(self, transformed=True, with_stroke=False):
-        geometry = self.as_geometry()
-        if transformed:
-            bounds = geometry.bbox(mx=self.matrix)
-        else:
-            bounds = geometry.bbox()
-        xmin, ymin, xmax, ymax = bounds
+        xmin, ymin, xmax, ymax = self.geometry_bbox()
         if with_stroke:
             delta = float(self.implied_stroke_width) / 2.0
             return (
@@ -267,7 +269,7 @@ class EllipseNode(Node, Stroked, FunctionalParameter):
         return False
 
     def as_path(self):
-        geometry = self.as_geometry()
+        geometry = self.geometry_view()
         path = geometry.as_path()
         path.stroke = self.stroke
         path.fill = self.fill
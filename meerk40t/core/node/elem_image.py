@@ -1,13 +1,34 @@
-import threading
+import weakref
+from base64 import b64encode
 from copy import copy
+from io import BytesIO
 from math import ceil, floor
 
 from meerk40t.core.node.node import Node
 from meerk40t.core.units import UNITS_PER_INCH
+from meerk40t.image.imagecache import image_cache, image_digest, image_pool
 from meerk40t.image.imagetools import RasterScripts
 from meerk40t.svgelements import Matrix, Path, Polygon
 
 
+def png_base64(image, dpi):
+    """
+    Encodes the image as PNG in base64, as embedded in saved svg files.
+
+    @param image: PIL image
+    @param dpi: dpi stored in the png
+    @return: base64 str
+    """
+    stream = BytesIO()
+    try:
+        image.save(stream, format="PNG", dpi=(dpi, dpi))
+    except OSError:
+        # Edge condition if the original image was CMYK and never touched it can't encode to PNG
+        stream = BytesIO()
+        image.convert("RGBA").save(stream, format="PNG", dpi=(dpi, dpi))
+    return b64encode(stream.getvalue()).decode("utf8")
+
+
 class ImageNode(Node):
     """
     ImageNode is the bootstrapped node type for the 'elem image' type.
@@ -93,11 +114,10 @@ class ImageNode(Node):
         self.step_y = None
 
         self._needs_update = False
-        self._update_thread = None
-        self._update_lock = threading.Lock()
         self._processed_image = None
         self._processed_matrix = None
         self._process_image_failed = False
+        self._png_base64 = None
         self.message = None
         if self.operations or self.dither or self.prevent_crop:
             step = UNITS_PER_INCH / self.dpi
@@ -109,11 +129,31 @@ class ImageNode(Node):
         nd = self.node_dict
         nd["matrix"] = copy(self.matrix)
         nd["operations"] = copy(self.operations)
-        return ImageNode(**nd)
+        node = ImageNode(**nd)
+        # The copy shares the image, and so the encoded image.
+        node._png_base64 = self._png_base64
+        return node
 
     def __repr__(self):
         return f"{self.__class__.__name__}('{self.type}', {str(self.image)}, {str(self._parent)})"
 
+    def png_base64(self):
+        """
+        Base64 encoded PNG of the image, as embedded in saved svg files.
+
+        The encoding is kept for the image and dpi. Images are replaced rather than changed in place, as with
+        image_digest, so saving unchanged images again does not encode them again.
+
+        @return: base64 str
+        """
+        image = self.image
+        cached = self._png_base64
+        if cached is not None and cached[0]() is image and cached[1] == self.dpi:
+            return cached[2]
+        payload = png_base64(image, self.dpi)
+        self._png_base64 = (weakref.ref(image), self.dpi, payload)
+        return payload
+
     @property
     def active_image(self):
         if self._processed_image is None:
@@ -207,63 +247,76 @@ class ImageNode(Node):
 
     def update(self, context):
         """
-        Update kicks off the image processing thread, which performs RasterWizard script operations on the image node.
+        Update submits the image processing to the shared image pool, which performs RasterWizard script operations
+        on the image node. Processed images are memoized, so unchanged images are not processed again.
 
-        The text should be displayed in the scene by the renderer. And any additional changes will be processed
-        until the new processed image is completed.
+        The text should be displayed in the scene by the renderer. Any additional changes replace the pending request,
+        and are processed until the new processed image is completed.
 
         @param context:
         @return:
         """
-        self._needs_update = True
-        if context is not None:
-            self.message = "Processing..."
+        if context is None:
+            # Direct execution
+            image_pool.cancel(self)
+            self._needs_update = False
+            self._processed_image = None
+            self._process_image_thread()
+            return
+
+        self.message = "Processing..."
+        context.signal("refresh_scene", "Scene")
+
+        def clear(result):
+            self._needs_update = False
+            if self._process_image_failed:
+                self.message = "Process image could not exist in memory."
+            else:
+                self.message = None
             context.signal("refresh_scene", "Scene")
-        if self._update_thread is None:
-
-            def clear(result):
-                self._needs_update = False
-                self._update_thread = None
-                if context is not None:
-                    if self._process_image_failed:
-                        self.message = "Process image could not exist in memory."
-                    else:
-                        self.message = None
-                    context.signal("refresh_scene", "Scene")
-                    context.signal("image_updated", self)
+            context.signal("image_updated", self)
 
+        if not self._needs_update:
             self._processed_image = None
-            # self.processed_matrix = None
-            if context is None:
-                # Direct execution
-                self._needs_update = False
-                # Calculate scene step_x, step_y values
-                step = UNITS_PER_INCH / self.dpi
-                step_x = step
-                step_y = step
-                self.process_image(step_x, step_y, not self.prevent_crop)
-                # Unset cache.
-                self._cache = None
-            else:
-                self._update_thread = context.threaded(
-                    self._process_image_thread, result=clear, daemon=True
-                )
+        self._needs_update = True
+        # Replaces any stale request of this node which has not started yet.
+        image_pool.submit(self, self._process_image_thread, result=clear)
 
     def _process_image_thread(self):
         """
-        The function deletes the caches and processes the image until it no longer needs updating.
+        The function processes the image at the scene step values and deletes the caches.
 
         @return:
         """
-        while self._needs_update:
-            self._needs_update = False
-            # Calculate scene step_x, step_y values
-            step = UNITS_PER_INCH / self.dpi
-            step_x = step
-            step_y = step
-            self.process_image(step_x, step_y, not self.prevent_crop)
-            # Unset cache.
-            self._cache = None
+        # Calculate scene step_x, step_y values
+        step = UNITS_PER_INCH / self.dpi
+        step_x = step
+        step_y = step
+        self.process_image(step_x, step_y, not self.prevent_crop)
+        # Unset cache.
+        self._cache = None
+
+    def _process_key(self, step_x, step_y, crop):
+        """
+        Key of the processed image within the image cache. Consists of the source image digest and
+        every setting the processing depends upon.
+        """
+        m = self.matrix
+        return (
+            image_digest(self.image),
+            step_x,
+            step_y,
+            bool(crop),
+            (m.a, m.b, m.c, m.d, m.e, m.f),
+            self.invert,
+            self.dither,
+            self.dither_type,
+            self.red,
+            self.green,
+            self.blue,
+            self.lightness,
+            repr(self.operations),
+        )
 
     def process_image(self, step_x=None, step_y=None, crop=True):
         """
@@ -288,7 +341,19 @@ class ImageNode(Node):
         if step_y is None:
             step_y = self.step_y
         try:
-            actualized_matrix, image = self._process_image(step_x, step_y, crop=crop)
+            key = self._process_key(step_x, step_y, crop)
+            cached = image_cache.get(key)
+            if cached is None:
+                actualized_matrix, image = self._process_image(
+                    step_x, step_y, crop=crop
+                )
+                image_cache.put(
+                    key, (actualized_matrix, image, self.dither, self.dither_type)
+                )
+            else:
+                # The raster script may set the dither settings.
+                actualized_matrix, image, self.dither, self.dither_type = cached
+                actualized_matrix = Matrix(actualized_matrix)
             inverted_main_matrix = Matrix(self.matrix).inverse()
             self._processed_matrix = actualized_matrix * inverted_main_matrix
             self._processed_image = image
@@ -1,6 +1,10 @@
 from copy import copy
 
-from meerk40t.core.node.mixins import FunctionalParameter, Stroked
+from meerk40t.core.node.mixins import (
+    CachedGeometry,
+    FunctionalParameter,
+    Stroked,
+)
 from meerk40t.core.node.node import Fillrule, Linecap, Linejoin, Node
 from meerk40t.svgelements import (
     SVG_ATTR_VECTOR_EFFECT,
@@ -12,13 +16,14 @@ from meerk40t.svgelements import (
 from meerk40t.tools.geomstr import Geomstr
 
 
-class LineNode(Node, Stroked, FunctionalParameter):
+class LineNode(Node, Stroked, FunctionalParameter, CachedGeometry):
     """
     LineNode is the bootstrapped node type for the 'elem line' type.
     """
 
     def __init__(self, **kwargs):
-        shape = kwargs.get("shape")
+        # Only read here, the node does not keep the shape.
+        shape = kwargs.pop("shape", None)
         if shape is not None:
             if "x1" not in kwargs:
                 kwargs["x1"] = shape.x1
@@ -116,10 +121,11 @@ class LineNode(Node, Stroked, FunctionalParameter):
             stroke_width=self.stroke_width,
         )
 
-    def as_geometry(self, **kws):
-        path = Geomstr.lines(self.x1, self.y1, self.x2, self.y2)
-        path.transform(self.matrix)
-        return path
+    def _untransformed_geometry(self):
+        return Geomstr.lines(self.x1, self.y1, self.x2, self.y2)
+
+    def _geometry_key(self):
+        return self.x1, self.y1, self.x2, self.y2
 
     def scaled(self, sx, sy, ox, oy):
         """
@@ -141,6 +147,7 @@ class LineNode(Node, Stroked, FunctionalParameter):
                 y1 = oy + sy * d2
             return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
 
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
@@ -159,17 +166,7 @@ class LineNode(Node, Stroked, FunctionalParameter):
         self.notify_scaled(self, sx=sx, sy=sy, ox=ox, oy=oy)
 
     def bbox(self, transformed=True, with_stroke=False):
-        # self._sync_svg()
-        # bounds = self.shape.bbox(transformed=transformed, with_stroke=False)
-        # if bounds is None:
-        #     # degenerate paths can have no bounds.
-        #     return None
-        geometry = self.as_geometry()
-        if transformed:
-            bounds = geometry.bbox(mx=self.matrix)
-        else:
-            bounds = geometry.bbox()
-        xmin, ymin, xmax, ymax = bounds
+        xmin, ymin, xmax, ymax = self.geometry_bbox()
         if with_stroke:
             delta = float(self.implied_stroke_width) / 2.0
             return (
@@ -244,7 +241,7 @@ class LineNode(Node, Stroked, FunctionalParameter):
         return False
 
     def as_path(self):
-        geometry = self.as_geometry()
+        geometry = self.geometry_view()
         path = geometry.as_path()
         path.stroke = self.stroke
         path.fill = self.fill
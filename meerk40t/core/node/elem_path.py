@@ -1,6 +1,10 @@
 from copy import copy
 
-from meerk40t.core.node.mixins import FunctionalParameter, Stroked
+from meerk40t.core.node.mixins import (
+    CachedGeometry,
+    FunctionalParameter,
+    Stroked,
+)
 from meerk40t.core.node.node import Fillrule, Linecap, Linejoin, Node
 from meerk40t.svgelements import (
     SVG_ATTR_VECTOR_EFFECT,
@@ -10,7 +14,7 @@ from meerk40t.svgelements import (
 from meerk40t.tools.geomstr import Geomstr
 
 
-class PathNode(Node, Stroked, FunctionalParameter):
+class PathNode(Node, Stroked, FunctionalParameter, CachedGeometry):
     """
     PathNode is the bootstrapped node type for the 'elem path' type.
     """
@@ -23,7 +27,8 @@ class PathNode(Node, Stroked, FunctionalParameter):
             else:
                 kwargs["path"] = args[0]
         if "geometry" not in kwargs:
-            shape = kwargs.get("path")
+            # Only read here, the node does not keep the path.
+            shape = kwargs.pop("path", None)
             if shape is not None:
                 # path is type Path.
                 if "stroke" not in kwargs:
@@ -89,10 +94,11 @@ class PathNode(Node, Stroked, FunctionalParameter):
     def path(self, new_path):
         self.geometry = Geomstr.svg(new_path)
 
-    def as_geometry(self, **kws):
-        g = Geomstr(self.geometry)
-        g.transform(self.matrix)
-        return g
+    def _untransformed_geometry(self):
+        return self.geometry
+
+    def _geometry_key(self):
+        return id(self.geometry), self.geometry.index
 
     def scaled(self, sx, sy, ox, oy):
         """
@@ -114,6 +120,7 @@ class PathNode(Node, Stroked, FunctionalParameter):
                 y1 = oy + sy * d2
             return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
 
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
@@ -131,12 +138,7 @@ class PathNode(Node, Stroked, FunctionalParameter):
         self.notify_scaled(self, sx=sx, sy=sy, ox=ox, oy=oy)
 
     def bbox(self, transformed=True, with_stroke=False):
-        geometry = self.as_geometry()
-        if transformed:
-            bounds = geometry.bbox(mx=self.matrix)
-        else:
-            bounds = geometry.bbox()
-        xmin, ymin, xmax, ymax = bounds
+        xmin, ymin, xmax, ymax = self.geometry_bbox()
         if with_stroke:
             delta = float(self.implied_stroke_width) / 2.0
             return (
@@ -148,7 +150,7 @@ class PathNode(Node, Stroked, FunctionalParameter):
         return xmin, ymin, xmax, ymax
 
     def length(self):
-        g = self.as_geometry()
+        g = self.geometry_view()
         return g.length()
 
     def preprocess(self, context, matrix, plan):
@@ -192,7 +194,7 @@ class PathNode(Node, Stroked, FunctionalParameter):
         # self._points.append([cx, bounds[3], "bounds bottom_center"])
         # self._points.append([bounds[0], cy, "bounds center_left"])
         # self._points.append([bounds[2], cy, "bounds center_right"])
-        for seg in self.as_geometry().as_points():
+        for seg in self.geometry_view().as_points():
             self._points.append([seg.real, seg.imag, "point"])
 
     def update_point(self, index, point):
@@ -1,12 +1,12 @@
 from copy import copy
 
-from meerk40t.core.node.mixins import FunctionalParameter
+from meerk40t.core.node.mixins import CachedGeometry, FunctionalParameter
 from meerk40t.core.node.node import Node
 from meerk40t.svgelements import Matrix, Point
 from meerk40t.tools.geomstr import Geomstr
 
 
-class PointNode(Node, FunctionalParameter):
+class PointNode(Node, FunctionalParameter, CachedGeometry):
     """
     PointNode is the bootstrapped node type for the 'elem point' type.
     """
@@ -41,12 +41,14 @@ class PointNode(Node, FunctionalParameter):
         nd["fill"] = copy(self.fill)
         return PointNode(**nd)
 
-    def as_geometry(self, **kws):
+    def _untransformed_geometry(self):
         path = Geomstr()
         path.point(complex(self.x, self.y))
-        path.transform(self.matrix)
         return path
 
+    def _geometry_key(self):
+        return self.x, self.y
+
     @property
     def point(self):
         x = float(self.x)
@@ -1,6 +1,10 @@
 from copy import copy
 
-from meerk40t.core.node.mixins import FunctionalParameter, Stroked
+from meerk40t.core.node.mixins import (
+    CachedGeometry,
+    FunctionalParameter,
+    Stroked,
+)
 from meerk40t.core.node.node import Fillrule, Linecap, Linejoin, Node
 from meerk40t.svgelements import (
     SVG_ATTR_VECTOR_EFFECT,
@@ -13,7 +17,7 @@ from meerk40t.svgelements import (
 from meerk40t.tools.geomstr import Geomstr
 
 
-class PolylineNode(Node, Stroked, FunctionalParameter):
+class PolylineNode(Node, Stroked, FunctionalParameter, CachedGeometry):
     """
     PolylineNode is the bootstrapped node type for the 'elem polyline' type.
     """
@@ -36,7 +40,8 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
         if len(args) >= 2:
             # This is a points args.
             kwargs["geometry"] = Geomstr.lines(*args)
-        shape = kwargs.get("shape")
+        # Only read here, the node does not keep the shape.
+        shape = kwargs.pop("shape", None)
         if shape is not None:
             # We have a polyline shape.
             if "stroke" not in kwargs:
@@ -117,10 +122,11 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
     def shape(self, new_shape):
         self.geometry = Geomstr.svg(Path(new_shape))
 
-    def as_geometry(self, **kws):
-        g = Geomstr(self.geometry)
-        g.transform(self.matrix)
-        return g
+    def _untransformed_geometry(self):
+        return self.geometry
+
+    def _geometry_key(self):
+        return id(self.geometry), self.geometry.index
 
     def scaled(self, sx, sy, ox, oy):
         """
@@ -142,6 +148,7 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
                 y1 = oy + sy * d2
             return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
 
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
@@ -159,12 +166,7 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
         self.notify_scaled(self, sx=sx, sy=sy, ox=ox, oy=oy)
 
     def bbox(self, transformed=True, with_stroke=False):
-        geometry = self.as_geometry()
-        if transformed:
-            bounds = geometry.bbox(mx=self.matrix)
-        else:
-            bounds = geometry.bbox()
-        xmin, ymin, xmax, ymax = bounds
+        xmin, ymin, xmax, ymax = self.geometry_bbox()
         if with_stroke:
             delta = float(self.implied_stroke_width) / 2.0
             return (
@@ -176,7 +178,7 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
         return xmin, ymin, xmax, ymax
 
     def length(self):
-        geometry = self.as_geometry()
+        geometry = self.geometry_view()
         # Polylines have length === raw_length
         return geometry.raw_length()
 
@@ -221,7 +223,7 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
         # self._points.append([cx, bounds[3], "bounds bottom_center"])
         # self._points.append([bounds[0], cy, "bounds center_left"])
         # self._points.append([bounds[2], cy, "bounds center_right"])
-        points = list(self.as_geometry().as_points())
+        points = list(self.geometry_view().as_points())
 
         max_index = len(points) - 1
         for idx, pt in enumerate(points):
@@ -243,7 +245,7 @@ class PolylineNode(Node, Stroked, FunctionalParameter):
         return False
 
     def as_path(self):
-        geometry = self.as_geometry()
+        geometry = self.geometry_view()
         path = geometry.as_path()
         path.stroke = self.stroke
         path.fill = self.fill
@@ -1,7 +1,11 @@
 import math
 from copy import copy
 
-from meerk40t.core.node.mixins import FunctionalParameter, Stroked
+from meerk40t.core.node.mixins import (
+    CachedGeometry,
+    FunctionalParameter,
+    Stroked,
+)
 from meerk40t.core.node.node import Fillrule, Linejoin, Node
 from meerk40t.svgelements import (
     SVG_ATTR_VECTOR_EFFECT,
@@ -13,13 +17,14 @@ from meerk40t.svgelements import (
 from meerk40t.tools.geomstr import Geomstr
 
 
-class RectNode(Node, Stroked, FunctionalParameter):
+class RectNode(Node, Stroked, FunctionalParameter, CachedGeometry):
     """
     RectNode is the bootstrapped node type for the 'elem rect' type.
     """
 
     def __init__(self, **kwargs):
-        shape = kwargs.get("shape")
+        # Only read here, the node does not keep the shape.
+        shape = kwargs.pop("shape", None)
         if shape is not None:
             if "x" not in kwargs:
                 kwargs["x"] = shape.x
@@ -107,16 +112,17 @@ class RectNode(Node, Stroked, FunctionalParameter):
             stroke_width=self.stroke_width,
         )
 
-    def as_geometry(self, **kws):
+    def _untransformed_geometry(self):
         x = self.x
         y = self.y
         width = self.width
         height = self.height
         rx = self.rx
         ry = self.ry
-        path = Geomstr.rect(x, y, width, height, rx=rx, ry=ry)
-        path.transform(self.matrix)
-        return path
+        return Geomstr.rect(x, y, width, height, rx=rx, ry=ry)
+
+    def _geometry_key(self):
+        return self.x, self.y, self.width, self.height, self.rx, self.ry
 
     def scaled(self, sx, sy, ox, oy):
         """
@@ -138,6 +144,7 @@ class RectNode(Node, Stroked, FunctionalParameter):
                 y1 = oy + sy * d2
             return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
 
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
@@ -155,17 +162,7 @@ class RectNode(Node, Stroked, FunctionalParameter):
         self.notify_scaled(self, sx=sx, sy=sy, ox=ox, oy=oy)
 
     def bbox(self, transformed=True, with_stroke=False):
-        # self._sync_svg()
-        # bounds = self.shape.bbox(transformed=transformed, with_stroke=False)
-        # if bounds is None:
-        #     # degenerate paths can have no bounds.
-        #     return None
-        geometry = self.as_geometry()
-        if transformed:
-            bounds = geometry.bbox(mx=self.matrix)
-        else:
-            bounds = geometry.bbox()
-        xmin, ymin, xmax, ymax = bounds
+        xmin, ymin, xmax, ymax = self.geometry_bbox()
         if with_stroke:
             delta = float(self.implied_stroke_width) / 2.0
             return (
@@ -241,7 +238,7 @@ class RectNode(Node, Stroked, FunctionalParameter):
         return False
 
     def as_path(self):
-        geometry = self.as_geometry()
+        geometry = self.geometry_view()
         path = geometry.as_path()
         path.stroke = self.stroke
         path.fill = self.fill
@@ -5,9 +5,11 @@ basic functionality.
 The use of ABC allows @abstractmethod decorators which require any subclass to implement the required method.
 """
 
-from abc import ABC
+from abc import ABC, abstractmethod
 from math import sqrt
 
+from meerk40t.tools.geomstr import Geomstr
+
 
 class Stroked(ABC):
     """
@@ -105,3 +107,94 @@ class FunctionalParameter(ABC):
     def functional_parameter(self, value):
         if isinstance(value, (list, tuple)):
             self.mkparam = value
+
+
+class CachedGeometry(ABC):
+    """
+    Cached Geometry mixin keeps the geometry of the node transformed by its matrix, and the bounds of that geometry,
+    until the node changes. Nodes carry a geometry version which is bumped when they are modified, altered, translated
+    or scaled. The cache is keyed by that version, the matrix and the geometry key of the node, so attributes that are
+    changed without a notification are still picked up.
+
+    The node provides the untransformed geometry in _untransformed_geometry() and the values it is built from in
+    _geometry_key().
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._geometry_cache = None
+        super().__init__()
+
+    @abstractmethod
+    def _untransformed_geometry(self):
+        """
+        Geometry of the node without the matrix applied. It is copied before being transformed.
+
+        @return: Geomstr
+        """
+
+    def _geometry_key(self):
+        """
+        Values the untransformed geometry is built from.
+
+        @return: tuple
+        """
+        return ()
+
+    def _cached_geometry(self):
+        matrix = self.matrix
+        key = (
+            self._geometry_version,
+            matrix.a,
+            matrix.b,
+            matrix.c,
+            matrix.d,
+            matrix.e,
+            matrix.f,
+            self._geometry_key(),
+        )
+        cache = self._geometry_cache
+        if cache is not None and cache[0] == key:
+            return cache
+        geometry = Geomstr(self._untransformed_geometry())
+        geometry.transform(matrix)
+        geometry._trim()
+        geometry.segments.flags.writeable = False
+        cache = [key, geometry, None]
+        self._geometry_cache = cache
+        return cache
+
+    def geometry_view(self):
+        """
+        Read-only view of the transformed geometry of the node. The view shares its segments with the cached geometry,
+        changing the segments raises ValueError. Use as_geometry() for a geometry that may be changed.
+
+        @return: Geomstr
+        """
+        geometry = self._cached_geometry()[1]
+        view = Geomstr()
+        view._settings = dict(geometry._settings)
+        view.segments = geometry.segments
+        view.index = geometry.index
+        view.capacity = geometry.capacity
+        return view
+
+    def as_geometry(self, **kws):
+        """
+        Transformed geometry of the node, a copy which may be changed.
+
+        @return: Geomstr
+        """
+        geometry = Geomstr(self._cached_geometry()[1])
+        geometry.segments.flags.writeable = True
+        return geometry
+
+    def geometry_bbox(self):
+        """
+        Bounds of the transformed geometry of the node.
+
+        @return: xmin, ymin, xmax, ymax
+        """
+        cache = self._cached_geometry()
+        if cache[2] is None:
+            cache[2] = tuple(cache[1].bbox())
+        return cache[2]
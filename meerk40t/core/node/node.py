@@ -52,6 +52,10 @@ class Fillrule(IntEnum):
     FILLRULE_EVENODD = 1
 
 
+# Properties which only change the view of a node, not its undo state.
+VIEW_STATES = ("emphasized", "highlighted", "selected", "targeted")
+
+
 class Node:
     """
     Nodes are elements within the tree which stores most of the objects in Elements.
@@ -75,23 +79,32 @@ class Node:
     Nodes can be targeted.
     """
 
+    # Undo caches of the node, see meerk40t.core.undos.
+    _undo_key = None
+    _undo_prototype = None
+    _undo_record = None
+
     def __init__(self, *args, **kwargs):
         self.type = None
         self.id = None
         self.label = None
         self.lock = False
-        self._can_emphasize = True
-        self._can_highlight = True
-        self._can_target = True
-        self._can_move = True
-        self._can_scale = True
-        self._can_rotate = True
-        self._can_skew = True
-        self._can_modify = True
-        self._can_alter = True
-        self._can_update = True
-        self._can_remove = True
-        self._is_visible = True
+        # Private values are set directly, they do not pass through __setattr__.
+        self.__dict__.update(
+            _can_emphasize=True,
+            _can_highlight=True,
+            _can_target=True,
+            _can_move=True,
+            _can_scale=True,
+            _can_rotate=True,
+            _can_skew=True,
+            _can_modify=True,
+            _can_alter=True,
+            _can_update=True,
+            _can_remove=True,
+            _is_visible=True,
+            _geometry_version=0,
+        )
         for k, v in kwargs.items():
             if k.startswith("_"):
                 continue
@@ -106,31 +119,27 @@ class Node:
                 # If this is already an attribute, just add it to the node dict.
                 self.__dict__[k] = v
 
-        self._children = list()
-        self._root = None
-        self._parent = None
-        self._references = list()
-        self._formatter = "{element_type}:{id}"
-
-        self._points = list()
-        self._points_dirty = True
-
-        self._selected = False
-        self._emphasized = False
-        self._emphasized_time = None
-        self._highlighted = False
-        self._target = False
-
-        self._opened = False
-
-        self._bounds = None
-        self._bounds_dirty = True
-
-        self._paint_bounds = None
-        self._paint_bounds_dirty = True
-
-        self._item = None
-        self._cache = None
+        self.__dict__.update(
+            _children=list(),
+            _root=None,
+            _parent=None,
+            _references=list(),
+            _formatter="{element_type}:{id}",
+            _points=list(),
+            _points_dirty=True,
+            _selected=False,
+            _emphasized=False,
+            _emphasized_time=None,
+            _highlighted=False,
+            _target=False,
+            _opened=False,
+            _bounds=None,
+            _bounds_dirty=True,
+            _paint_bounds=None,
+            _paint_bounds_dirty=True,
+            _item=None,
+            _cache=None,
+        )
         super().__init__()
 
     def __repr__(self):
@@ -151,6 +160,39 @@ class Node:
                 f"mapping '{text}' did not contain a required key in {default_map} for {self.__class__}"
             ) from e
 
+    def __setattr__(self, key, value):
+        """
+        Setting a value drops the undo caches of the node, and reparenting drops the
+        undo records of the old and new parent.
+        """
+        if key[0] == "_":
+            if key != "_parent":
+                object.__setattr__(self, key, value)
+                return
+            parent = self.__dict__.get("_parent")
+            if parent is not None:
+                parent._invalidate_undo_record()
+            object.__setattr__(self, key, value)
+            if value is not None:
+                value._invalidate_undo_record()
+            return
+        object.__setattr__(self, key, value)
+        if (
+            self._undo_prototype is not None or self._undo_record is not None
+        ) and key not in VIEW_STATES:
+            self._undo_prototype = None
+            self._invalidate_undo_record()
+
+    def _invalidate_undo_record(self):
+        """
+        Drops the undo records of this node and its ancestors, whose records include the
+        structure below them.
+        """
+        node = self
+        while node is not None and node._undo_record is not None:
+            node._undo_record = None
+            node = node._parent
+
     def __eq__(self, other):
         return other is self
 
@@ -376,6 +418,7 @@ class Node:
         return self._paint_bounds
 
     def set_dirty_bounds(self):
+        self._geometry_version += 1
         self._paint_bounds_dirty = True
         self._bounds_dirty = True
         self._points_dirty = True
@@ -404,6 +447,7 @@ class Node:
         self._children.clear()
         self._children.extend(tree_data)
         self._validate_tree()
+        self.notify_structure_changed(self)
 
     def _validate_tree(self):
         for c in self._children:
@@ -748,6 +792,12 @@ class Node:
                 node = self
             self._parent.notify_collapse(node=node, **kwargs)
 
+    def notify_structure_changed(self, node=None, **kwargs):
+        if self._parent is not None:
+            if node is None:
+                node = self
+            self._parent.notify_structure_changed(node=node, **kwargs)
+
     def notify_reorder(self, node=None, **kwargs):
         if self._parent is not None:
             if node is None:
@@ -805,6 +855,7 @@ class Node:
         This is a special case of the modified call, we are translating
         the node without fundamentally altering its properties
         """
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
@@ -858,6 +909,7 @@ class Node:
                 y1 = oy + sy * d2
             return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
 
+        self._geometry_version += 1
         if self._bounds_dirty or self._bounds is None:
             # A pity but we need proper data
             self.modified()
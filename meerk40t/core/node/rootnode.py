@@ -197,6 +197,21 @@ class RootNode(Node):
             if hasattr(listen, "collapse"):
                 listen.collapse(node, **kwargs)
 
+    def notify_structure_changed(self, node=None, **kwargs):
+        """
+        Notifies any listeners that the structure below the node was replaced as a whole, such as a tree restored by
+        undo, without notifications for the single nodes.
+
+        @param node:
+        @param kwargs:
+        @return:
+        """
+        if node is None:
+            node = self
+        for listen in self.listeners:
+            if hasattr(listen, "structure_changed"):
+                listen.structure_changed(node, **kwargs)
+
     def notify_reorder(self, node=None, **kwargs):
         if node is None:
             node = self
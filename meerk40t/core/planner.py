@@ -127,6 +127,22 @@ def plugin(kernel, lifecycle=None):
                 "section": "_20_Reducing Movements",
                 "conditional": (context, "opt_reduce_travel"),
             },
+            {
+                "attr": "opt_spatial_index",
+                "object": context,
+                "default": False,
+                "type": bool,
+                "label": _("Use Spatial Index"),
+                "tip": _(
+                    "Find the nearest next burn with a spatial index over the burn endpoints "
+                    + "rather than comparing against every remaining burn. "
+                    + "The resulting burn order is the same, "
+                    + "but large designs with many segments are optimised much faster."
+                ),
+                "page": "Optimisations",
+                "section": "_20_Reducing Movements",
+                "conditional": (context, "opt_reduce_travel"),
+            },
             {
                 "attr": "opt_merge_passes",
                 "object": context,
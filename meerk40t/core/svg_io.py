@@ -4,13 +4,16 @@ This extension governs SVG loading and saving, registering both the load and the
 
 import ast
 import gzip
+import io
 import math
 import os
-from base64 import b64encode
-from io import BytesIO
-from xml.etree.ElementTree import Element, ElementTree, ParseError, SubElement
+import re
+import shutil
+import tempfile
+from xml.etree.ElementTree import ParseError
 
 from meerk40t.core.exceptions import BadFileError
+from meerk40t.core.node.elem_image import png_base64
 from meerk40t.core.node.node import Fillrule, Linecap, Linejoin
 
 from ..svgelements import (
@@ -167,6 +170,113 @@ def rulestr(fillrule):
         return "nonzero"
 
 
+def _escape_text(text):
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attrib(text):
+    text = _escape_text(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+class SVGStream:
+    """
+    Writes an xml document as it is built, rather than building the whole tree first.
+
+    Elements are created with subelement() and take attributes and text like ElementTree elements, until their
+    first child is created or a following element is created. An element is written once it is complete, so the
+    document is written in order and only the elements still open are held. The output is indented by one tab per
+    depth, the same as ElementTree would write the indented tree.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self._open = []
+
+    def element(self, tag):
+        """
+        Creates the root element.
+        """
+        element = SVGStreamElement(self, tag, 0)
+        self._open.append(element)
+        return element
+
+    def _subelement(self, parent, tag):
+        stack = self._open
+        while stack[-1] is not parent:
+            self._end(stack.pop())
+        if not parent.started:
+            parent.started = True
+            self.write(parent.start_tag() + ">")
+        self.write("\n" + "\t" * (parent.depth + 1))
+        element = SVGStreamElement(self, tag, parent.depth + 1)
+        stack.append(element)
+        return element
+
+    def _end(self, element):
+        if element.started:
+            self.write("\n" + "\t" * element.depth + f"</{element.tag}>")
+        elif element.text:
+            self.write(
+                f"{element.start_tag()}>{_escape_text(element.text)}</{element.tag}>"
+            )
+        else:
+            self.write(element.start_tag() + " />")
+
+    def close(self):
+        """
+        Writes the end of every open element.
+        """
+        stack = self._open
+        while stack:
+            self._end(stack.pop())
+
+
+class SVGStreamElement:
+    """
+    Element of an SVGStream.
+    """
+
+    def __init__(self, stream, tag, depth):
+        self.stream = stream
+        self.tag = tag
+        self.depth = depth
+        self.attrib = dict()
+        self.text = None
+        self.started = False
+
+    def set(self, key, value):
+        if self.started:
+            raise ValueError(f"<{self.tag}> was already written.")
+        self.attrib[key] = value
+
+    def get(self, key, default=None):
+        return self.attrib.get(key, default)
+
+    def subelement(self, tag):
+        return self.stream._subelement(self, tag)
+
+    def start_tag(self):
+        attributes = "".join(
+            f' {key}="{_escape_attrib(value)}"' for key, value in self.attrib.items()
+        )
+        return f"<{self.tag}{attributes}"
+
+
 class SVGWriter:
     @staticmethod
     def save_types():
@@ -177,7 +287,52 @@ class SVGWriter:
     @staticmethod
     def save(context, f, version="default"):
         # print (f"Version was set to '{version}'")
-        root = Element(SVG_NAME_TAG)
+        # The document is streamed into a temporary file replacing f once complete, a failing save keeps f intact.
+        directory, name = os.path.split(os.path.abspath(f))
+        handle, temp = tempfile.mkstemp(
+            prefix=f".{name}.", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(handle, "wb") as raw:
+                if f.lower().endswith("svgz"):
+                    output = io.TextIOWrapper(
+                        gzip.GzipFile(filename=name, mode="wb", fileobj=raw),
+                        encoding="us-ascii",
+                        errors="xmlcharrefreplace",
+                        newline="\n",
+                    )
+                else:
+                    output = io.TextIOWrapper(
+                        raw, encoding="us-ascii", errors="xmlcharrefreplace"
+                    )
+                with output:
+                    stream = SVGStream(output.write)
+                    SVGWriter._write_root(stream, context, version)
+                    stream.close()
+            SVGWriter._copy_mode(f, temp)
+            os.replace(temp, f)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _copy_mode(f, temp):
+        """
+        Gives the temporary file the permissions of the file it replaces, or of a new file.
+        """
+        try:
+            shutil.copymode(f, temp)
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp, 0o666 & ~umask)
+
+    @staticmethod
+    def _write_root(stream, context, version):
+        root = stream.element(SVG_NAME_TAG)
         root.set(SVG_ATTR_VERSION, SVG_VALUE_VERSION)
         root.set(SVG_ATTR_XMLNS, SVG_VALUE_XMLNS)
         root.set(SVG_ATTR_XMLNS_LINK, SVG_VALUE_XLINK)
@@ -217,17 +372,11 @@ class SVGWriter:
         if version != "plain":
             # If there is a note set then we save the note with the project.
             if elements.note is not None:
-                subelement = SubElement(root, "note")
+                subelement = root.subelement("note")
                 subelement.set(SVG_TAG_TEXT, str(elements.note))
 
         SVGWriter._write_tree(root, elements._tree, version)
 
-        SVGWriter._pretty_print(root)
-        tree = ElementTree(root)
-        if f.lower().endswith("svgz"):
-            f = gzip.open(f, "wb")
-        tree.write(f)
-
     @staticmethod
     def _write_tree(xml_tree, node_tree, version):
         # print (f"Write_tree with {version}")
@@ -262,7 +411,7 @@ class SVGWriter:
             return flag
 
         if c.type == "elem ellipse":
-            subelement = SubElement(xml_tree, SVG_TAG_ELLIPSE)
+            subelement = xml_tree.subelement(SVG_TAG_ELLIPSE)
             subelement.set(SVG_ATTR_CENTER_X, str(c.cx))
             subelement.set(SVG_ATTR_CENTER_Y, str(c.cy))
             subelement.set(SVG_ATTR_RADIUS_X, str(c.rx))
@@ -274,17 +423,13 @@ class SVGWriter:
                     f"matrix({t.a}, {t.b}, {t.c}, {t.d}, {t.e}, {t.f})",
                 )
         elif c.type in ("elem image", "image raster"):
-            subelement = SubElement(xml_tree, SVG_TAG_IMAGE)
-            stream = BytesIO()
-            try:
-                c.image.save(stream, format="PNG", dpi=(c.dpi, c.dpi))
-            except OSError:
-                # Edge condition if the original image was CMYK and never touched it can't encode to PNG
-                c.image.convert("RGBA").save(stream, format="PNG", dpi=(c.dpi, c.dpi))
-            subelement.set(
-                "xlink:href",
-                f"data:image/png;base64,{b64encode(stream.getvalue()).decode('utf8')}",
-            )
+            subelement = xml_tree.subelement(SVG_TAG_IMAGE)
+            if hasattr(c, "png_base64"):
+                # Image nodes keep the encoded image.
+                payload = c.png_base64()
+            else:
+                payload = png_base64(c.image, c.dpi)
+            subelement.set("xlink:href", f"data:image/png;base64,{payload}")
             subelement.set(SVG_ATTR_X, "0")
             subelement.set(SVG_ATTR_Y, "0")
             subelement.set(SVG_ATTR_WIDTH, str(c.image.width))
@@ -296,7 +441,7 @@ class SVGWriter:
                     f"matrix({t.a}, {t.b}, {t.c}, {t.d}, {t.e}, {t.f})",
                 )
         elif c.type == "elem line":
-            subelement = SubElement(xml_tree, SVG_TAG_LINE)
+            subelement = xml_tree.subelement(SVG_TAG_LINE)
             subelement.set(SVG_ATTR_X1, str(c.x1))
             subelement.set(SVG_ATTR_Y1, str(c.y1))
             subelement.set(SVG_ATTR_X2, str(c.x2))
@@ -309,7 +454,7 @@ class SVGWriter:
                 )
         elif c.type == "elem path":
             element = c.geometry.as_path()
-            subelement = SubElement(xml_tree, SVG_TAG_PATH)
+            subelement = xml_tree.subelement(SVG_TAG_PATH)
             subelement.set(SVG_ATTR_DATA, element.d(transformed=False))
             t = c.matrix
             if not t.is_identity():
@@ -318,7 +463,7 @@ class SVGWriter:
                     f"matrix({t.a}, {t.b}, {t.c}, {t.d}, {t.e}, {t.f})",
                 )
         elif c.type == "elem point":
-            subelement = SubElement(xml_tree, "element")
+            subelement = xml_tree.subelement("element")
             t = c.matrix
             if not t.is_identity():
                 subelement.set(
@@ -328,7 +473,7 @@ class SVGWriter:
             subelement.set("x", str(c.x))
             subelement.set("y", str(c.y))
         elif c.type == "elem polyline":
-            subelement = SubElement(xml_tree, SVG_TAG_POLYLINE)
+            subelement = xml_tree.subelement(SVG_TAG_POLYLINE)
             points = list(c.geometry.as_points())
             subelement.set(
                 SVG_ATTR_POINTS,
@@ -341,7 +486,7 @@ class SVGWriter:
                     f"matrix({t.a}, {t.b}, {t.c}, {t.d}, {t.e}, {t.f})",
                 )
         elif c.type == "elem rect":
-            subelement = SubElement(xml_tree, SVG_TAG_RECT)
+            subelement = xml_tree.subelement(SVG_TAG_RECT)
             subelement.set(SVG_ATTR_X, str(c.x))
             subelement.set(SVG_ATTR_Y, str(c.y))
             subelement.set(SVG_ATTR_RADIUS_X, str(c.rx))
@@ -355,7 +500,7 @@ class SVGWriter:
                     f"matrix({t.a}, {t.b}, {t.c}, {t.d}, {t.e}, {t.f})",
                 )
         elif c.type == "elem text":
-            subelement = SubElement(xml_tree, SVG_TAG_TEXT)
+            subelement = xml_tree.subelement(SVG_TAG_TEXT)
             subelement.text = c.text
             t = c.matrix
             if not t.is_identity():
@@ -393,14 +538,14 @@ class SVGWriter:
             element = c
         elif c.type == "group":
             # This is a structural group node of elements. Recurse call to write values.
-            group_element = SubElement(xml_tree, SVG_TAG_GROUP)
+            group_element = xml_tree.subelement(SVG_TAG_GROUP)
             if hasattr(c, "label") and c.label is not None and c.label != "":
                 group_element.set("inkscape:label", str(c.label))
             SVGWriter._write_elements(group_element, c, version)
             return
         elif c.type.startswith("effect"):
             # This is a structural group node of elements. Recurse call to write values.
-            group_element = SubElement(xml_tree, SVG_TAG_GROUP)
+            group_element = xml_tree.subelement(SVG_TAG_GROUP)
             SVGWriter._write_custom(group_element, c)
             SVGWriter._write_elements(group_element, c, version)
             return
@@ -410,7 +555,7 @@ class SVGWriter:
             if single_file_node():
                 SVGWriter._write_elements(xml_tree, c, version)
             else:
-                group_element = SubElement(xml_tree, SVG_TAG_GROUP)
+                group_element = xml_tree.subelement(SVG_TAG_GROUP)
                 if hasattr(c, "name") and c.name is not None and c.name != "":
                     group_element.set("inkscape:label", str(c.name))
                 SVGWriter._write_elements(group_element, c, version)
@@ -418,7 +563,7 @@ class SVGWriter:
         else:
             if version != "plain":
                 # This is a non-standard element. Save custom.
-                subelement = SubElement(xml_tree, "element")
+                subelement = xml_tree.subelement("element")
                 SVGWriter._write_custom(subelement, c)
                 return
 
@@ -535,7 +680,7 @@ class SVGWriter:
     @staticmethod
     def _write_regmarks(xml_tree, reg_tree, version):
         if len(reg_tree.children):
-            regmark = SubElement(xml_tree, SVG_TAG_GROUP)
+            regmark = xml_tree.subelement(SVG_TAG_GROUP)
             regmark.set("id", "regmarks")
             regmark.set("visibility", "hidden")
             SVGWriter._write_elements(regmark, reg_tree, version)
@@ -550,7 +695,7 @@ class SVGWriter:
         @return:
         """
         # All operations are groups.
-        subelement = SubElement(xml_tree, SVG_TAG_GROUP)
+        subelement = xml_tree.subelement(SVG_TAG_GROUP)
         subelement.set("type", str(node.type))
 
         if node.label is not None:
@@ -632,18 +777,6 @@ class SVGWriter:
         SVGWriter._write_references(subelement, node)
         subelement.set(SVG_ATTR_ID, str(node.id))
 
-    @staticmethod
-    def _pretty_print(current, parent=None, index=-1, depth=0):
-        for i, node in enumerate(current):
-            SVGWriter._pretty_print(node, current, i, depth + 1)
-        if parent is not None:
-            if index == 0:
-                parent.text = "\n" + ("\t" * depth)
-            else:
-                parent[index - 1].tail = "\n" + ("\t" * depth)
-            if index == len(parent) - 1:
-                current.tail = "\n" + ("\t" * (depth - 1))
-
 
 class SVGProcessor:
     """
@@ -687,20 +820,63 @@ class SVGProcessor:
         @param pathname:
         @return:
         """
+        file_node = self._file_node(pathname)
+        self.parse(svg, file_node, self.element_list, branch="elements")
+        self._process_operations()
+
+    def process_stream(self, source, pathname, **kwargs):
+        """
+        Parses the svg source incrementally, sending the svgelements objects to parse as soon as they are read rather
+        than once the whole svg is read, so the svgelements objects of the file are never held at once. The svg may
+        not contain <use> objects.
+
+        If the source fails to parse, the nodes already created are removed.
+
+        @param source: svg file or stream
+        @param pathname:
+        @param kwargs: SVG.parse arguments
+        @return:
+        """
+        file_node = self._file_node(pathname)
+
+        def stream(svg):
+            self.parse(svg, file_node, self.element_list, branch="elements")
+
+        try:
+            SVG.parse(source, stream=stream, **kwargs)
+        except ParseError:
+            for node in reversed(self.operation_list + self.regmark_list):
+                if node.parent is not None:
+                    node.remove_node(fast=True)
+            file_node.remove_node(fast=True)
+            raise
+        self._process_operations()
+
+    def _file_node(self, pathname):
         self.pathname = pathname
 
         context_node = self.elements.elem_branch
         file_node = context_node.add(type="file", filepath=pathname)
         file_node.focus()
+        return file_node
 
-        self.parse(svg, file_node, self.element_list, branch="elements")
+    def _process_operations(self):
+        """
+        Replaces the operations with the loaded operations, setting their references, else classifies the loaded
+        elements.
 
+        @return:
+        """
         if self.load_operations and self.operations_replaced:
             for child in list(self.elements.op_branch.children):
                 if not hasattr(child, "_ref_load"):
                     child.remove_all_children(fast=True, destroy=True)
                     child.remove_node(fast=True, destroy=True)
             self.elements.undo.mark("op-replaced")
+            # Several elements may share an id.
+            element_ids = dict()
+            for e in self.element_list:
+                element_ids.setdefault(e.id, []).append(e)
             for op in self.elements.op_branch.flat():
                 try:
                     refs = op._ref_load
@@ -713,9 +889,8 @@ class SVGProcessor:
                 self.requires_classification = False
 
                 for ref in refs.split(" "):
-                    for e in self.element_list:
-                        if e.id == ref:
-                            op.add_reference(e)
+                    for e in element_ids.get(ref, ()):
+                        op.add_reference(e)
 
         if self.requires_classification and self.elements.classify_new:
             self.elements.classify(self.element_list)
@@ -1432,7 +1607,8 @@ class SVGProcessor:
             context_node = context_node.add(
                 type=e_type, id=ident, label=_label, **e_dict
             )
-            context_node._ref_load = element.values.get("references")
+            # Own references only, values also inherit those of the enclosing operation.
+            context_node._ref_load = element.values["attributes"].get("references")
             e_list.append(context_node)
             if hasattr(context_node, "validate"):
                 context_node.validate()
@@ -1461,6 +1637,86 @@ class SVGProcessor:
             self._parse_element(element, ident, _label, _lock, context_node, e_list)
 
 
+_SVG_USE = re.compile(rb"<(?:[\w.-]+:)?use[\s/>]")
+
+
+def svg_uses(pathname, chunk_size=0x100000):
+    """
+    Checks whether the svg file may contain <use> objects, without parsing it.
+
+    @param pathname: svg or svgz file
+    @param chunk_size: bytes read at once
+    @return: whether a use tag was found
+    """
+    if pathname.lower().endswith("svgz"):
+        source = gzip.open(pathname, "rb")
+    else:
+        source = open(pathname, "rb")
+    with source:
+        tail = b""
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return False
+            if _SVG_USE.search(tail + chunk):
+                return True
+            tail = chunk[-64:]
+
+
+def load_svg(context, elements_service, pathname, load_operations, **kwargs):
+    """
+    Loads the svg file. Files without <use> objects are parsed incrementally, see SVGProcessor.process_stream.
+
+    @param context:
+    @param elements_service:
+    @param pathname:
+    @param load_operations: whether operations are loaded
+    @param kwargs: loader settings
+    @return:
+    """
+    if "svg_ppi" in kwargs:
+        ppi = float(kwargs["svg_ppi"])
+    else:
+        ppi = DEFAULT_PPI
+    if ppi == 0:
+        ppi = DEFAULT_PPI
+    scale_factor = NATIVE_UNIT_PER_INCH / ppi
+    if context.elements.svg_viewport_bed:
+        width = Length(amount=context.device.view.unit_width).length_mm
+        height = Length(amount=context.device.view.unit_height).length_mm
+    else:
+        width = None
+        height = None
+    # The color attribute of SVG.parse decides which default color
+    # a stroke / fill will get if the attribute "currentColor" is
+    # set - we opt for "black"
+    parse_args = dict(
+        reify=False,
+        width=width,
+        height=height,
+        ppi=ppi,
+        color="black",
+        transform=f"scale({scale_factor})",
+    )
+    stream = not svg_uses(pathname)
+    source = pathname
+    if pathname.lower().endswith("svgz"):
+        source = gzip.open(pathname, "rb")
+    svg_processor = SVGProcessor(elements_service, load_operations)
+    if stream:
+        try:
+            svg_processor.process_stream(source, pathname, **parse_args)
+        except ParseError as e:
+            raise BadFileError(str(e)) from e
+        return True
+    try:
+        svg = SVG.parse(source=source, **parse_args)
+    except ParseError as e:
+        raise BadFileError(str(e)) from e
+    svg_processor.process(svg, pathname)
+    return True
+
+
 class SVGLoader:
     """
     SVG loader - loading elements, regmarks and operations
@@ -1472,40 +1728,7 @@ class SVGLoader:
 
     @staticmethod
     def load(context, elements_service, pathname, **kwargs):
-        if "svg_ppi" in kwargs:
-            ppi = float(kwargs["svg_ppi"])
-        else:
-            ppi = DEFAULT_PPI
-        if ppi == 0:
-            ppi = DEFAULT_PPI
-        scale_factor = NATIVE_UNIT_PER_INCH / ppi
-        source = pathname
-        if pathname.lower().endswith("svgz"):
-            source = gzip.open(pathname, "rb")
-        try:
-            if context.elements.svg_viewport_bed:
-                width = Length(amount=context.device.view.unit_width).length_mm
-                height = Length(amount=context.device.view.unit_height).length_mm
-            else:
-                width = None
-                height = None
-            # The color attribute of SVG.parse decides which default color
-            # a stroke / fill will get if the attribute "currentColor" is
-            # set - we opt for "black"
-            svg = SVG.parse(
-                source=source,
-                reify=False,
-                width=width,
-                height=height,
-                ppi=ppi,
-                color="black",
-                transform=f"scale({scale_factor})",
-            )
-        except ParseError as e:
-            raise BadFileError(str(e)) from e
-        svg_processor = SVGProcessor(elements_service, True)
-        svg_processor.process(svg, pathname)
-        return True
+        return load_svg(context, elements_service, pathname, True, **kwargs)
 
 
 class SVGLoaderPlain:
@@ -1519,37 +1742,4 @@ class SVGLoaderPlain:
 
     @staticmethod
     def load(context, elements_service, pathname, **kwargs):
-        if "svg_ppi" in kwargs:
-            ppi = float(kwargs["svg_ppi"])
-        else:
-            ppi = DEFAULT_PPI
-        if ppi == 0:
-            ppi = DEFAULT_PPI
-        scale_factor = NATIVE_UNIT_PER_INCH / ppi
-        source = pathname
-        if pathname.lower().endswith("svgz"):
-            source = gzip.open(pathname, "rb")
-        try:
-            if context.elements.svg_viewport_bed:
-                width = Length(amount=context.device.view.unit_width).length_mm
-                height = Length(amount=context.device.view.unit_height).length_mm
-            else:
-                width = None
-                height = None
-            # The color attribute of SVG.parse decides which default color
-            # a stroke / fill will get if the attribute "currentColor" is
-            # set - we opt for "black"
-            svg = SVG.parse(
-                source=source,
-                reify=False,
-                width=width,
-                height=height,
-                ppi=ppi,
-                color="black",
-                transform=f"scale({scale_factor})",
-            )
-        except ParseError as e:
-            raise BadFileError(str(e)) from e
-        svg_processor = SVGProcessor(elements_service, False)
-        svg_processor.process(svg, pathname)
-        return True
+        return load_svg(context, elements_service, pathname, False, **kwargs)
@@ -4,8 +4,59 @@ Undo States
 The undo class centralizes the undo stack and related commands. It's passed the
 rootnode of the tree and can perform marks to save the current tree states and will
 execute undo and redo operations for the tree.
+
+Undo states share unchanged nodes and subtrees. A state is the record of the tree root,
+and the record of a node is (prototype, key, referenced key, child records), with a
+copied prototype of the node. Records and prototypes are cached on the live nodes and
+shared by every state until the node changes. Tree notifications and attributes set on
+a node drop its prototype, and any change drops the records of the node and its
+ancestors. So a mark only visits the nodes changed since the previous mark and their
+ancestors, and only copies the changed nodes. Restoring a state reuses the live nodes
+still matching their prototype. The stack is trimmed from the oldest state when it
+exceeds the configured memory budget or number of levels.
 """
 import threading
+from copy import copy
+from itertools import count
+
+# Estimated overhead of a node prototype and of one record, in bytes.
+NODE_OVERHEAD = 1024
+ENTRY_OVERHEAD = 96
+
+# Keys identify the nodes of the records, references are restored by key.
+_keys = count(1)
+
+
+def _estimate_size(node):
+    """
+    Estimates the memory held by the given node prototype.
+
+    @param node:
+    @return: estimated size in bytes
+    """
+    size = NODE_OVERHEAD
+    for value in node.__dict__.values():
+        if value is None or isinstance(value, (bool, int, float, str)):
+            continue
+        try:
+            # numpy arrays
+            size += value.nbytes
+            continue
+        except AttributeError:
+            pass
+        try:
+            # Geomstr
+            size += value.segments.nbytes
+            continue
+        except AttributeError:
+            pass
+        try:
+            # PIL images
+            width, height = value.size
+            size += width * height * len(value.getbands())
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return size
 
 
 class UndoState:
@@ -20,18 +71,233 @@ class UndoState:
 
 
 class Undo:
-    def __init__(self, service, tree):
+    def __init__(self, service, tree, levels=0, budget=0):
+        """
+        @param service: service to signal undo and redo changes.
+        @param tree: rootnode of the tree.
+        @param levels: maximum number of states kept, 0 for unlimited.
+        @param budget: maximum estimated memory of the states in bytes, 0 for unlimited.
+        """
         self.service = service
         self.tree = tree
+        self.levels = levels
+        self.budget = budget
         self._lock = threading.Lock()
         self._undo_stack = []
         self._undo_index = -1
+        # id(record) -> [record, reference count]
+        self._records = dict()
+        # id(prototype) -> [prototype, reference count, estimated size]
+        self._prototypes = dict()
+        self._memory = 0
+        # Nodes whose records were built and nodes copied, by marks and restores.
+        self.visited = 0
+        self.copied = 0
+        tree.listen(self)
         self.mark("init")  # Set initial tree state.
         self.message = None
 
     def __str__(self):
         return f"Undo(#{self._undo_index} in list of {len(self._undo_stack)} states)"
 
+    # ------------------------------------------------------------------------
+    # Tree listener, changed nodes need a new prototype on the next mark.
+
+    @staticmethod
+    def _invalidate(node):
+        node._invalidate_undo_record()
+        nodes = [node]
+        while nodes:
+            n = nodes.pop()
+            n._undo_prototype = None
+            n._undo_record = None
+            nodes.extend(n._children)
+
+    def altered(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def modified(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def translated(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def scaled(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def node_changed(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def update(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def node_attached(self, node, *args, **kwargs):
+        self._invalidate(node)
+
+    def reorder(self, node, *args, **kwargs):
+        node._invalidate_undo_record()
+
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(node):
+        key = node._undo_key
+        if key is None:
+            key = next(_keys)
+            node._undo_key = key
+        return key
+
+    def _record(self, node):
+        """
+        Gives the record of the node, building it only if the node or its descendants
+        changed since their records were built.
+        """
+        record = node._undo_record
+        if record is not None:
+            return record
+        self.visited += 1
+        prototype = node._undo_prototype
+        if prototype is None:
+            prototype = copy(node)
+            if node.type == "reference":
+                # Relinked on restore, do not keep the referenced node alive.
+                prototype.node = None
+            node._undo_prototype = prototype
+            self.copied += 1
+        ref_key = None
+        if node.type == "reference" and node.node is not None:
+            ref_key = self._key(node.node)
+        children = tuple(self._record(c) for c in node._children)
+        record = (prototype, self._key(node), ref_key, children)
+        node._undo_record = record
+        return record
+
+    def _snapshot(self):
+        """
+        Records the tree, sharing the records of unchanged subtrees.
+
+        @return: record of the tree root, without a prototype.
+        """
+        tree = self.tree
+        record = tree._undo_record
+        if record is None:
+            children = tuple(self._record(c) for c in tree._children)
+            record = (None, None, None, children)
+            tree._undo_record = record
+        return record
+
+    def _restore(self, state):
+        """
+        Rebuilds the tree from the given state. Live nodes which still match their
+        prototype are reused, other nodes are fresh copies of the prototypes.
+        """
+        root = self.tree
+        live = dict()
+        for node in root.flat():
+            if node._undo_prototype is not None:
+                live[node._undo_key] = node
+        restored = []
+        nodes = dict()
+        branches = []
+        stack = [(record, None) for record in reversed(state[3])]
+        while stack:
+            record, parent = stack.pop()
+            prototype, key, ref_key, children = record
+            node = live.pop(key, None)
+            if node is None or node._undo_prototype is not prototype:
+                node = copy(prototype)
+                node._undo_key = key
+                self.copied += 1
+            else:
+                node._children = list()
+                node._references = list()
+                node._item = None
+            node._root = root
+            if parent is None:
+                node._parent = root
+                branches.append(node)
+            else:
+                node._parent = parent
+                parent._children.append(node)
+            nodes[key] = node
+            restored.append((node, record))
+            stack.extend((child, node) for child in reversed(children))
+        for node, record in restored:
+            ref_key = record[2]
+            if ref_key is None:
+                continue
+            referenced = nodes.get(ref_key)
+            if referenced is None:
+                # The referenced node was not part of the tree.
+                node._parent._children.remove(node)
+                continue
+            node.node = referenced
+            referenced._references.append(node)
+        # Linking dropped the caches, the restored nodes match their records.
+        for node, record in restored:
+            node._undo_prototype = record[0]
+            node._undo_record = record
+        self.tree.restore_tree(branches)
+        root._undo_record = state
+
+    def _account(self, undo_state, count):
+        """
+        Adds (count=1) or removes (count=-1) the given state from the memory account.
+        Records shared with other states are only accounted once.
+        """
+        records = self._records
+        prototypes = self._prototypes
+        stack = [undo_state.state]
+        while stack:
+            record = stack.pop()
+            key = id(record)
+            entry = records.get(key)
+            if count > 0:
+                if entry is not None:
+                    entry[1] += 1
+                    continue
+                records[key] = [record, 1]
+            else:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    continue
+                del records[key]
+            self._memory += count * ENTRY_OVERHEAD
+            stack.extend(record[3])
+            prototype = record[0]
+            if prototype is None:
+                continue
+            key = id(prototype)
+            entry = prototypes.get(key)
+            if entry is None:
+                size = _estimate_size(prototype)
+                prototypes[key] = [prototype, 1, size]
+                self._memory += size
+                continue
+            entry[1] += count
+            if entry[1] <= 0:
+                del prototypes[key]
+                self._memory -= entry[2]
+
+    def _trim(self):
+        """
+        Evicts the oldest states while the stack exceeds the levels or memory budget.
+        The current state is never evicted.
+        """
+        while self._undo_index > 0 and (
+            (self.levels and len(self._undo_stack) > self.levels)
+            or (self.budget and self._memory > self.budget)
+        ):
+            self._account(self._undo_stack.pop(0), -1)
+            self._undo_index -= 1
+
+    @property
+    def memory(self):
+        """
+        Estimated memory held by the undo states in bytes.
+        """
+        return self._memory
+
     def mark(self, message=None):
         """
         Marks an undo state require a backup the tree information.
@@ -45,14 +311,17 @@ class Undo:
             if message is None:
                 message = self.message
             try:
-                self._undo_stack.insert(
-                    self._undo_index,
-                    UndoState(self.tree.backup_tree(), message=message),
-                )
+                undo_state = UndoState(self._snapshot(), message=message)
             except KeyError:
                 # Hit a concurrent issue.
-                pass
+                self._undo_index -= 1
+            else:
+                self._undo_stack.insert(self._undo_index, undo_state)
+                self._account(undo_state, 1)
+            for undo_state in self._undo_stack[self._undo_index + 1 :]:
+                self._account(undo_state, -1)
             del self._undo_stack[self._undo_index + 1 :]
+            self._trim()
             self.message = None
         self.service.signal("undoredo")
 
@@ -60,8 +329,7 @@ class Undo:
         """
         Performs an undo operation restoring the tree state.
 
-        Note: because the undo.state is used directly, the UndoState's state must be
-        given a fresh copy.
+        Note: the restored nodes are fresh copies of the state's prototypes.
         @return:
         """
         with self._lock:
@@ -78,11 +346,7 @@ class Undo:
                 # Invalid? Reset to bottom of stack
                 self._undo_index = 0
                 return False
-            self.tree.restore_tree(undo.state)
-            try:
-                undo.state = self.tree.backup_tree()  # Get unused copy
-            except KeyError:
-                pass
+            self._restore(undo.state)
             self.service.signal("undoredo")
             return True
 
@@ -100,11 +364,7 @@ class Undo:
                 # Invalid? Reset to top of stack
                 self._undo_index = len(self._undo_stack)
                 return False
-            self.tree.restore_tree(redo.state)
-            try:
-                redo.state = self.tree.backup_tree()  # Get unused copy
-            except KeyError:
-                pass
+            self._restore(redo.state)
             self.service.signal("undoredo")
             return True
 
@@ -5,6 +5,7 @@ from meerk40t.core.node.elem_path import PathNode
 from meerk40t.core.units import UNITS_PER_PIXEL, Length
 from meerk40t.kernel import get_safe_path
 from meerk40t.svgelements import Arc, Color, Path
+from meerk40t.tools.fontcache import font_cache
 from meerk40t.tools.jhfparser import JhfFont
 from meerk40t.tools.shxparser import ShxFont, ShxFontParseError
 from meerk40t.tools.ttfparser import TrueTypeFont
@@ -135,12 +136,13 @@ def update_linetext(context, node, newtext):
         # print ("unknown fonttype, exit")
         return
     # print("Nearly there, all fonts checked...")
-    cfont = fontclass(font_path)
     path = FontPath()
     # print (f"Path={path}, text={remainder}, font-size={font_size}")
     horizontal = True
     mytext = context.elements.wordlist_translate(newtext)
-    cfont.render(path, mytext, horizontal, float(fontsize))
+    with font_cache.lock:
+        cfont = font_cache.get(fontclass, font_path)
+        cfont.render(path, mytext, horizontal, float(fontsize))
     olda = node.path.transform.a
     oldb = node.path.transform.b
     oldc = node.path.transform.c
@@ -239,11 +241,12 @@ def create_linetext_node(context, x, y, text, font=None, font_size=None):
         return None
     horizontal = True
     try:
-        cfont = fontclass(font_path)
         path = FontPath()
         # print (f"Path={path}, text={remainder}, font-size={font_size}")
         mytext = context.elements.wordlist_translate(text)
-        cfont.render(path, mytext, horizontal, float(font_size))
+        with font_cache.lock:
+            cfont = font_cache.get(fontclass, font_path)
+            cfont.render(path, mytext, horizontal, float(font_size))
     except ShxFontParseError as e:
         # print(f"FontParseError {e.args}")
         return
@@ -324,9 +327,10 @@ def plugin(kernel, lifecycle):
             y = float(font_size)
 
             try:
-                font = ShxFont(font_path)
                 path = FontPath()
-                font.render(path, remainder, True, float(font_size))
+                with font_cache.lock:
+                    cfont = font_cache.get(ShxFont, font_path)
+                    cfont.render(path, remainder, True, float(font_size))
             except ShxFontParseError as e:
                 channel(f"{e.args}")
                 return
@@ -15,11 +15,15 @@ import ast
 import re
 import threading
 import time
+from collections import deque
 
 from meerk40t.kernel import signal_listener
 
 SETTINGS_MESSAGE = re.compile(r"^\$([0-9]+)=(.*)")
 
+# Minimum seconds between two grbl;buffer signals while streaming.
+BUFFER_SIGNAL_INTERVAL = 0.1
+
 
 def hardware_settings(code):
     """
@@ -242,6 +246,7 @@ class GrblController:
     def __init__(self, context):
         self.service = context
         self.connection = None
+        self._loop_cond = threading.Condition()
         self._validation_stage = 0
 
         self.update_connection()
@@ -253,15 +258,17 @@ class GrblController:
         self._recving_thread = None
 
         self._forward_lock = threading.Lock()
-        self._sending_lock = threading.Lock()
-        self._realtime_lock = threading.Lock()
-        self._loop_cond = threading.Condition()
-        self._sending_queue = []
-        self._realtime_queue = []
+        # Queued lines, encoded as they are written.
+        self._sending_queue = deque()
+        self._realtime_queue = deque()
         # buffer for feedback...
         self._assembled_response = []
-        self._forward_buffer = bytearray()
+        # Lines sent but not yet acknowledged, and the number of characters in flight.
+        self._forward_lines = deque()
+        self._forward_partial = b""
+        self._forward_size = 0
         self._device_buffer_size = self.service.planning_buffer_size
+        self._buffer_signal_time = 0.0
         self._log = None
 
         self._paused = False
@@ -273,36 +280,29 @@ class GrblController:
 
     def __len__(self):
         return (
-            len(self._sending_queue)
-            + len(self._realtime_queue)
-            + len(self._forward_buffer)
+            len(self._sending_queue) + len(self._realtime_queue) + self._forward_size
         )
 
+    @property
+    def _validation_stage(self):
+        return self._validation
+
+    @_validation_stage.setter
+    def _validation_stage(self, stage):
+        self._validation = stage
+        # Sending waits while not fully validated.
+        self._send_resume()
+
     @property
     def _length_of_next_line(self):
         """
         Lookahead and provide length of the next line.
         @return:
         """
-        if not self._sending_queue:
-            return 0
-        return len(self._sending_queue[0])
-
-    @property
-    def _index_of_forward_line(self):
-        try:
-            r = self._forward_buffer.index(b"\r")
-        except ValueError:
-            r = -1
         try:
-            n = self._forward_buffer.index(b"\n")
-        except ValueError:
-            n = -1
-
-        if n != -1:
-            return min(n, r) if r != -1 else n
-        else:
-            return r
+            return len(self._sending_queue[0])
+        except IndexError:
+            return 0
 
     @signal_listener("update_interface")
     def update_connection(self, origin=None, *args):
@@ -395,11 +395,10 @@ class GrblController:
         """
         self.start()
         self.service.signal("grbl;write", data)
-        with self._sending_lock:
-            self._sending_queue.append(data)
-        self.service.signal(
-            "grbl;buffer", len(self._sending_queue) + len(self._realtime_queue)
-        )
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._sending_queue.append(data)
+        self._signal_buffer()
         self._send_resume()
 
     def realtime(self, data):
@@ -413,15 +412,28 @@ class GrblController:
         """
         self.start()
         self.service.signal("grbl;write", data)
-        with self._realtime_lock:
-            self._realtime_queue.append(data)
-        if "\x18" in data:
-            with self._sending_lock:
-                self._sending_queue.clear()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._realtime_queue.append(data)
+        if b"\x18" in data:
+            self._sending_queue.clear()
+        self._signal_buffer()
+        self._send_resume()
+
+    def _signal_buffer(self, force=False):
+        """
+        Signal the number of queued lines, at most once per BUFFER_SIGNAL_INTERVAL unless forced.
+
+        @param force:
+        @return:
+        """
+        now = time.time()
+        if not force and now - self._buffer_signal_time < BUFFER_SIGNAL_INTERVAL:
+            return
+        self._buffer_signal_time = now
         self.service.signal(
             "grbl;buffer", len(self._sending_queue) + len(self._realtime_queue)
         )
-        self._send_resume()
 
     ####################
     # Control GRBL Sender
@@ -456,7 +468,8 @@ class GrblController:
 
     def shutdown(self):
         self.is_shutdown = True
-        self._forward_buffer.clear()
+        self._forward_clear()
+        self._send_resume()
 
     def validate_start(self, cmd):
         if cmd == "$":
@@ -482,10 +495,9 @@ class GrblController:
             return
         self.service(f".timer-{name}{cmd} -q --off")
         if cmd == "$":
-            if len(self._forward_buffer) > 3:
+            if self._forward_size > 3:
                 # If the forward planning buffer is longer than 3 it must have filled with failed attempts.
-                with self._forward_lock:
-                    self._forward_buffer.clear()
+                self._forward_clear()
 
     def _rstop(self, *args):
         self._recving_thread = None
@@ -510,17 +522,43 @@ class GrblController:
     # GRBL SEND ROUTINES
     ####################
 
-    def _send(self, line):
+    def _send(self, line, forward=True):
         """
         Write the line to the connection, announce it to the send channel, and add it to the forward buffer.
 
-        @param line:
+        @param line: encoded line
+        @param forward: whether the line is stored in the device buffer and will be acknowledged
         @return:
         """
-        with self._forward_lock:
-            self._forward_buffer += bytes(line, encoding="latin-1")
+        if forward:
+            self._forward(line)
         self.connection.write(line)
-        self.log(line, type="send")
+        self.log(line.decode("utf-8"), type="send")
+
+    def _forward(self, data):
+        """
+        Account for the data as in flight. Each complete line is acknowledged by one ok or error
+        and characters not ending in a line remain pending until their line is completed.
+
+        @param data:
+        @return:
+        """
+        with self._forward_lock:
+            self._forward_size += len(data)
+            if self._forward_partial:
+                data = self._forward_partial + data
+                self._forward_partial = b""
+            for line in data.splitlines(keepends=True):
+                if line.endswith((b"\n", b"\r")):
+                    self._forward_lines.append(line)
+                else:
+                    self._forward_partial = line
+
+    def _forward_clear(self):
+        with self._forward_lock:
+            self._forward_lines.clear()
+            self._forward_partial = b""
+            self._forward_size = 0
 
     def _sending_realtime(self):
         """
@@ -528,18 +566,19 @@ class GrblController:
 
         @return:
         """
-        with self._realtime_lock:
-            line = self._realtime_queue.pop(0)
-        if "!" in line:
+        try:
+            line = self._realtime_queue.popleft()
+        except IndexError:
+            return
+        if b"!" in line:
             self._paused = True
-        if "~" in line:
+        if b"~" in line:
             self._paused = False
-        if line is not None:
-            self._send(line)
-        if "\x18" in line:
+        # Realtime characters are not stored in the device buffer, realtime lines are.
+        self._send(line, forward=line.endswith((b"\n", b"\r")))
+        if b"\x18" in line:
             self._paused = False
-            with self._forward_lock:
-                self._forward_buffer.clear()
+            self._forward_clear()
 
     def _sending_single_line(self):
         """
@@ -547,19 +586,44 @@ class GrblController:
 
         @return:
         """
-        with self._sending_lock:
-            line = self._sending_queue.pop(0)
+        try:
+            line = self._sending_queue.popleft()
+        except IndexError:
+            return False
         if line:
             self._send(line)
-        self.service.signal("grbl;buffer", len(self._sending_queue))
+        self._signal_buffer()
         return True
 
+    def _line_permitted(self):
+        """
+        Whether the next line of the sending queue may be sent now.
+
+        @return:
+        """
+        if self._paused or not self.fully_validated() or not self._sending_queue:
+            return False
+        buffer = self._forward_size
+        if self.service.buffer_mode == "sync":
+            # Any buffer is too much buffer.
+            return not buffer
+        # Stop sending when buffer is the size of permitted buffer size.
+        return buffer + self._length_of_next_line < self._device_buffer_size
+
     def _send_halt(self):
         """
-        This is called internally in the _sending command.
+        This is called internally in the _sending command. Waits until there is something that can be
+        sent, rechecked under the lock so that no resume is missed.
         @return:
         """
         with self._loop_cond:
+            if (
+                self._realtime_queue
+                or self._line_permitted()
+                or self.is_shutdown
+                or not self.connection.connected
+            ):
+                return
             self._loop_cond.wait()
 
     def _send_resume(self):
@@ -584,32 +648,23 @@ class GrblController:
                 # Send realtime data.
                 self._sending_realtime()
                 continue
+            if self._line_permitted():
+                # Go for send_line
+                self._sending_single_line()
+                continue
             if self._paused or not self.fully_validated():
                 # We are paused or invalid. We do not send anything other than realtime commands.
-                time.sleep(0.05)
-                continue
-            if not self._sending_queue:
+                self._signal_buffer()
+            elif not self._sending_queue:
                 # There is nothing to write/realtime
                 self.service.laser_status = "idle"
-                self._send_halt()
-                continue
-            buffer = len(self._forward_buffer)
-            if buffer:
-                self.service.laser_status = "active"
-
-            if self.service.buffer_mode == "sync":
-                if buffer:
-                    # Any buffer is too much buffer. Halt.
-                    self._send_halt()
-                    continue
+                self._signal_buffer(force=True)
             else:
-                # Buffered
-                if self._device_buffer_size <= buffer + self._length_of_next_line:
-                    # Stop sending when buffer is the size of permitted buffer size.
-                    self._send_halt()
-                    continue
-            # Go for send_line
-            self._sending_single_line()
+                # The device buffer is full.
+                self.service.laser_status = "active"
+            if self.is_shutdown:
+                break
+            self._send_halt()
         self.service.laser_status = "idle"
 
     ####################
@@ -623,12 +678,12 @@ class GrblController:
 
         @return:
         """
-        q = self._index_of_forward_line
-        if q == -1:
-            raise ValueError("No forward command exists.")
         with self._forward_lock:
-            cmd_issued = self._forward_buffer[: q + 1]
-            self._forward_buffer = self._forward_buffer[q + 1 :]
+            try:
+                cmd_issued = self._forward_lines.popleft()
+            except IndexError:
+                raise ValueError("No forward command exists.")
+            self._forward_size -= len(cmd_issued)
         return cmd_issued
 
     def _recving(self):
@@ -648,17 +703,16 @@ class GrblController:
                     response = self.connection.read()
                 except (ConnectionAbortedError, AttributeError):
                     return
-                if not response:
-                    time.sleep(0.01)
-                    if self.is_shutdown:
-                        return
+                # Connections block in read, so no sleep is needed between reads.
+                if not response and self.is_shutdown:
+                    return
             self.service.signal("grbl;response", response)
             self.log(response, type="recv")
             if response == "ok":
                 # Indicates that the command line received was parsed and executed (or set to be executed).
                 try:
                     cmd_issued = self.get_forward_command()
-                    cmd_issued = cmd_issued.decode(encoding="latin-1")
+                    cmd_issued = cmd_issued.decode(encoding="utf-8")
                 except ValueError as e:
                     # We got an ok. But, had not sent anything.
                     self.log(
@@ -668,7 +722,7 @@ class GrblController:
                     continue
                     # raise ConnectionAbortedError from e
                 self.log(
-                    f"{response} / {len(self._forward_buffer)} -- {cmd_issued}",
+                    f"{response} / {self._forward_size} -- {cmd_issued}",
                     type="recv",
                 )
                 self.service.signal(
@@ -681,7 +735,7 @@ class GrblController:
                 # Indicates that the command line received contained an error, with an error code x, and was purged.
                 try:
                     cmd_issued = self.get_forward_command()
-                    cmd_issued = cmd_issued.decode(encoding="latin-1")
+                    cmd_issued = cmd_issued.decode(encoding="utf-8")
                 except ValueError as e:
                     cmd_issued = ""
                 try:
@@ -293,6 +293,29 @@ class GRBLDevice(Service, Status):
                 "section": "_5_Config",
                 "tip": _("Distance of the curve interpolation in mils"),
             },
+            {
+                "attr": "raster_power_runs",
+                "object": self,
+                "default": True,
+                "type": bool,
+                "label": _("Raster power runs"),
+                "section": "_5_Config",
+                "tip": _(
+                    "Write rasters as one move per run of equal power, skipping blank margins with rapid moves"
+                ),
+            },
+            {
+                "attr": "raster_power_levels",
+                "object": self,
+                "default": 0,
+                "type": int,
+                "label": _("Raster power levels"),
+                "section": "_5_Config",
+                "conditional": (self, "raster_power_runs"),
+                "tip": _(
+                    "Quantize raster power to this many levels to reduce the number of moves, 0 keeps every level"
+                ),
+            },
             {
                 "attr": "has_endstops",
                 "object": self,
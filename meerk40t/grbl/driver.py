@@ -15,6 +15,7 @@ from meerk40t.core.cutcode.linecut import LineCut
 from meerk40t.core.cutcode.outputcut import OutputCut
 from meerk40t.core.cutcode.plotcut import PlotCut
 from meerk40t.core.cutcode.quadcut import QuadCut
+from meerk40t.core.cutcode.rastercut import RasterCut
 from meerk40t.core.cutcode.waitcut import WaitCut
 
 from ..core.parameters import Parameters
@@ -23,6 +24,7 @@ from ..core.units import UNITS_PER_INCH, UNITS_PER_MIL, UNITS_PER_MM
 from ..device.basedevice import PLOT_FINISH, PLOT_JOG, PLOT_RAPID, PLOT_SETTING
 from ..kernel import signal_listener
 from ..tools.geomstr import Geomstr
+from .powerruns import power_runs
 
 
 class GRBLDriver(Parameters):
@@ -468,6 +470,8 @@ class GRBLDriver(Parameters):
                         self.power_dirty = True
                     self.on_value = on
                     self._move(x, y)
+            elif isinstance(q, RasterCut) and self.service.raster_power_runs:
+                self._plot_power_runs(q)
             else:
                 #  Rastercut
                 self.plot_planner.push(q)
@@ -784,6 +788,50 @@ class GRBLDriver(Parameters):
             (old_current[0], old_current[1], new_current[0], new_current[1]),
         )
 
+    def _plot_power_runs(self, cut):
+        """
+        Writes the raster cut as runs of equal power, see powerruns.
+
+        Only the axes that change are written, S is written when the power changes and F with
+        the first burning move.
+
+        @param cut: RasterCut
+        @return:
+        """
+        old_current = self.service.current
+        power = self.power if self.power is not None else 1000.0
+        levels = self.service.raster_power_levels
+        line_end = self.line_end
+        unit_scale = self.unit_scale
+        last_s = None
+        for x, y, s in power_runs(cut, power, levels):
+            while self.hold_work(0):
+                time.sleep(0.05)
+            line = ["G0" if s is None else "G1"]
+            if x != self.native_x:
+                line.append(f"X{x / unit_scale:.3f}")
+            if y != self.native_y:
+                line.append(f"Y{y / unit_scale:.3f}")
+            if len(line) == 1:
+                continue
+            self.native_x = x
+            self.native_y = y
+            if s is not None:
+                if s != last_s:
+                    line.append(f"S{s:.1f}")
+                    last_s = s
+                if self.speed_dirty:
+                    line.append(f"F{self.feed_convert(self.speed):.1f}")
+                    self.speed_dirty = False
+            self(" ".join(line) + line_end)
+        self.move_mode = 1
+        self.power_dirty = True
+        new_current = self.service.current
+        self.service.signal(
+            "driver;position",
+            (old_current[0], old_current[1], new_current[0], new_current[1]),
+        )
+
     def _clean_motion(self):
         if self.absolute_dirty:
             if self._absolute:
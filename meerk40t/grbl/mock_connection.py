@@ -5,8 +5,13 @@ Mock Connection for GRBL
 The mock connection is used for debug and research purposes. And simply prints the data sent to it rather than engaging
 any hardware.
 """
+import threading
+
 from meerk40t.grbl.emulator import GRBLEmulator
 
+# Seconds a read waits for a reply before returning nothing.
+READ_TIMEOUT = 0.1
+
 
 class MockConnection:
     def __init__(self, service, controller):
@@ -14,6 +19,7 @@ class MockConnection:
         self.controller = controller
         self.laser = None
         self.read_buffer = bytearray()
+        self._read_cond = threading.Condition()
         self.emulator = GRBLEmulator(
             device=None, units_to_device_matrix=service.view.matrix, reply=self.add_read
         )
@@ -23,19 +29,26 @@ class MockConnection:
         return self.laser is not None
 
     def add_read(self, code):
-        self.read_buffer += bytes(code, encoding="raw_unicode_escape")
+        with self._read_cond:
+            self.read_buffer += bytes(code, encoding="raw_unicode_escape")
+            self._read_cond.notify()
 
     def read(self):
-        f = self.read_buffer.find(b"\n")
-        if f == -1:
-            return None
-        response = self.read_buffer[:f]
-        self.read_buffer = self.read_buffer[f + 1 :]
+        with self._read_cond:
+            f = self.read_buffer.find(b"\n")
+            if f == -1:
+                # Wait for the emulator to reply, like a blocking socket read.
+                self._read_cond.wait(READ_TIMEOUT)
+                f = self.read_buffer.find(b"\n")
+                if f == -1:
+                    return None
+            response = self.read_buffer[:f]
+            del self.read_buffer[: f + 1]
         str_response = str(response, "raw_unicode_escape")
         str_response = str_response.strip()
         return str_response
 
-    def write(self, line: str):
+    def write(self, line):
         self.emulator.write(line)
 
     def connect(self):
@@ -52,5 +65,7 @@ class MockConnection:
 
     def disconnect(self):
         self.laser = None
+        with self._read_cond:
+            self._read_cond.notify_all()
         self.controller.log("Disconnected", type="connection")
         self.service.signal("grbl;status", "disconnected")
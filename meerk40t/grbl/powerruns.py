@@ -0,0 +1,82 @@
+"""
+Power runs of raster cuts.
+
+The plot planner steps every raster cut one native unit at a time before regrouping the steps
+into moves, so that grayscale rasters take long to plan and become one G1 line per pixel change.
+The runs of the scanlines are however already known to the NumpyRasterPlotter of the cut, which
+computes them from the image array. Power runs are written from those runs directly. Neighbouring
+runs of equal S value are merged into a single G1 move, and moves between scanlines, including
+those over blank scanlines, become a single rapid G0 move. The plotter extends each scanline by
+the overscan, which remains a G1 move without power.
+
+Power levels may optionally be quantized to a number of evenly spaced levels, which merges
+neighbouring runs of similar power and caps the number of moves per scanline.
+"""
+
+
+def quantized_power(on, power, levels=0):
+    """
+    Power of the S value of a raster pixel.
+
+    @param on: filtered pixel value, 0-1
+    @param power: power of the cut, 0-1000
+    @param levels: number of power levels to quantize to, 0 keeps every level
+    @return: power rounded to the 0.1 resolution of the S values written
+    """
+    if levels >= 2:
+        on = round(on * (levels - 1)) / (levels - 1)
+    return float(f"{power * on:.1f}")
+
+
+def power_runs(cut, power, levels=0):
+    """
+    Yields the moves burning the raster cut as runs of equal power.
+
+    Moves are x, y, s in native units, s is the power of a G1 move to x, y or None for a rapid G0
+    move. The burns are those of the raster plotter of the cut.
+
+    @param cut: RasterCut
+    @param power: power of the cut, 0-1000
+    @param levels: number of power levels to quantize to, 0 keeps every level
+    @return: generator of moves
+    """
+    horizontal = cut.horizontal
+    powers = dict()
+    cx = cy = None
+    pending = None
+    direction = 0
+    for x, y, on in cut.plot.plot():
+        if x == cx and y == cy:
+            continue
+        try:
+            s = powers[on]
+        except KeyError:
+            s = quantized_power(on, power, levels) if on else 0.0
+            powers[on] = s
+        if cx is None:
+            along = False
+            step = 0
+        elif horizontal:
+            along = y == cy
+            step = x - cx
+        else:
+            along = x == cx
+            step = y - cy
+        if not along and not s:
+            s = None
+        if pending is not None:
+            px, py, ps = pending
+            if ps == s and (s is None or (step > 0) == (direction > 0)):
+                # Rapids and collinear moves of equal power are merged.
+                pending = x, y, s
+                cx, cy = x, y
+                continue
+            if ps == 0.0 and s and (step > 0) != (direction > 0):
+                # Unpowered travel against the burn direction is no run-up.
+                ps = None
+            yield px, py, ps
+        pending = x, y, s
+        direction = step
+        cx, cy = x, y
+    if pending is not None:
+        yield pending
@@ -7,6 +7,9 @@ Registers the serial connection using pyserial to talk with the serial devices.
 import serial
 from serial import SerialException
 
+# Seconds a read waits for a reply before returning nothing.
+READ_TIMEOUT = 0.1
+
 
 class SerialConnection:
     def __init__(self, service, controller):
@@ -20,13 +23,16 @@ class SerialConnection:
         return self.laser is not None
 
     def read(self):
-        try:
-            self.read_buffer += self.laser.read(self.laser.in_waiting)
-        except (SerialException, AttributeError, OSError, TypeError):
-            pass
         f = self.read_buffer.find(b"\n")
         if f == -1:
-            return None
+            try:
+                # Blocks until a line ends or the read timeout passes.
+                self.read_buffer += self.laser.read_until(b"\n")
+            except (SerialException, AttributeError, OSError, TypeError):
+                pass
+            f = self.read_buffer.find(b"\n")
+            if f == -1:
+                return None
         response = self.read_buffer[:f]
         self.read_buffer = self.read_buffer[f + 1 :]
         str_response = str(response, "raw_unicode_escape")
@@ -35,7 +41,9 @@ class SerialConnection:
 
     def write(self, line, retry=0):
         try:
-            self.laser.write(bytes(line, "utf-8"))
+            if isinstance(line, str):
+                line = bytes(line, "utf-8")
+            self.laser.write(line)
         except (SerialException, PermissionError, TypeError, AttributeError) as e:
             # Type error occurs when `pipe_abort_write_r` is none, inside serialpostix.read() (out of sequence close)
             self.controller.log(
@@ -70,7 +78,7 @@ class SerialConnection:
             self.laser = serial.Serial(
                 serial_port,
                 baud_rate,
-                timeout=0,
+                timeout=READ_TIMEOUT,
             )
             self.controller.log("Connected", type="connection")
             signal_load = "connected"
@@ -63,7 +63,11 @@ class TCPOutput:
     def read(self):
         f = self.read_buffer.find(b"\n")
         if f == -1:
-            self.read_buffer += self._stream.recv(self._read_buffer_size)
+            data = self._stream.recv(self._read_buffer_size)
+            if not data:
+                # The other end closed the connection.
+                raise ConnectionAbortedError
+            self.read_buffer += data
             f = self.read_buffer.find(b"\n")
             if f == -1:
                 return
@@ -26,6 +26,7 @@ from meerk40t.gui.scene.sceneconst import (
 from meerk40t.gui.scene.scenespacewidget import SceneSpaceWidget
 from meerk40t.kernel import Job, Module
 from meerk40t.svgelements import Matrix, Point
+from meerk40t.tools.pointindex import PointIndex
 
 _reused_identity_widget = Matrix()
 XCELLS = 15
@@ -38,6 +39,61 @@ TYPE_CENTER = 3
 TYPE_GRID = 4
 TYPE_MIDDLE_SMALL = 5
 
+SNAP_POINT_TYPES = {
+    "bounds top_left": TYPE_BOUND,
+    "bounds top_right": TYPE_BOUND,
+    "bounds bottom_left": TYPE_BOUND,
+    "bounds bottom_right": TYPE_BOUND,
+    "bounds center_center": TYPE_CENTER,
+    "bounds top_center": TYPE_MIDDLE,
+    "bounds bottom_center": TYPE_MIDDLE,
+    "bounds center_left": TYPE_MIDDLE,
+    "bounds center_right": TYPE_MIDDLE,
+    "endpoint": TYPE_POINT,
+    "point": TYPE_POINT,
+    "midpoint": TYPE_MIDDLE_SMALL,
+}
+
+
+class SnapAttractionListener:
+    """
+    Tree listener updating the snap attraction points of the scene for the changed nodes only.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def modified(self, node, **kwargs):
+        self.scene.update_snap_attraction(node)
+
+    def altered(self, node, **kwargs):
+        self.scene.update_snap_attraction(node)
+
+    def node_attached(self, node, **kwargs):
+        self.scene.update_snap_attraction(node)
+
+    def node_detached(self, node, **kwargs):
+        self.scene.remove_snap_attraction(node)
+
+    def translated(self, node, dx=0, dy=0, **kwargs):
+        index = self.scene.snap_attraction_points
+        if index is not None and node in index:
+            index.translate(node, dx, dy)
+
+    def scaled(self, node, sx=1, sy=1, ox=0, oy=0, **kwargs):
+        index = self.scene.snap_attraction_points
+        if index is not None and node in index:
+            index.scale(node, sx, sy, ox, oy)
+
+    def emphasized(self, node, **kwargs):
+        index = self.scene.snap_attraction_points
+        if index is not None and node in index:
+            index.set_emphasized(node, node.emphasized)
+
+    def structure_changed(self, node, **kwargs):
+        # The tree was rebuilt, e.g. by undo and redo, without notifying single nodes.
+        self.scene.reset_snap_attraction()
+
 
 class SceneToast:
     """
@@ -245,6 +301,9 @@ class Scene(Module, Job):
         # Snap information
         self.snap_display_points = None
         self.snap_attraction_points = None
+        self._snap_listener = SnapAttractionListener(self)
+        self._grid_index = None
+        self._grid_index_version = None
 
     def module_open(self, *args, **kwargs):
         context = self.context
@@ -258,6 +317,7 @@ class Scene(Module, Job):
         if context.fps <= 0:
             context.fps = 60
         self.interval = 1.0 / float(context.fps)
+        context.elements.listen_tree(self._snap_listener)
         self.commit()
 
     def commit(self):
@@ -265,6 +325,7 @@ class Scene(Module, Job):
         self._init_widget(self.widget_root, context)
 
     def module_close(self, *args, **kwargs):
+        self.context.elements.unlisten_tree(self._snap_listener)
         self._final_widget(self.widget_root, self.context)
         self.scene_lock.acquire()  # calling shutdown live locks here since it's already shutting down.
         self.context.unschedule(self)
@@ -938,13 +999,11 @@ class Scene(Module, Job):
         @param length:
         @return:
         """
-        for pts in self.snap_attraction_points:
-            if self.pane.modif_active:
-                if pts[3]:
-                    # No snap points for emphasized objects.
-                    continue
-            if abs(pts[0] - my_x) <= length and abs(pts[1] - my_y) <= length:
-                self.snap_display_points.append([pts[0], pts[1], pts[2]])
+        # No snap points for emphasized objects.
+        for pt in self.snap_attraction_points.within(
+            my_x, my_y, length, skip_emphasized=self.pane.modif_active
+        ):
+            self.snap_display_points.append([pt[0], pt[1], pt[2]])
 
     def _calculate_grid_points(self, my_x, my_y, length):
         """
@@ -953,9 +1012,31 @@ class Scene(Module, Job):
         @param length:
         @return:
         """
-        for pts in self.pane.grid.grid_points:
-            if abs(pts[0] - my_x) <= length and abs(pts[1] - my_y) <= length:
-                self.snap_display_points.append([pts[0], pts[1], TYPE_GRID])
+        grid = self.pane.grid
+        version = grid.grid_points_version
+        if self._grid_index is None or self._grid_index_version != version:
+            # The grid points were recalculated.
+            self._grid_index = PointIndex(self._snap_cell_size())
+            self._grid_index.update(
+                "grid", ((pt[0], pt[1], TYPE_GRID) for pt in grid.grid_points)
+            )
+            self._grid_index_version = version
+        for pt in self._grid_index.within(my_x, my_y, length):
+            self.snap_display_points.append([pt[0], pt[1], TYPE_GRID])
+
+    def _snap_cell_size(self):
+        matrix = self.widget_root.scene_widget.matrix
+        return max(1.0, self.context.show_attract_len / matrix.value_scale_x())
+
+    @staticmethod
+    def _snap_points_of(node):
+        for pt in node.points:
+            try:
+                pt_type = SNAP_POINT_TYPES[pt[2]]
+            except KeyError:
+                print(f"Unknown type: {pt[2]}")
+                pt_type = TYPE_POINT
+            yield pt[0], pt[1], pt_type
 
     def _calculate_attraction_points(self):
         """
@@ -963,38 +1044,38 @@ class Scene(Module, Job):
         attraction points (center, corners, sides)
         """
         self.context.elements.set_start_time("attr_calc_points")
-        self.snap_attraction_points = []  # Clear all
-        translation_table = {
-            "bounds top_left": TYPE_BOUND,
-            "bounds top_right": TYPE_BOUND,
-            "bounds bottom_left": TYPE_BOUND,
-            "bounds bottom_right": TYPE_BOUND,
-            "bounds center_center": TYPE_CENTER,
-            "bounds top_center": TYPE_MIDDLE,
-            "bounds bottom_center": TYPE_MIDDLE,
-            "bounds center_left": TYPE_MIDDLE,
-            "bounds center_right": TYPE_MIDDLE,
-            "endpoint": TYPE_POINT,
-            "point": TYPE_POINT,
-            "midpoint": TYPE_MIDDLE_SMALL,
-        }
-
+        index = PointIndex(self._snap_cell_size())
         for e in self.context.elements.flat(types=elem_nodes):
-            emph = e.emphasized
             if hasattr(e, "points"):
-                for pt in e.points:
-                    try:
-                        pt_type = translation_table[pt[2]]
-                    except:
-                        print(f"Unknown type: {pt[2]}")
-                        pt_type = TYPE_POINT
-                    self.snap_attraction_points.append([pt[0], pt[1], pt_type, emph])
+                index.update(e, self._snap_points_of(e), emphasized=e.emphasized)
+        self.snap_attraction_points = index
 
         self.context.elements.set_end_time(
             "attr_calc_points",
             message=f"points added={len(self.snap_attraction_points)}",
         )
 
+    def update_snap_attraction(self, node):
+        """
+        Updates the attraction points of the node and the elements below it.
+        """
+        index = self.snap_attraction_points
+        if index is None:
+            return
+        for e in node.flat(types=elem_nodes):
+            if hasattr(e, "points"):
+                index.update(e, self._snap_points_of(e), emphasized=e.emphasized)
+
+    def remove_snap_attraction(self, node):
+        """
+        Removes the attraction points of the node and the elements below it.
+        """
+        index = self.snap_attraction_points
+        if index is None:
+            return
+        for e in node.flat(types=elem_nodes):
+            index.remove(e)
+
     def calculate_display_points(self, my_x, my_y, snap_points, snap_grid):
         """
         Recalculate the points that need to be displayed for the user.
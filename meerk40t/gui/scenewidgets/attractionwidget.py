@@ -303,7 +303,9 @@ class AttractionWidget(Widget):
         """
         Signal commands which indicate that we need to refresh / discard some data
         """
-        if signal in ("modified", "emphasized", "element_added", "tool_modified"):
+        # Modified, moved and emphasized elements update their points in the scene,
+        # a tree replaced by undo or redo notifies the scene as well.
+        if signal in ("element_added", "tool_modified", "rebuild_tree"):
             self.scene.reset_snap_attraction()
         elif signal == "theme":
             self.load_colors()
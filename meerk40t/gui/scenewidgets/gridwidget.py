@@ -84,6 +84,8 @@ class GridWidget(Widget):
         self.tick_distance = 0
 
         self.grid_points = None  # Points representing the grid - total of primary + secondary + circular
+        # Increased each time the grid points were recalculated.
+        self.grid_points_version = 0
 
         self.set_colors()
 
@@ -441,6 +443,7 @@ class GridWidget(Widget):
             self._calculate_grid_points_secondary()
         if self.draw_grid_circular:
             self._calculate_grid_points_circular()
+        self.grid_points_version += 1
 
     def _calculate_grid_points_primary(self):
         # That's easy just the rectangular stuff
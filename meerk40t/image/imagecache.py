@@ -0,0 +1,215 @@
+"""
+Shared scheduling and memoization of image processing.
+
+Processing an image node (grayscale, mask, crop, raster script and dither) is expensive and is
+requested every time the dpi, step or any wizard setting changes. Rather than starting a thread
+per request, the ImageProcessPool runs requests on a small bounded set of worker threads. Each
+owner has at most one pending request: a new request replaces the pending one, so stale
+requests are cancelled before they ever run, and the result of a request superseded while
+running is not reported.
+
+The ImageCache memoizes the processed results keyed by a digest of the source image and the
+processing parameters, evicting the least recently used results beyond its memory budget. Spools
+and undo/redo of unchanged images then reuse the already processed images.
+"""
+
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+IMAGE_CACHE_BUDGET = 256 * 1024 * 1024
+IMAGE_POOL_WORKERS = 2
+
+_digest_lock = threading.RLock()
+# PIL images compare by content and are unhashable, so digests are kept by id.
+_digests = {}
+
+
+def image_digest(image):
+    """
+    Returns a digest of the image mode, size, transparency and pixel data. The digest is
+    remembered for the image object, so each image is only hashed once.
+
+    @param image: PIL image
+    @return: hex digest
+    """
+    key = id(image)
+    with _digest_lock:
+        try:
+            ref, digest = _digests[key]
+            if ref() is image:
+                return digest
+        except KeyError:
+            pass
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{image.mode} {image.size} {image.info.get('transparency')!r}".encode())
+    if image.mode == "P":
+        h.update(bytes(image.getpalette() or ()))
+    h.update(image.tobytes())
+    digest = h.hexdigest()
+
+    def forget(r):
+        with _digest_lock:
+            if key in _digests and _digests[key][0] is r:
+                del _digests[key]
+
+    with _digest_lock:
+        _digests[key] = (weakref.ref(image, forget), digest)
+    return digest
+
+
+def image_size(image):
+    """
+    Estimated memory size of the image in bytes.
+    """
+    if image is None:
+        return 0
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """
+    LRU cache of processed images, bounded by the estimated memory of the cached images.
+    Values are tuples whose second item is the processed image.
+    """
+
+    def __init__(self, budget=IMAGE_CACHE_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        with self.lock:
+            self._results.clear()
+            self.size = 0
+
+    def get(self, key):
+        with self.lock:
+            try:
+                size, value = self._results[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = image_size(value[1])
+        with self.lock:
+            if key in self._results:
+                self.size -= self._results.pop(key)[0]
+            if size > self.budget:
+                return
+            self._results[key] = (size, value)
+            self.size += size
+            while self.size > self.budget:
+                self.size -= self._results.popitem(last=False)[1][0]
+
+
+class ImageProcessPool:
+    """
+    Bounded pool of daemon worker threads processing requests per owner.
+
+    Workers are started as requests arrive and exit once no requests are pending. Requests of the
+    same owner are never run concurrently.
+    """
+
+    def __init__(self, workers=IMAGE_POOL_WORKERS):
+        self.workers = workers
+        self._running = set()
+        self._pending = OrderedDict()
+        self._threads = 0
+        self._lock = threading.Condition()
+
+    def submit(self, owner, function, result=None):
+        """
+        Requests function to be run for owner, replacing any pending request of the owner.
+
+        @param owner: hashable owner of the request, usually a node
+        @param function: processing function
+        @param result: called with the return value of function, unless a newer request of the
+            same owner was made in the meantime
+        @return:
+        """
+        with self._lock:
+            self._pending.pop(owner, None)
+            self._pending[owner] = (function, result)
+            if self._threads < self.workers:
+                self._threads += 1
+                thread = threading.Thread(
+                    target=self._run, name="ImageProcessPool", daemon=True
+                )
+                thread.start()
+            self._lock.notify()
+
+    def cancel(self, owner):
+        """
+        Cancels the pending request of owner.
+
+        @return: whether a request was cancelled
+        """
+        with self._lock:
+            return self._pending.pop(owner, None) is not None
+
+    def is_busy(self, owner):
+        with self._lock:
+            return owner in self._pending or owner in self._running
+
+    def wait(self, timeout=None):
+        """
+        Waits until all pending and running requests are finished.
+
+        @return: whether the pool is idle
+        """
+        with self._lock:
+            return self._lock.wait_for(
+                lambda: not self._pending and not self._running, timeout
+            )
+
+    def _next(self):
+        for owner in self._pending:
+            if owner not in self._running:
+                return owner, self._pending.pop(owner)
+        return None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                request = self._next()
+                while request is None:
+                    if not self._pending:
+                        self._threads -= 1
+                        self._lock.notify_all()
+                        return
+                    # Only requests of owners already being processed remain.
+                    self._lock.wait()
+                    request = self._next()
+                owner, (function, result) = request
+                self._running.add(owner)
+            value = None
+            try:
+                try:
+                    value = function()
+                except Exception:
+                    sys.excepthook(*sys.exc_info())
+                with self._lock:
+                    stale = owner in self._pending
+                if result is not None and not stale:
+                    result(value)
+            finally:
+                with self._lock:
+                    self._running.discard(owner)
+                    self._lock.notify_all()
+
+
+image_cache = ImageCache()
+image_pool = ImageProcessPool()
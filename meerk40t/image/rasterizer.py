@@ -0,0 +1,431 @@
+"""
+Headless rasterizer.
+
+Provides `render-op/make_raster` with NumPy and Pillow when no gui renderer is available, so
+that raster operations and image actions can be planned without wxPython. Vector nodes are
+filled by scanline with their fill rule and stroked with their stroke width, using round
+caps and joins. Images are drawn with their matrix. The raster is rendered in horizontal bands, so the intermediate
+buffers stay small regardless of the size of the raster. The raster itself is built in the smallest mode that holds
+its colors, "1" for black and white, "L" for grays and "RGB" otherwise.
+"""
+
+from math import ceil, sqrt, tau
+
+import numpy as np
+from PIL import Image
+
+from ..core.node.node import Fillrule
+from ..svgelements import Matrix
+
+# Pixels rendered in a single band.
+BAND_PIXELS = 1 << 22
+
+VECTOR_TYPES = (
+    "elem ellipse",
+    "elem path",
+    "elem polyline",
+    "elem rect",
+    "elem line",
+    "effect hatch",
+    "effect wobble",
+    "effect warp",
+)
+
+
+def plugin(kernel, lifecycle=None):
+    if lifecycle == "register":
+        if kernel.has_feature("wx"):
+            # The gui renderer provides make_raster.
+            return
+        context = kernel.root
+        if context.lookup("render-op/make_raster") is not None:
+            return
+        renderer = Rasterizer(context)
+        context.register("render-op/make_raster", renderer.make_raster)
+
+
+def _color(color):
+    if color is None or color.argb is None:
+        return None
+    return color.red, color.green, color.blue
+
+
+def raster_mode(items):
+    """
+    Gives the smallest image mode that holds the colors of the drawable items without loss.
+
+    @param items: drawable items, as prepared by Rasterizer._items
+    @return: "1", "L" or "RGB"
+    """
+    mode = "1"
+    for item in items:
+        if item[0] == "image":
+            if item[1].mode != "LA":
+                return "RGB"
+            # Resampled images have intermediate grays.
+            mode = "L"
+            continue
+        for color in (item[2], item[5]):
+            if color is None:
+                continue
+            if not color[0] == color[1] == color[2]:
+                return "RGB"
+            if color[0] not in (0, 255):
+                mode = "L"
+    return mode
+
+
+def fill_spans(edges, rows, width, nonzero=False):
+    """
+    Scanline fills the polygon edges for the given rows, sampled at the pixel centers.
+
+    @param edges: array of x0, y0, x1, y1 rows, in pixels.
+    @param rows: first and last (exclusive) pixel row.
+    @param width: width in pixels.
+    @param nonzero: nonzero fill rule, otherwise evenodd.
+    @return: boolean mask of the filled pixels.
+    """
+    top, bottom = rows
+    mask = np.zeros((bottom - top, width + 1), dtype=np.int8)
+    if len(edges) == 0:
+        return mask[:, :width] != 0
+    x0, y0, x1, y1 = edges.T
+    y_low = np.minimum(y0, y1)
+    y_high = np.maximum(y0, y1)
+    scanlines = np.arange(top, bottom) + 0.5
+    # An edge crosses the scanlines within [y_low, y_high).
+    first = np.searchsorted(scanlines, y_low, side="left")
+    counts = np.searchsorted(scanlines, y_high, side="left") - first
+    crossing = np.repeat(np.arange(len(edges)), counts)
+    if len(crossing) == 0:
+        return mask[:, :width] != 0
+    offsets = np.cumsum(counts) - counts
+    row = np.repeat(first - offsets, counts) + np.arange(len(crossing))
+    y = scanlines[row]
+    ex0 = x0[crossing]
+    ey0 = y0[crossing]
+    x = ex0 + (y - ey0) * (x1[crossing] - ex0) / (y1[crossing] - ey0)
+    winding = np.where(y1[crossing] > ey0, 1, -1)
+
+    order = np.lexsort((x, row))
+    row = row[order]
+    x = x[order]
+    winding = winding[order]
+
+    starts = np.flatnonzero(np.diff(row, prepend=-1))
+    actives = np.diff(np.append(starts, len(row)))
+    if nonzero:
+        total = np.cumsum(winding)
+        before = np.repeat(total[starts] - winding[starts], actives)
+        inside = (total - before) != 0
+    else:
+        rank = np.arange(len(row)) - np.repeat(starts, actives)
+        inside = rank % 2 == 0
+    # A span runs from an inside crossing to the next crossing on the same row.
+    span = np.flatnonzero(inside[:-1] & (row[:-1] == row[1:]))
+    span_row = row[span]
+    x_start = np.clip(np.ceil(x[span] - 0.5), 0, width).astype(int)
+    x_end = np.clip(np.ceil(x[span + 1] - 0.5), 0, width).astype(int)
+    # Spans never overlap, so the running sum is 0 or 1.
+    np.add.at(mask, (span_row, x_start), 1)
+    np.add.at(mask, (span_row, x_end), -1)
+    return np.cumsum(mask, axis=1, dtype=np.int8)[:, :width] != 0
+
+
+def stroke_edges(polyline, width):
+    """
+    Outlines the stroke of the polyline as polygon edges of a consistent orientation, to be
+    filled with the nonzero rule. Each segment gives a quad, the ends and the turning points
+    give round caps and joins.
+
+    @param polyline: complex points, in pixels.
+    @param width: stroke width, in pixels.
+    @return: array of x0, y0, x1, y1 rows.
+    """
+    radius = width / 2.0
+    d = np.diff(polyline)
+    length = np.abs(d)
+    valid = length != 0
+    start = polyline[:-1][valid]
+    end = polyline[1:][valid]
+    d = d[valid]
+    normal = 1j * d / length[valid] * radius
+    quads = np.column_stack((start + normal, end + normal, end - normal, start - normal))
+
+    # Joins where the outer gap of two quads would exceed half a pixel.
+    turn = np.abs(np.angle(d[1:] / d[:-1])) if len(d) > 1 else np.zeros(0)
+    joints = end[:-1][turn * radius > 0.5]
+    centers = np.concatenate(([polyline[0], polyline[-1]], joints))
+    sides = max(8, min(64, int(ceil(radius * 2))))
+    circle = radius * np.exp(-1j * np.linspace(0, tau, sides, endpoint=False))
+    circles = centers[:, None] + circle[None, :]
+
+    polygons = [quads] if len(quads) else []
+    polygons.append(circles)
+    edges = []
+    for polygon in polygons:
+        closed = np.roll(polygon, -1, axis=1)
+        edges.append(
+            np.column_stack(
+                (
+                    polygon.real.ravel(),
+                    polygon.imag.ravel(),
+                    closed.real.ravel(),
+                    closed.imag.ravel(),
+                )
+            )
+        )
+    return np.concatenate(edges)
+
+
+class Rasterizer:
+    """
+    Renders nodes into Pillow images without a gui.
+    """
+
+    def __init__(self, context):
+        self.context = context
+
+    def _translate_text(self, node):
+        """
+        Updates linetext paths whose translated text changed, as drawing them would.
+        """
+        try:
+            elements = self.context.elements
+        except AttributeError:
+            return
+        newtext = elements.wordlist_translate(node.mktext, elemnode=node, increment=False)
+        if newtext == getattr(node, "_translated_text", ""):
+            return
+        node._translated_text = newtext
+        kernel = elements.kernel
+        for property_op in kernel.lookup_all("path_updater/.*"):
+            property_op(kernel.root, node)
+
+    def _items(self, nodes, matrix):
+        """
+        Prepares the drawable items of nodes in pixel space.
+
+        @return: list of ("vector", bounds, fill, fill edges, nonzero, stroke, stroke edges)
+            and ("image", image, matrix) items.
+        """
+        factor = sqrt(abs(matrix.determinant))
+        items = []
+        for node in nodes:
+            if node.type == "reference":
+                node = node.node
+            if not getattr(node, "is_visible", True):
+                continue
+            if not getattr(node, "output", True):
+                continue
+            if node.type in VECTOR_TYPES:
+                if hasattr(node, "mktext"):
+                    self._translate_text(node)
+                fill = _color(getattr(node, "fill", None))
+                stroke = _color(getattr(node, "stroke", None))
+                if fill is None and stroke is None:
+                    continue
+                geometry = node.as_geometry()
+                geometry.transform(matrix)
+                polylines = []
+                polyline = []
+                for point in geometry.as_equal_interpolated_points(distance=1):
+                    if point is None:
+                        if len(polyline) > 1:
+                            polylines.append(np.array(polyline))
+                        polyline = []
+                    else:
+                        polyline.append(point)
+                if len(polyline) > 1:
+                    polylines.append(np.array(polyline))
+                if not polylines:
+                    continue
+                try:
+                    width = float(node.implied_stroke_width) * factor
+                except (AttributeError, ValueError):
+                    width = 0
+                points = np.concatenate(polylines)
+                bounds = (
+                    np.min(points.imag) - width,
+                    np.max(points.imag) + width,
+                )
+                fill_edges = None
+                if fill is not None:
+                    fill_edges = self._fill_edges(polylines)
+                stroke_edges_ = None
+                if stroke is not None and width > 0:
+                    width = max(width, 1.0)
+                    stroke_edges_ = np.concatenate(
+                        [stroke_edges(polyline, width) for polyline in polylines]
+                    )
+                nonzero = getattr(node, "fillrule", None) != Fillrule.FILLRULE_EVENODD
+                items.append(
+                    (
+                        "vector",
+                        bounds,
+                        fill,
+                        fill_edges,
+                        nonzero,
+                        stroke,
+                        stroke_edges_,
+                    )
+                )
+            elif hasattr(node, "as_image"):
+                try:
+                    image = node.active_image
+                    image_matrix = Matrix(node.active_matrix)
+                except AttributeError:
+                    continue
+                if image is None:
+                    continue
+                image_matrix.post_cat(matrix)
+                if image.mode in ("1", "L", "LA"):
+                    image = image.convert("LA")
+                elif image.mode != "RGBA":
+                    image = image.convert("RGBA")
+                items.append(("image", image, image_matrix))
+        return items
+
+    @staticmethod
+    def _fill_edges(polylines):
+        edges = []
+        for polyline in polylines:
+            # Fills implicitly close each subpath.
+            closed = np.append(polyline, polyline[0])
+            edges.append(
+                np.column_stack(
+                    (closed[:-1].real, closed[:-1].imag, closed[1:].real, closed[1:].imag)
+                )
+            )
+        edges = np.concatenate(edges)
+        # Horizontal edges never cross a scanline.
+        return edges[edges[:, 1] != edges[:, 3]]
+
+    def _render_band(self, items, top, bottom, width, mode="RGB"):
+        band = Image.new(mode, (width, bottom - top), "white")
+        for item in items:
+            if item[0] == "image":
+                _, image, image_matrix = item
+                inverse = ~(image_matrix * Matrix.translate(0, -top))
+                transformed = image.transform(
+                    band.size,
+                    Image.AFFINE,
+                    (inverse.a, inverse.c, inverse.e, inverse.b, inverse.d, inverse.f),
+                    resample=Image.BILINEAR,
+                )
+                band.paste(transformed.convert(mode), (0, 0), transformed)
+                continue
+            _, bounds, fill, fill_edges, nonzero, stroke, stroke_edges_ = item
+            if bounds[1] < top or bounds[0] > bottom:
+                continue
+            if mode != "RGB":
+                # Gray colors, as a single band value.
+                fill = fill and fill[0]
+                stroke = stroke and stroke[0]
+            if fill_edges is not None:
+                mask = fill_spans(fill_edges, (top, bottom), width, nonzero)
+                band.paste(fill, (0, 0), Image.fromarray(mask))
+            if stroke_edges_ is not None:
+                mask = fill_spans(stroke_edges_, (top, bottom), width, nonzero=True)
+                band.paste(stroke, (0, 0), Image.fromarray(mask))
+        return band
+
+    def make_raster(
+        self,
+        nodes,
+        bounds,
+        width=None,
+        height=None,
+        bitmap=False,
+        step_x=1,
+        step_y=1,
+        keep_ratio=False,
+    ):
+        """
+        Make Raster turns an iterable of elements and a bounds into an image of the designated size, taking into account
+        the step size. The physical pixels in the image is reduced by the step size then the matrix for the element is
+        scaled up by the same amount. This makes step size work like inverse dpi and correctly sets the image scale to
+        the step scale for 1:1 sizes independent of the scale.
+
+        This function requires only NumPy and Pillow, bitmap is ignored and a Pillow image is always given.
+        The elements are rendered in bands, but the resulting image is allocated at full size. It is given in mode "1"
+        or "L" when the elements are black and white or gray, which needs 1/24 or 1/3 of the memory of "RGB".
+
+        @param nodes: elements to render.
+        @param bounds: bounds of those elements for the viewport.
+        @param width: desired width of the resulting raster
+        @param height: desired height of the resulting raster
+        @param bitmap: unused, no gui bitmap is available
+        @param step_x: raster step rate, scale rate of the image.
+        @param step_y: raster step rate, scale rate of the image.
+        @param keep_ratio: get a picture with the same height / width
+               ratio as the original
+        @return:
+        """
+        if bounds is None:
+            return None
+        x_min = float("inf")
+        y_min = float("inf")
+        x_max = -float("inf")
+        y_max = -float("inf")
+        if not isinstance(nodes, (tuple, list)):
+            _nodes = [nodes]
+        else:
+            _nodes = nodes
+
+        for item in _nodes:
+            bb = getattr(item, "paint_bounds", None)
+            if bb is None:
+                # Fall back to bounds
+                bb = getattr(item, "bounds", None)
+            if bb is None:
+                continue
+            if bb[0] < x_min:
+                x_min = bb[0]
+            if bb[1] < y_min:
+                y_min = bb[1]
+            if bb[2] > x_max:
+                x_max = bb[2]
+            if bb[3] > y_max:
+                y_max = bb[3]
+        raster_width = max(x_max - x_min, 1)
+        raster_height = max(y_max - y_min, 1)
+        if width is None:
+            width = raster_width / step_x
+        if height is None:
+            height = raster_height / step_y
+        width = max(width, 1)
+        height = max(height, 1)
+        image_width = int(ceil(abs(width)))
+        image_height = int(ceil(abs(height)))
+
+        matrix = Matrix()
+        # Scale affine matrix up by step amount scaled down.
+        try:
+            scale_x = width / raster_width
+        except ZeroDivisionError:
+            scale_x = 1
+
+        try:
+            scale_y = height / raster_height
+        except ZeroDivisionError:
+            scale_y = 1
+        if keep_ratio:
+            scale_x = min(scale_x, scale_y)
+            scale_y = scale_x
+        matrix.post_translate(-x_min, -y_min)
+        matrix.post_scale(scale_x, scale_y)
+        if scale_y < 0:
+            matrix.pre_translate(0, -raster_height)
+        if scale_x < 0:
+            matrix.pre_translate(-raster_width, 0)
+
+        items = self._items(_nodes, matrix)
+        mode = raster_mode(items)
+        image = Image.new(mode, (image_width, image_height), "white")
+        rows = max(1, BAND_PIXELS // image_width)
+        for top in range(0, image_height, rows):
+            bottom = min(top + rows, image_height)
+            band = self._render_band(items, top, bottom, image_width, mode)
+            image.paste(band, (0, top))
+        return image
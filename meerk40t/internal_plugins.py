@@ -52,6 +52,10 @@ def plugin(kernel, lifecycle):
 
         plugins.append(imagetools.plugin)
 
+        from .image import rasterizer
+
+        plugins.append(rasterizer.plugin)
+
         from .fill import fills
 
         plugins.append(fills.plugin)
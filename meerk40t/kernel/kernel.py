@@ -22,6 +22,7 @@ from .functions import (
 from .jobs import ConsoleFunction, Job
 from .lifecycles import *
 from .module import Module
+from .registry import Registry, compile_match
 from .service import Service
 from .settings import Settings
 
@@ -122,7 +123,9 @@ class Kernel(Settings):
             times=1,
             run_main=True,
         )
-        self._registered = {}
+        self._registered = Registry()
+        # Console commands by input type, dropped when commands change.
+        self._console_dispatch = {}
         self.lookups = {}
         self.lookup_previous = {}
         self._dirty_paths = []
@@ -342,10 +345,12 @@ class Kernel(Settings):
 
         @return: domain, service
         """
-        for r in list(self._registered):
+        for r in self._registered.match(RE_ACTIVE.pattern):
             result = RE_ACTIVE.match(r)
-            if result:
+            try:
                 yield result.group(1), self._registered[r]
+            except KeyError:
+                pass
 
     def services_available(self):
         """
@@ -353,10 +358,12 @@ class Kernel(Settings):
 
         @return: domain, service
         """
-        for r in list(self._registered):
+        for r in self._registered.match(RE_AVAILABLE.pattern):
             result = RE_AVAILABLE.match(r)
-            if result:
+            try:
                 yield result.group(1), self._registered[r]
+            except KeyError:
+                pass
 
     def remove_service(self, service: Service):
         self.set_service_lifecycle(service, LIFECYCLE_KERNEL_SHUTDOWN)
@@ -1448,14 +1455,19 @@ class Kernel(Settings):
         @return:
         """
         matchtext = "/".join(args)
-        match = re.compile(matchtext)
         for domain, service in self.services_active():
-            for r in service._registered:
-                if match.match(r):
-                    yield service._registered[r], r, list(r.split("/"))[-1]
-        for r in self._registered:
-            if match.match(r):
-                yield self._registered[r], r, list(r.split("/"))[-1]
+            registered = service._registered
+            for r in registered.match(matchtext):
+                try:
+                    yield registered[r], r, r.split("/")[-1]
+                except KeyError:
+                    pass
+        registered = self._registered
+        for r in registered.match(matchtext):
+            try:
+                yield registered[r], r, r.split("/")[-1]
+            except KeyError:
+                pass
 
     def match(self, matchtext: str, suffix: bool = False) -> Generator[str, None, None]:
         """
@@ -1465,20 +1477,17 @@ class Kernel(Settings):
         @param suffix: provide the suffix of the match only.
         @return:
         """
-        match = re.compile(matchtext)
         for domain, service in self.services_active():
-            for r in service._registered:
-                if match.match(r):
-                    if suffix:
-                        yield list(r.split("/"))[-1]
-                    else:
-                        yield r
-        for r in self._registered:
-            if match.match(r):
+            for r in service._registered.match(matchtext):
                 if suffix:
-                    yield list(r.split("/"))[-1]
+                    yield r.split("/")[-1]
                 else:
                     yield r
+        for r in self._registered.match(matchtext):
+            if suffix:
+                yield r.split("/")[-1]
+            else:
+                yield r
 
     def lookup(self, *args):
         """
@@ -1596,6 +1605,7 @@ class Kernel(Settings):
         self.channel("lookup")(
             f"Changed all: {str(paths)} ({str(threading.current_thread().name)})"
         )
+        self._console_dispatch_changed(paths)
         with self._lookup_lock:
             if not self._dirty_paths:
                 self.schedule(self._clean_lookup)
@@ -1611,15 +1621,16 @@ class Kernel(Settings):
         self.channel("lookup")(
             f"Changed {str(path)} ({str(threading.current_thread().name)})"
         )
+        self._console_dispatch_changed((path,))
         with self._lookup_lock:
             if not self._dirty_paths:
                 self.schedule(self._clean_lookup)
             self._dirty_paths.append(path)
 
     def _matchtext_is_dirty(self, matchtext: str) -> bool:
-        match = re.compile(matchtext)
+        match, prefix = compile_match(matchtext)
         for r in self._dirty_paths:
-            if match.match(r):
+            if r.startswith(prefix) and match.match(r):
                 return True
         return False
 
@@ -2230,6 +2241,61 @@ class Kernel(Settings):
     def _console_interface(self, command: str):
         pass
 
+    def _console_dispatch_changed(self, paths) -> None:
+        """
+        Drops the console dispatch tables if commands or the active services changed. Unlike the lookups, this happens
+        at once, so commands are available as soon as they are registered.
+
+        @param paths: changed paths
+        @return:
+        """
+        for path in paths:
+            if path.startswith("command/") or path.startswith("service/"):
+                self._console_dispatch = {}
+                return
+
+    def _console_commands(self, input_type: str):
+        """
+        Dispatch table of the commands for the given input type, in the order of find("command", input_type, ".*").
+
+        @param input_type: input type of the commands
+        @return: dict of command name to exact commands, list of regex commands. Exact commands are (order, funct) and
+            regex commands (order, match, funct).
+        """
+        dispatch = self._console_dispatch
+        try:
+            return dispatch[input_type]
+        except KeyError:
+            pass
+        exact = dict()
+        regexes = list()
+        for order, (funct, path, name) in enumerate(
+            self.find("command", input_type, ".*")
+        ):
+            if funct.regex:
+                regexes.append((order, re.compile(name).match, funct))
+            else:
+                exact.setdefault(name, []).append((order, funct))
+        table = exact, regexes
+        dispatch[input_type] = table
+        return table
+
+    def _console_matches(self, input_type: str, command: str):
+        """
+        Commands for the given input type matching the command, exact and regex matches in registration order.
+
+        @param input_type: input type of the commands
+        @param command: command name
+        @return: list of command functions
+        """
+        exact, regexes = self._console_commands(input_type)
+        commands = exact.get(command, ())
+        if regexes:
+            matched = [(i, funct) for i, match, funct in regexes if match(command)]
+            if matched:
+                commands = sorted([*commands, *matched], key=lambda e: e[0])
+        return [funct for order, funct in commands]
+
     def _console_parse(self, text: str, channel: "Channel"):
         """
         Takes single line console commands and executes them.
@@ -2259,18 +2325,7 @@ class Kernel(Settings):
             command = command.lower()
             command_executed = False
             # Process command matches.
-            for funct, name, regex in self.find("command", str(input_type), ".*"):
-                # Find all commands with matching input_type.
-                if funct.regex:
-                    # This function is a regex match.
-                    match = re.compile(regex)
-                    if not match.match(command):
-                        continue
-                else:
-                    # Exact match only.
-                    if regex != command:
-                        continue
-
+            for funct in self._console_matches(str(input_type), command):
                 try:
                     data, remainder, input_type = funct(
                         command=command,
@@ -0,0 +1,138 @@
+"""
+The registry stores registered objects by their "/" separated path.
+
+Lookups such as `find("command", "elements", ".*")` are regular expressions matched from
+the start of the path. Nearly all of them begin with a literal prefix, so the registry keeps
+a sorted index of its keys and only matches the keys sharing that prefix, rather than every
+registered key. Compiled patterns and their literal prefixes are cached. Results are given in
+registration order, exactly as iterating the dictionary would.
+"""
+
+import re
+from bisect import bisect_left, insort
+
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+_OPTIONAL_SUFFIX = set("*?{")
+_PATTERN_CACHE_SIZE = 2048
+_pattern_cache = {}
+
+
+def literal_prefix(matchtext):
+    """
+    Returns the literal text that any path matching the regex matchtext must start with.
+
+    @param matchtext: regular expression
+    @return: literal prefix, possibly empty
+    """
+    if "|" in matchtext:
+        # Alternation may apply to the prefix itself.
+        return ""
+    for i, c in enumerate(matchtext):
+        if c in _REGEX_SPECIAL:
+            if c in _OPTIONAL_SUFFIX and i > 0:
+                # The preceding literal is optional.
+                return matchtext[: i - 1]
+            return matchtext[:i]
+    return matchtext
+
+
+def compile_match(matchtext):
+    """
+    Compiles matchtext, caching the compiled pattern and its literal prefix.
+
+    @param matchtext: regular expression
+    @return: compiled pattern, literal prefix
+    """
+    try:
+        return _pattern_cache[matchtext]
+    except KeyError:
+        pass
+    if len(_pattern_cache) >= _PATTERN_CACHE_SIZE:
+        _pattern_cache.clear()
+    compiled = (re.compile(matchtext), literal_prefix(matchtext))
+    _pattern_cache[matchtext] = compiled
+    return compiled
+
+
+class Registry(dict):
+    """
+    Dictionary of registered objects which also maintains a sorted index of its keys, and the
+    registration order of each key.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._keys = []
+        self._order = {}
+        self._sequence = 0
+        self.update(*args, **kwargs)
+
+    def _index(self, key):
+        insort(self._keys, key)
+        self._order[key] = self._sequence
+        self._sequence += 1
+
+    def _unindex(self, key):
+        del self._keys[bisect_left(self._keys, key)]
+        del self._order[key]
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._index(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._unindex(key)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._unindex(key)
+        return super().pop(key, *args)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._unindex(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self._keys.clear()
+        self._order.clear()
+
+    def prefixed(self, prefix):
+        """
+        Returns the keys starting with prefix, in registration order.
+        """
+        if not prefix:
+            return list(self)
+        keys = self._keys
+        start = bisect_left(keys, prefix)
+        end = start
+        length = len(keys)
+        while end < length and keys[end].startswith(prefix):
+            end += 1
+        if end - start <= 1:
+            return keys[start:end]
+        order = self._order
+        return sorted(keys[start:end], key=order.__getitem__)
+
+    def match(self, matchtext):
+        """
+        Returns the keys which regex match matchtext, in registration order.
+
+        @param matchtext: regular expression matched from the start of the key
+        @return:
+        """
+        pattern, prefix = compile_match(matchtext)
+        match = pattern.match
+        return [key for key in self.prefixed(prefix) if match(key)]
@@ -7,7 +7,6 @@ the given device type.
 
 from hashlib import md5
 
-from meerk40t.core.laserjob import LaserJob
 from meerk40t.core.spoolers import Spooler
 from meerk40t.core.view import View
 from meerk40t.kernel import CommandSyntaxError, Service, signal_listener
@@ -16,6 +15,7 @@ from ..core.units import UNITS_PER_MIL, Length
 from ..device.mixins import Status
 from .controller import LihuiyuController
 from .driver import LihuiyuDriver
+from .pipeline import EgvPipeline, write_egv
 from .tcp_connection import TCPOutput
 
 
@@ -414,7 +414,7 @@ class LihuiyuDevice(Service, Status):
         self.controller = LihuiyuController(self)
         self.add_service_delegate(self.controller)
 
-        self.driver.out_pipe = self.controller if not self.networked else self.tcp
+        self.driver.out_pipe = EgvPipeline(self.output)
 
         _ = self.kernel.translation
 
@@ -593,7 +593,7 @@ class LihuiyuDevice(Service, Status):
             help=_("Updates network state for m2nano networked."),
         )
         def network_update(**kwargs):
-            self.driver.out_pipe = self.controller if not self.networked else self.tcp
+            self.driver.out_pipe = EgvPipeline(self.output)
 
         @self.console_command(
             "status",
@@ -664,21 +664,7 @@ class LihuiyuDevice(Service, Status):
                 raise CommandSyntaxError
             try:
                 with open(filename, "wb") as f:
-                    f.write(b"Document type : LHYMICRO-GL file\n")
-                    f.write(b"File version: 1.0.01\n")
-                    f.write(b"Copyright: Unknown\n")
-                    f.write(
-                        bytes(
-                            f"Creator-Software: {self.kernel.name} v{self.kernel.version}\n",
-                            "utf-8",
-                        )
-                    )
-                    f.write(b"\n")
-                    f.write(b"%0%0%0%0%\n")
-                    driver = LihuiyuDriver(self)
-                    job = LaserJob(filename, list(data.plan), driver=driver)
-                    driver.out_pipe = f
-                    job.execute()
+                    write_egv(self, data.plan, f, name=filename)
 
             except (PermissionError, OSError):
                 channel(_("Could not save: {filename}").format(filename=filename))
@@ -0,0 +1,167 @@
+"""
+Lihuiyu EGV Pipeline
+
+The LihuiyuDriver encodes cutcode into LHYMicro-GL one octant step at a time, writing a few bytes for every switch and
+move. Written straight to the LihuiyuController each of these writes is logged, signalled and locked, so that the
+encoding is paced by the controller rather than by the cutcode. The EgvPipeline is the producer stage between the
+two: the driver encodes into a bounded byte queue and a feeder thread forwards whatever has been encoded to the
+output in large writes, so encoding runs ahead of the controller sending the packets.
+
+Realtime commands, those in ~ realtime exceptions, are not queued and go directly to the output. An abort (*) also
+drops any queued data that has not yet been forwarded.
+
+The same pipeline writes .egv files headless, with a file as output, see write_egv().
+"""
+
+import sys
+import threading
+
+from meerk40t.core.laserjob import LaserJob
+
+from .driver import LihuiyuDriver
+
+EGV_PIPELINE_CAPACITY = 0x10000
+EGV_PIPELINE_LINGER = 1.0
+
+
+class EgvPipeline:
+    """
+    Bounded byte queue forwarding encoded EGV to the output on a feeder thread.
+    """
+
+    def __init__(self, output, capacity=EGV_PIPELINE_CAPACITY):
+        self.output = output
+        self.capacity = capacity
+        self._pending = bytearray()
+        self._forwarding = 0
+        self._feeding = False
+        self._waiting = False
+        self._cond = threading.Condition(threading.Lock())
+
+    def __repr__(self):
+        return f"EgvPipeline({repr(self.output)})"
+
+    def __len__(self):
+        """
+        Length of the queued data and the buffer of the output. Outputs without a buffer, such as files, are never
+        held for.
+        """
+        try:
+            buffer = len(self.output)
+        except TypeError:
+            return 0
+        return len(self._pending) + self._forwarding + buffer
+
+    @property
+    def is_shutdown(self):
+        return getattr(self.output, "is_shutdown", False)
+
+    @property
+    def viewbuffer(self):
+        return self.output.viewbuffer
+
+    def write(self, data):
+        """
+        Queues the data to be written to the output. Blocks while the queue is at capacity.
+
+        @param data: encoded bytes
+        @return:
+        """
+        if b"~" in data:
+            # Realtime exception, written directly.
+            if b"*" in data:
+                self.clear()
+            self.output.write(data)
+            return self
+        with self._cond:
+            while len(self._pending) >= self.capacity and self._feeding:
+                self._cond.wait()
+            self._pending += data
+            if not self._feeding:
+                self._feeding = True
+                thread = threading.Thread(
+                    target=self._feed, name="EgvPipeline", daemon=True
+                )
+                thread.start()
+            elif self._waiting:
+                self._cond.notify_all()
+        return self
+
+    def clear(self):
+        """
+        Drops the queued data not yet written to the output.
+        """
+        with self._cond:
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Waits until all queued data is written to the output.
+
+        @return: whether the queue is empty
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._forwarding, timeout
+            )
+
+    def _feed(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._waiting = True
+                    self._cond.wait_for(lambda: self._pending, EGV_PIPELINE_LINGER)
+                    self._waiting = False
+                    if not self._pending:
+                        self._feeding = False
+                        self._cond.notify_all()
+                        return
+                data = bytes(self._pending)
+                self._pending.clear()
+                self._forwarding = len(data)
+                self._cond.notify_all()
+            try:
+                self.output.write(data)
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+            finally:
+                with self._cond:
+                    self._forwarding = 0
+                    self._cond.notify_all()
+
+
+def egv_header(creator):
+    """
+    Header of an .egv file.
+
+    @param creator: name and version of the creating software
+    @return: header bytes
+    """
+    return (
+        b"Document type : LHYMICRO-GL file\n"
+        b"File version: 1.0.01\n"
+        b"Copyright: Unknown\n"
+        + bytes(f"Creator-Software: {creator}\n", "utf-8")
+        + b"\n"
+        + b"%0%0%0%0%\n"
+    )
+
+
+def write_egv(service, items, file, name=None):
+    """
+    Encodes the plan items into an .egv file headless, without a controller or spooler.
+
+    @param service: Lihuiyu device service providing the settings
+    @param items: plan items, cutcode and functions
+    @param file: binary file to write to
+    @param name: name of the job
+    @return:
+    """
+    file.write(egv_header(f"{service.kernel.name} v{service.kernel.version}"))
+    driver = LihuiyuDriver(service)
+    pipeline = EgvPipeline(file)
+    driver.out_pipe = pipeline
+    job = LaserJob(name or str(file), list(items), driver=driver)
+    job.execute()
+    pipeline.flush()
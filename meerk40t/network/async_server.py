@@ -0,0 +1,343 @@
+"""
+Async Server
+
+TCP and UDP servers running on a single asyncio event loop thread, shared by every server of the process. These are
+the kernel's TCPServer and UDPServer modules: they map the {name}/recv and {name}/send channels onto sockets in the
+same manner as the threaded servers, without a thread per connection.
+
+Received data is handed to a ChannelFeeder, which calls the recv channel on its own thread. Data not yet delivered to
+the channel is limited, TCP connections stop reading while the limit is reached, so a slow channel throttles the
+sender through TCP flow control rather than buffering without bounds. UDP cannot be throttled, datagrams are always
+queued.
+
+Packet logging to the data channel is only formatted when something watches the data channel.
+"""
+
+import asyncio
+import socket
+import threading
+from collections import deque
+
+from meerk40t.kernel import Module
+
+SERVER_READ_SIZE = 0x10000
+SERVER_RECV_LIMIT = 0x100000
+
+_server_loop = None
+_server_loop_lock = threading.Lock()
+
+
+def plugin(kernel, lifecycle=None):
+    if lifecycle == "register":
+        _ = kernel.translation
+        kernel.register("module/TCPServer", AsyncTCPServer)
+        kernel.register("module/UDPServer", AsyncUDPServer)
+
+
+def server_loop():
+    """
+    Event loop shared by all servers, running on its own daemon thread.
+
+    @return: asyncio event loop
+    """
+    global _server_loop
+    with _server_loop_lock:
+        if _server_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="server-loop", daemon=True
+            )
+            thread.start()
+            _server_loop = loop
+    return _server_loop
+
+
+class ChannelFeeder:
+    """
+    Delivers received data to a kernel channel on a feeder thread, holding readers while too much data is undelivered.
+    """
+
+    def __init__(self, context, channel, loop, name, limit=SERVER_RECV_LIMIT):
+        self.channel = channel
+        self.loop = loop
+        self.limit = limit
+        self.pending = 0
+        self._queue = deque()
+        self._cond = threading.Condition(threading.Lock())
+        # Created on the event loop.
+        self._room = None
+        self._running = True
+        context.threaded(self._feed, thread_name=f"feeder-{name}", daemon=True)
+
+    def __len__(self):
+        return self.pending
+
+    async def put(self, data):
+        """
+        Queues data for the channel, waiting while the undelivered data is at the limit. Called on the event loop.
+        """
+        if self._room is None:
+            self._room = asyncio.Event()
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                if self.pending < self.limit:
+                    self._append(data)
+                    return
+                self._room.clear()
+            await self._room.wait()
+
+    def put_nowait(self, data):
+        """
+        Queues data for the channel regardless of the limit.
+        """
+        with self._cond:
+            if self._running:
+                self._append(data)
+
+    def _append(self, data):
+        self._queue.append(data)
+        self.pending += len(data)
+        self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._queue.clear()
+            self.pending = 0
+            self._cond.notify()
+        self.loop.call_soon_threadsafe(self._release)
+
+    def _release(self):
+        if self._room is not None:
+            self._room.set()
+
+    def _feed(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or not self._running)
+                if not self._running:
+                    return
+                data = self._queue.popleft()
+            self.channel(data)
+            with self._cond:
+                self.pending -= len(data)
+                if self.pending < self.limit:
+                    self.loop.call_soon_threadsafe(self._release)
+
+
+class AsyncTCPServer(Module):
+    """
+    AsyncTCPServer opens up a server on the given port and serves any number of connections on the server loop.
+
+    Anything sent to the {name}/send channel is sent to every connection. Any data read from a connection is sent to
+    the {name}/recv channel.
+    """
+
+    def __init__(
+        self,
+        context,
+        name,
+        port=23,
+        read_size=SERVER_READ_SIZE,
+        recv_limit=SERVER_RECV_LIMIT,
+    ):
+        """
+        Laser Server init.
+
+        @param context: Context at which this module is attached.
+        @param name: Name of this module
+        @param port: Port being used for the server.
+        @param read_size: Maximum bytes read from a connection at once.
+        @param recv_limit: Bytes received but not yet delivered to the recv channel before reading is held.
+        """
+        Module.__init__(self, context, name)
+        _ = self.context._
+        self.port = port
+        self.read_size = read_size
+        self.events_channel = self.context.channel(f"server-tcp-{port}")
+        self.data_channel = self.context.channel(f"data-tcp-{port}")
+        self.recv = self.context.channel(f"{name}/recv", pure=True)
+        self.loop = server_loop()
+        self.feeder = ChannelFeeder(
+            self.context, self.recv, self.loop, f"tcp-{port}", limit=recv_limit
+        )
+        self.server = None
+        self._connections = set()
+        self.socket = socket.socket()
+        try:
+            self.socket.bind(("", port))
+            self.socket.listen(5)
+            self.socket.setblocking(False)
+        except OSError:
+            self.events_channel(_("Could not start listening."))
+            self.socket.close()
+            self.socket = None
+            return
+        asyncio.run_coroutine_threadsafe(self._serve(), self.loop)
+
+    def stop(self):
+        self.state = "terminate"
+
+    def module_close(self, *args, **kwargs):
+        _ = self.context._
+        self.events_channel(_("Shutting down server."))
+        self.state = "terminate"
+        self.feeder.stop()
+        self.loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        elif self.socket is not None:
+            self.socket.close()
+        self.socket = None
+        for writer in list(self._connections):
+            writer.close()
+
+    async def _serve(self):
+        _ = self.context._
+        if self.state == "terminate" or self.socket is None:
+            return
+        self.server = await asyncio.start_server(
+            self._handle, sock=self.socket, limit=self.read_size
+        )
+        self.events_channel(
+            _("Listening {name} on port {port}...").format(
+                name=self.name, port=self.port
+            )
+        )
+
+    async def _handle(self, reader, writer):
+        """
+        The TCP connection handler, reads the connection until it closes.
+        """
+        _ = self.context._
+        address = writer.get_extra_info("peername")
+        self.events_channel(_("Socket Connected: {address}").format(address=address))
+        self._connections.add(writer)
+        loop = self.loop
+        data_channel = self.data_channel
+
+        def send(e):
+            if writer.is_closing():
+                return
+            if isinstance(e, str):
+                e = bytes(e, "utf-8")
+            loop.call_soon_threadsafe(writer.write, e)
+            if data_channel:
+                data_channel(f"<-- {str(e)}")
+
+        send_channel = self.context.channel(f"{self.name}/send", pure=True)
+        send_channel.watch(send)
+        try:
+            while self.state != "terminate":
+                data = await reader.read(self.read_size)
+                if not data:
+                    break
+                if data_channel:
+                    data_channel(f"--> {str(data)}")
+                await self.feeder.put(data)
+        except OSError:
+            pass
+        finally:
+            send_channel.unwatch(send)
+            self._connections.discard(writer)
+            writer.close()
+            self.events_channel(
+                _("Connection to {address} was closed.").format(address=address)
+            )
+
+
+class AsyncUDPServer(Module):
+    """
+    AsyncUDPServer opens up a data server on the given port and waits for UDP packets on the server loop.
+
+    Anything sent to the {name}/send channel is sent as a reply to the last seen UDP packet.
+    Any packet the server picks up will be sent to the {name}/recv channel.
+    """
+
+    def __init__(self, context, name, port=23, udp_address=None):
+        """
+        Laser Server init.
+
+        @param context: Context at which this module is attached.
+        @param name: Name of this module.
+        @param port: UDP listen port.
+        """
+        Module.__init__(self, context, name)
+        self.port = port
+        self.events_channel = self.context.channel(f"server-udp-{port}")
+        self.data_channel = self.context.channel(f"data-udp-{port}")
+
+        self.udp_address = udp_address
+        self.context.channel(f"{name}/send").watch(self.send)
+        self.recv = self.context.channel(f"{name}/recv")
+        self.loop = server_loop()
+        self.feeder = ChannelFeeder(self.context, self.recv, self.loop, name)
+        self.transport = None
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("", self.port))
+        self.socket.setblocking(False)
+        asyncio.run_coroutine_threadsafe(self._serve(), self.loop)
+
+    def module_close(self, *args, **kwargs):
+        _ = self.context._
+        self.context.channel(f"{self.name}/send").unwatch(self.send)
+        # We stop watching the `send channel`
+        self.events_channel(_("Shutting down server."))
+        self.state = "terminate"
+        self.feeder.stop()
+        self.loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        elif self.socket is not None:
+            self.socket.close()
+        self.socket = None
+
+    def send(self, message):
+        _ = self.context._
+        if self.udp_address is None:
+            self.events_channel(
+                _(
+                    "No UDP packet can be sent as reply to a host that has never made contact."
+                )
+            )
+            return
+        self.loop.call_soon_threadsafe(self._sendto, message, self.udp_address)
+        if self.data_channel:
+            self.data_channel(f"<-- {str(message)}")
+
+    def _sendto(self, message, address):
+        if self.transport is not None:
+            self.transport.sendto(message, address)
+
+    async def _serve(self):
+        _ = self.context._
+        if self.state == "terminate" or self.socket is None:
+            return
+        self.transport, _protocol = await self.loop.create_datagram_endpoint(
+            lambda: _UDPProtocol(self), sock=self.socket
+        )
+        self.events_channel(_("UDP Socket({port}) Listening.").format(port=self.port))
+
+    def datagram_received(self, message, address):
+        if address is not None:
+            self.udp_address = address
+        if self.data_channel:
+            self.data_channel(f"--> {str(message)}")
+        self.feeder.put_nowait(message)
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server.datagram_received(data, addr)
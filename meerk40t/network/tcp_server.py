@@ -6,7 +6,7 @@ from meerk40t.kernel import Module
 def plugin(kernel, lifecycle=None):
     if lifecycle == "register":
         _ = kernel.translation
-        kernel.register("module/TCPServer", TCPServer)
+        kernel.register("module/ThreadedTCPServer", TCPServer)
 
 
 class TCPServer(Module):
@@ -6,7 +6,7 @@ from meerk40t.kernel import Module
 def plugin(kernel, lifecycle=None):
     if lifecycle == "register":
         _ = kernel.translation
-        kernel.register("module/UDPServer", UDPServer)
+        kernel.register("module/ThreadedUDPServer", UDPServer)
 
 
 class UDPServer(Module):
@@ -1,15 +1,27 @@
 """
 Newly Controller
 """
-import math
 import struct
 import time
 
+import numpy
+
 from meerk40t.core.cutcode.rastercut import RasterCut
 from meerk40t.newly.mock_connection import MockConnection
 from meerk40t.newly.usb_connection import USBConnection
 
 
+def scanline_payload(bits):
+    """
+    Packs the scanline bits, the first bit of the scanline being the least significant bit of the first byte.
+
+    @param bits: list or array of bits
+    @return: packed bytes
+    """
+    bits = numpy.asarray(bits, dtype=numpy.uint8)
+    return numpy.packbits(bits, bitorder="little").tobytes()
+
+
 class NewlyController:
     """
     Newly Controller
@@ -420,7 +432,7 @@ class NewlyController:
         """
         Send a scanline movement.
 
-        @param bits: list of bits.
+        @param bits: list or array of bits.
         @param right: Moving right?
         @param left: Moving left?
         @param top: Moving top?
@@ -431,23 +443,17 @@ class NewlyController:
         cmd = None
         if left:  # left movement
             cmd = bytearray(b"YF")
-            bits = bits[::-1]
         elif right:
             cmd = bytearray(b"YZ")
-            bits = bits[::-1]
         elif top:
             cmd = bytearray(b"XF")
-            bits = bits[::-1]
         elif bottom:
             cmd = bytearray(b"XZ")
-            bits = bits[::-1]
         if cmd is None:
             return  # 0,0 goes nowhere.
         count = len(bits)
-        byte_length = int(math.ceil(count / 8))
         cmd += struct.pack(">i", count)[1:]
-        binary = "".join([str(b) for b in bits])
-        cmd += int(binary, 2).to_bytes(byte_length, "little")
+        cmd += scanline_payload(bits)
         self(cmd)
         if left:
             self._last_x -= count
@@ -473,28 +479,31 @@ class NewlyController:
         @return:
         """
 
-        scanline = []
+        # Scanlines are collected as runs of equal bits.
+        run_bits = []
+        run_lengths = []
         increasing = True
 
         def commit_scanline():
-            if scanline:
+            if run_lengths:
                 # If there is a scanline commit the scanline.
+                scanline = numpy.repeat(
+                    numpy.array(run_bits, dtype=numpy.uint8), run_lengths
+                )
+                run_bits.clear()
+                run_lengths.clear()
                 if raster_cut.horizontal:
                     # Horizontal Raster.
                     if increasing:
                         self.scanline(scanline, right=True)
-                        scanline.clear()
                     else:
                         self.scanline(scanline, left=True)
-                        scanline.clear()
                 else:
                     # Vertical raster.
                     if increasing:
                         self.scanline(scanline, bottom=True)
-                        scanline.clear()
                     else:
                         self.scanline(scanline, top=True)
-                        scanline.clear()
 
         self("IN")
         self._clear_settings()
@@ -523,7 +532,8 @@ class NewlyController:
                         self._goto(x, y)  # remain standard rastermode
                 if dx != 0:
                     # Normal move, extend bytes.
-                    scanline.extend([int(on)] * abs(dx))
+                    run_bits.append(int(on))
+                    run_lengths.append(abs(dx))
                 previous_x, previous_y = x, y
         else:
             self.mode = "raster_vertical"
@@ -545,7 +555,8 @@ class NewlyController:
                         self._goto(x, y)  # remain standard rastermode
                 if dy != 0:
                     # Normal move, extend bytes
-                    scanline.extend([int(on)] * abs(dy))
+                    run_bits.append(int(on))
+                    run_lengths.append(abs(dy))
                 previous_x, previous_y = x, y
         commit_scanline()
 
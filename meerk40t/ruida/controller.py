@@ -36,17 +36,17 @@ class RuidaController:
         self._send_thread.start()
 
     def divide_data_into_queue(self):
-        last = 0
+        chunk = list()
         total = 0
-        data = self.job.buffer
-        for i, command in enumerate(data):
+        for command in self.job.buffer:
             total += len(command)
             if total > 1000:
-                self._send_queue.append(self.job.get_contents(last, i))
-                last = i
+                self._send_queue.append(self.job.swizzle(b"".join(chunk)))
+                chunk = list()
                 total = 0
-        if last != len(data):
-            self._send_queue.append(self.job.get_contents(last))
+            chunk.append(command)
+        if chunk:
+            self._send_queue.append(self.job.swizzle(b"".join(chunk)))
 
     def _data_sender(self):
         while self._send_queue:
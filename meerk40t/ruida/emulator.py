@@ -6,6 +6,7 @@ the received data into laser commands to be executed by the local driver.
 """
 
 import os
+from itertools import chain
 from typing import Tuple, Union
 
 from meerk40t.kernel import get_safe_path
@@ -14,6 +15,7 @@ from ..core.units import UNITS_PER_uM
 from .exceptions import RuidaCommandError
 from .rdjob import (
     RDJob,
+    RDParser,
     abscoord,
     decode14,
     decodeu35,
@@ -43,6 +45,7 @@ class RuidaEmulator:
 
         # self.magic = 0x38
         self.lut_swizzle, self.lut_unswizzle = swizzles_lut(self.magic)
+        self.parser = RDParser(self.magic)
 
         self.channel = None
 
@@ -95,6 +98,7 @@ class RuidaEmulator:
     def _set_magic(self, magic):
         self.magic = magic
         self.job.set_magic(magic)
+        self.parser.set_magic(magic)
         self.lut_swizzle, self.lut_unswizzle = swizzles_lut(self.magic)
         if self.channel:
             self.channel(f"Setting magic to 0x{self.magic:02x}")
@@ -150,8 +154,12 @@ class RuidaEmulator:
         @param unswizzle: Whether the given data should be unswizzled
         @return:
         """
-        packet = self.unswizzle(data) if unswizzle else data
-        for command in parse_commands(packet):
+        if unswizzle:
+            # Packets hold whole commands, flushing keeps replies from being held back.
+            commands = chain(self.parser.feed(data), self.parser.flush())
+        else:
+            commands = parse_commands(data)
+        for command in commands:
             array = list(command)
             try:
                 if not self._process_realtime(array):
@@ -1488,7 +1496,7 @@ class RuidaEmulator:
         return "Unknown", 0
 
     def unswizzle(self, data):
-        return bytes([self.lut_unswizzle[b] for b in data])
+        return bytes(data).translate(self.lut_unswizzle)
 
     def swizzle(self, data):
-        return bytes([self.lut_swizzle[b] for b in data])
+        return bytes(data).translate(self.lut_swizzle)
@@ -1,5 +1,10 @@
 import threading
 import time
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
 
 from meerk40t.core.cutcode.plotcut import PlotCut
 from meerk40t.core.units import UNITS_PER_uM
@@ -197,6 +202,8 @@ ELEMENT_ARRAY_MIRROR = b"\xF2\x07"  # mirror(1)
 
 MEM_CARD_ID = 0x02FE
 
+RD_BLOB_CHUNK_SIZE = 0x100000
+
 
 def encode_part(part):
     assert 0 <= part <= 255
@@ -364,13 +371,75 @@ def parse_commands(data):
     @param data:
     @return:
     """
+    if not data:
+        return
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    marks = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) >= 0x80).tolist()
     mark = 0
-    for i, b in enumerate(data):
-        if b >= 0x80 and mark != i:
+    for i in marks:
+        if mark != i:
+            yield data[mark:i]
+            mark = i
+    yield data[mark:]
+
+
+class RDParser:
+    """
+    Incremental parser of swizzled ruida data.
+
+    Data is fed in chunks, such as the chunks of a blob or the packets of a socket. Each chunk is unswizzled
+    and split into commands. A command is only known to be complete once the next command byte
+    arrives, so the trailing command of each chunk is held until the next chunk or flush().
+    """
+
+    def __init__(self, magic=None):
+        self.magic = None
+        self.unswizzle_table = None
+        self._partial = b""
+        if magic is not None:
+            self.set_magic(magic)
+
+    def set_magic(self, magic):
+        self.magic = magic
+        self.unswizzle_table = swizzles_lut(magic)[1]
+
+    def feed(self, data):
+        """
+        Unswizzles data and yields the commands it completes.
+
+        If the magic number is not yet known, it is determined from the histogram of this data.
+
+        @param data: swizzled bytes-like data
+        @return: generator of unswizzled commands
+        """
+        if not data:
+            return
+        if self.unswizzle_table is None:
+            self.set_magic(determine_magic_via_histogram(data))
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        data = data.translate(self.unswizzle_table)
+        marks = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) >= 0x80).tolist()
+        if not marks:
+            self._partial += data
+            return
+        mark = marks[0]
+        partial = self._partial + data[:mark]
+        if partial:
+            yield partial
+        for i in marks[1:]:
             yield data[mark:i]
             mark = i
-    if mark != len(data):
-        yield data[mark:]
+        self._partial = data[mark:]
+
+    def flush(self):
+        """
+        Yields the held trailing command, if any.
+        """
+        if self._partial:
+            yield self._partial
+        self._partial = b""
 
 
 def swizzle_byte(b, magic):
@@ -391,21 +460,26 @@ def unswizzle_byte(b, magic):
     return b
 
 
+@lru_cache(maxsize=None)
 def swizzles_lut(magic):
+    """
+    Returns the swizzle and unswizzle lookup tables for the magic number. The tables are bytes, so
+    they may be indexed per byte or used with bytes.translate().
+
+    @param magic: magic number, -1 for no swizzling
+    @return: swizzle table, unswizzle table
+    """
     if magic == -1:
-        lut = [s for s in range(256)]
+        lut = bytes(range(256))
         return lut, lut
-    lut_swizzle = [swizzle_byte(s, magic) for s in range(256)]
-    lut_unswizzle = [unswizzle_byte(s, magic) for s in range(256)]
+    lut_swizzle = bytes([swizzle_byte(s, magic) for s in range(256)])
+    lut_unswizzle = bytes([unswizzle_byte(s, magic) for s in range(256)])
     return lut_swizzle, lut_unswizzle
 
 
 def decode_bytes(data, magic=0x88):
     lut_swizzle, lut_unswizzle = swizzles_lut(magic)
-    array = list()
-    for b in data:
-        array.append(lut_unswizzle[b])
-    return bytes(array)
+    return bytes(data).translate(lut_unswizzle)
 
 
 def determine_magic_via_histogram(data):
@@ -417,27 +491,19 @@ def determine_magic_via_histogram(data):
     @param data:
     @return:
     """
-    histogram = [0] * 256
-    prev = -1
-    for d in data:
-        histogram[d] += 5 if prev == d else 1
-        prev = d
-    m = 0
-    magic = None
-    for i in range(len(histogram)):
-        v = histogram[i]
-        if v > m:
-            m = v
-            magic = i - 1
-    return magic
+    data = np.frombuffer(data, dtype=np.uint8)
+    if not len(data):
+        return None
+    histogram = np.bincount(data, minlength=256)
+    # Repeated values count 5 times.
+    repeats = data[1:][data[1:] == data[:-1]]
+    histogram += 4 * np.bincount(repeats, minlength=256)
+    return int(np.argmax(histogram)) - 1
 
 
 def encode_bytes(data, magic=0x88):
     lut_swizzle, lut_unswizzle = swizzles_lut(magic)
-    array = list()
-    for b in data:
-        array.append(lut_swizzle[b])
-    return bytes(array)
+    return bytes(data).translate(lut_swizzle)
 
 
 def magic_keys():
@@ -460,7 +526,7 @@ class RDJob:
         self._driver = driver
         self.channel = channel
         self.reply = None
-        self.buffer = list()
+        self.buffer = deque()
         self.plotcut = None
 
         self.priority = priority
@@ -509,7 +575,7 @@ class RDJob:
             self.write_command(e)
         else:
             if swizzle:
-                e = bytes([self.lut_swizzle[b] for b in e])
+                e = e.translate(self.lut_swizzle)
             output(e)
 
     @property
@@ -526,7 +592,8 @@ class RDJob:
                 return "Disabled"
 
     def clear(self):
-        self.buffer.clear()
+        with self.lock:
+            self.buffer.clear()
 
     def set_magic(self, magic):
         """
@@ -552,9 +619,16 @@ class RDJob:
         if magic is None:
             magic = determine_magic_via_histogram(data)
         self.set_magic(magic)
-        data = self.unswizzle(data)
+        # Parsed in chunks, the blob is never unswizzled as a whole.
+        parser = RDParser(self.magic)
+        data = memoryview(data)
+        commands = list()
+        for offset in range(0, len(data), RD_BLOB_CHUNK_SIZE):
+            chunk = data[offset : offset + RD_BLOB_CHUNK_SIZE]
+            commands.extend(parser.feed(chunk))
+        commands.extend(parser.flush())
         with self.lock:
-            self.buffer.extend(parse_commands(data))
+            self.buffer.extend(commands)
 
     def write_command(self, command):
         with self.lock:
@@ -564,7 +638,7 @@ class RDJob:
         return sum([sum(list(g)) for g in self.buffer])
 
     def get_contents(self, first=None, last=None, swizzled=True):
-        data = b"".join(self.buffer[first:last])
+        data = b"".join(islice(self.buffer, first, last))
         if swizzled:
             return self.swizzle(data)
         return data
@@ -579,13 +653,14 @@ class RDJob:
         if self.time_started is None:
             self.time_started = time.time()
         with self.lock:
-            command = self.buffer.pop(0)
+            command = self.buffer.popleft()
         try:
             array = list(command)
             self.process(array)
         except IndexError as e:
+            remaining = list(islice(self.buffer, 25))
             raise RuidaCommandError(
-                f"Could not process Ruida buffer, {self.buffer[:25]} with magic: {self.magic:02}"
+                f"Could not process Ruida buffer, {remaining} with magic: {self.magic:02}"
             ) from e
         if not self.buffer:
             # Buffer is empty now. Job is complete
@@ -1229,10 +1304,10 @@ class RDJob:
             self.channel(f"-**-> {str(bytes(array).hex())}\t({desc})")
 
     def unswizzle(self, data):
-        return bytes([self.lut_unswizzle[b] for b in data])
+        return bytes(data).translate(self.lut_unswizzle)
 
     def swizzle(self, data):
-        return bytes([self.lut_swizzle[b] for b in data])
+        return bytes(data).translate(self.lut_swizzle)
 
     def _calculate_layer_bounds(self, layer):
         max_x = float("-inf")
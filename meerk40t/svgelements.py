@@ -8987,6 +8987,33 @@ class SVG(Group):
 
         yield from semiparse(nodes)
 
+    @staticmethod
+    def _stream_structure_parse(source):
+        """
+        SVG structure pass for streaming: yields the parse events as they are read, without the shadow tree. <use>
+        objects are not given their definitions. Children of the root are released once they end, so the file is
+        never held in full.
+        """
+        root = None
+        depth = 0
+        for event, elem in iterparse(source, events=("start", "end", "start-ns")):
+            if event == "start-ns":
+                yield None, event, elem
+                continue
+            tag = elem.tag
+            if tag.startswith("{http://www.w3.org/2000/svg"):
+                tag = tag[28:]  # Removing namespace. http://www.w3.org/2000/svg:
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                yield tag, event, elem
+            else:
+                depth -= 1
+                yield tag, event, elem
+                if depth == 1:
+                    del root[:]
+
     @staticmethod
     def parse(
         source,
@@ -8999,6 +9026,7 @@ class SVG(Group):
         context=None,
         parse_display_none=False,
         on_error="ignore",
+        stream=None,
     ):
         """
         Parses the SVG file. All attributes are things which the SVG document itself could not be aware of, such as
@@ -9014,6 +9042,8 @@ class SVG(Group):
         :param context: Any existing document context.
         :param parse_display_none: Parse display_none values anyway.
         :param on_error: Error mode, "ignore", "raise", "stop"
+        :param stream: Function called with the root SVG whenever children of the root are complete. These children
+            are removed from the root after the call, the root is returned empty. <use> objects are not supported.
         :return:
         """
         use = 0
@@ -9031,7 +9061,11 @@ class SVG(Group):
         if transform is not None:
             values[SVG_ATTR_TRANSFORM] = transform
 
-        for tag, event, elem in SVG._use_structure_parse(source):
+        if stream is not None:
+            events = SVG._stream_structure_parse(source)
+        else:
+            events = SVG._use_structure_parse(source)
+        for tag, event, elem in events:
             """
             SVG element parsing parses the job compiling any parsed elements into their compiled object forms.
             """
@@ -9382,6 +9416,19 @@ class SVG(Group):
                             pass
 
                 context, values = stack.pop()
+                if (
+                    stream is not None
+                    and len(stack) == 1
+                    and context is root
+                    and isinstance(root, SVG)
+                    and len(root)
+                ):
+                    stream(root)
+                    objects = root.objects
+                    for s in root.select():
+                        if objects.get(s.id) is s:
+                            del objects[s.id]
+                    del root[:]
             elif event == "start-ns":
                 if elem[0] != SVG_ATTR_DATA:
                     # Rare wc3 test uses a 'd' namespace.
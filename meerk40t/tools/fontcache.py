@@ -0,0 +1,125 @@
+"""
+Font cache shared by the vector font parsers.
+
+Parsing a font file is far more expensive than rendering a line of text with it. The
+FontCache keeps the most recently used parsed fonts keyed by their path, file
+modification time and file size, so editing a font on disk reloads it while repeated
+text updates reuse the already parsed font.
+
+GlyphOutline records the path commands of a single rendered glyph relative to its origin,
+allowing the parsers to memoize the outline of each glyph per font size and replay it at
+any offset.
+"""
+
+import threading
+from collections import OrderedDict
+from os import stat
+from os.path import realpath
+
+FONT_CACHE_SIZE = 16
+OUTLINE_CACHE_SIZE = 4096
+
+
+class GlyphOutline:
+    """
+    Path-like recorder of the commands used to render a glyph. All the coordinates are
+    given as x, y pairs, so a recorded outline can be replayed at an offset.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.advance = (0, 0)
+
+    def new_path(self):
+        self.commands.append(("new_path", ()))
+
+    def move(self, *args):
+        self.commands.append(("move", args))
+
+    def line(self, *args):
+        self.commands.append(("line", args))
+
+    def quad(self, *args):
+        self.commands.append(("quad", args))
+
+    def cubic(self, *args):
+        self.commands.append(("cubic", args))
+
+    def close(self):
+        self.commands.append(("close", ()))
+
+    def arc(self, *args):
+        self.commands.append(("arc", args))
+
+    def replay(self, path, dx=0, dy=0):
+        """
+        Performs the recorded commands on path, offset by dx, dy.
+        """
+        for command, args in self.commands:
+            if args and (dx or dy):
+                args = [
+                    None if v is None else v + (dy if i & 1 else dx)
+                    for i, v in enumerate(args)
+                ]
+            getattr(path, command)(*args)
+
+
+def outline_cache_put(cache, key, outline):
+    """
+    Stores the outline in the given outline cache, dropping the cache when it is full.
+    """
+    if len(cache) >= OUTLINE_CACHE_SIZE:
+        cache.clear()
+    cache[key] = outline
+
+
+class FontCache:
+    """
+    LRU cache of parsed fonts keyed by font class, path, modification time and size.
+
+    Cached fonts are shared, so rendering with them should be done while holding the
+    cache lock since the parsers keep their render state on the font.
+    """
+
+    def __init__(self, size=FONT_CACHE_SIZE):
+        self.size = size
+        self.lock = threading.RLock()
+        self._fonts = OrderedDict()
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def clear(self):
+        with self.lock:
+            self._fonts.clear()
+
+    def get(self, fontclass, font_path):
+        """
+        Returns the parsed font of fontclass for font_path, parsing the file only if it is
+        not cached or changed on disk.
+
+        @param fontclass: font parser class, as given by fonts_registered()
+        @param font_path: path of the font file
+        @return: parsed font
+        """
+        font_path = realpath(font_path)
+        info = stat(font_path)
+        key = (fontclass, font_path)
+        version = (info.st_mtime_ns, info.st_size)
+        with self.lock:
+            try:
+                cached_version, font = self._fonts[key]
+                if cached_version == version:
+                    self._fonts.move_to_end(key)
+                    return font
+                del self._fonts[key]
+            except KeyError:
+                pass
+            font = fontclass(font_path)
+            self._fonts[key] = (version, font)
+            while len(self._fonts) > self.size:
+                self._fonts.popitem(last=False)
+            return font
+
+
+font_cache = FontCache()
@@ -93,6 +93,24 @@ TYPE_UNTIL = (
 TYPE_CALL = 0xB0 | 0b1111  # The two higher level bytes are call label index.
 # If until is set to 0xFFFF termination only happens on interrupt.
 
+# Svg path data, tokenized as the svgelements parser does.
+PATH_D_TOKENS = re.compile(
+    r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?"
+)
+PATH_D_SEPARATORS = re.compile(r"[ ,\t\n\x0C\x0D]+")
+PATH_D_ARGUMENTS = {
+    "M": 2,
+    "Z": 0,
+    "L": 2,
+    "H": 1,
+    "V": 1,
+    "C": 6,
+    "S": 4,
+    "Q": 4,
+    "T": 2,
+    "A": 7,
+}
+
 
 class Polygon:
     def __init__(self, *args):
@@ -1227,11 +1245,14 @@ class Geomstr:
 
     @classmethod
     def svg(cls, path_d):
-        obj = cls()
         if isinstance(path_d, str):
+            obj = cls._svg_path_d(path_d)
+            if obj is not None:
+                return obj
             path = Path(path_d)
         else:
             path = path_d
+        obj = cls()
         last_point = None
         for seg in path:
             if isinstance(seg, Move):
@@ -1267,6 +1288,241 @@ class Geomstr:
             last_point = seg.end
         return obj
 
+    @classmethod
+    def _svg_path_d(cls, path_d):
+        """
+        Parses svg path data straight into segments, without building svgelements segments.
+
+        The path data is tokenized at once and the segments are written into a single allocation. Arcs are only
+        reserved while parsing and are converted together once every arc is known. Path data which does not tokenize
+        plainly, such as compacted arc flags or missing arguments, is left to the svgelements parser.
+
+        @param path_d: svg path data string
+        @return: Geomstr or None if the path data requires the svgelements parser.
+        """
+        tokens = PATH_D_TOKENS.findall(path_d)
+        if sum(map(len, tokens)) != len(PATH_D_SEPARATORS.sub("", path_d)):
+            # Characters other than tokens and separators.
+            return None
+        obj = cls()
+        if not tokens:
+            return obj
+        if tokens[0] not in ("M", "m"):
+            return None
+        commands = []
+        arguments = []
+        for token in tokens:
+            if token.isalpha():
+                commands.append((token, len(arguments)))
+            else:
+                arguments.append(token)
+        values = list(map(float, arguments))
+        commands.append((None, len(values)))
+
+        line = complex(TYPE_LINE, 0)
+        quad = complex(TYPE_QUAD, 0)
+        cubic = complex(TYPE_CUBIC, 0)
+        end = (np.nan, np.nan, complex(TYPE_END, 0), np.nan, np.nan)
+        rows = []
+        arcs = []
+        current = None
+        z = None
+        last = None
+        control = None
+        for i in range(len(commands) - 1):
+            command, first = commands[i]
+            stop = commands[i + 1][1]
+            upper = command.upper()
+            arity = PATH_D_ARGUMENTS[upper]
+            relative = command != upper
+            if arity == 0:
+                if stop != first:
+                    return None
+                rows.append((current, 0, line, 0, z))
+                current = last = z
+                control = None
+                continue
+            if stop == first or (stop - first) % arity:
+                return None
+            for j in range(first, stop, arity):
+                start = current
+                if relative and start is not None:
+                    x0 = start.real
+                    y0 = start.imag
+                else:
+                    x0 = y0 = 0.0
+                if upper == "M" or upper == "L":
+                    pos = complex(values[j] + x0, values[j + 1] + y0)
+                    if upper == "M" and j == first:
+                        if last is not None and last == pos:
+                            # Moving to the last point is a deliberate subpath break.
+                            rows.append(end)
+                        z = pos
+                    else:
+                        rows.append((start, 0, line, 0, pos))
+                    control = None
+                elif upper == "H":
+                    pos = complex(values[j] + x0, start.imag)
+                    rows.append((start, 0, line, 0, pos))
+                    control = None
+                elif upper == "V":
+                    pos = complex(start.real, values[j] + y0)
+                    rows.append((start, 0, line, 0, pos))
+                    control = None
+                elif upper == "A":
+                    large = arguments[j + 3]
+                    sweep = arguments[j + 4]
+                    if large not in ("0", "1") or sweep not in ("0", "1"):
+                        # Compacted flags, such as "a1 1 0 11 5 5".
+                        return None
+                    pos = complex(values[j + 5] + x0, values[j + 6] + y0)
+                    rx = abs(values[j])
+                    ry = abs(values[j + 1])
+                    if (
+                        rx == 0
+                        or ry == 0
+                        or (
+                            abs(start.real - pos.real) <= 1e-12
+                            and abs(start.imag - pos.imag) <= 1e-12
+                        )
+                    ):
+                        rows.append((start, start, complex(TYPE_ARC, 0), start, pos))
+                    else:
+                        arcs.append(
+                            (
+                                len(rows),
+                                start,
+                                pos,
+                                rx,
+                                ry,
+                                values[j + 2],
+                                large == "1",
+                                sweep == "1",
+                            )
+                        )
+                        # Circular arcs reserve one row, elliptical arcs four quads.
+                        rows.extend([end] * (1 if rx == ry else 4))
+                    control = None
+                else:
+                    points = [
+                        complex(values[k] + x0, values[k + 1] + y0)
+                        for k in range(j, j + arity, 2)
+                    ]
+                    pos = points[-1]
+                    if upper == "C":
+                        control = points[1]
+                        rows.append((start, points[0], cubic, control, pos))
+                    elif upper == "Q":
+                        control = points[0]
+                        rows.append((start, control, quad, control, pos))
+                    else:
+                        # Reflection of the last control point of a curve.
+                        if control is None:
+                            smooth = start
+                        else:
+                            smooth = start + (start - control)
+                        if upper == "S":
+                            control = points[0]
+                            rows.append((start, smooth, cubic, control, pos))
+                        else:
+                            control = smooth
+                            rows.append((start, smooth, quad, smooth, pos))
+                current = last = pos
+        if not rows:
+            return obj
+        obj._ensure_capacity(len(rows))
+        obj.segments[0 : len(rows)] = rows
+        obj.index = len(rows)
+        if arcs:
+            obj._svg_arcs(arcs)
+        return obj
+
+    def _svg_arcs(self, arcs):
+        """
+        Writes svg parameterized arcs into their reserved rows. Circular arcs are written as an arc, elliptical arcs as
+        four quads.
+
+        See: http://www.w3.org/TR/SVG/implnote.html#ArcImplementationNotes
+
+        @param arcs: reserved row, start, end, rx, ry, rotation in degrees, large arc flag and sweep flag of each arc
+        @return:
+        """
+        arcs = np.array(arcs, dtype=complex)
+        rows = arcs[:, 0].real.astype(int)
+        start = arcs[:, 1]
+        end = arcs[:, 2]
+        rx, ry, rotation, large_arc, sweep_flag = arcs[:, 3:].real.T
+        theta = np.radians(rotation)
+        cos_r = np.cos(theta)
+        sin_r = np.sin(theta)
+        delta = (start - end) / 2
+        x1p = cos_r * delta.real + sin_r * delta.imag
+        y1p = -sin_r * delta.real + cos_r * delta.imag
+        x1p_sq = x1p * x1p
+        y1p_sq = y1p * y1p
+
+        # Correct out of range radii.
+        scale = np.sqrt(np.maximum(x1p_sq / (rx * rx) + y1p_sq / (ry * ry), 1.0))
+        rx = rx * scale
+        ry = ry * scale
+        rx_sq = rx * rx
+        ry_sq = ry * ry
+
+        t1 = rx_sq * y1p_sq
+        t2 = ry_sq * x1p_sq
+        c = np.sqrt(np.abs((rx_sq * ry_sq - t1 - t2) / (t1 + t2)))
+        c[large_arc == sweep_flag] *= -1
+        cxp = c * rx * y1p / ry
+        cyp = -c * ry * x1p / rx
+        mid = (start + end) / 2
+        center = (cos_r * cxp - sin_r * cyp + mid.real) + 1j * (
+            sin_r * cxp + cos_r * cyp + mid.imag
+        )
+        ux = (x1p - cxp) / rx
+        uy = (y1p - cyp) / ry
+        vx = (-x1p - cxp) / rx
+        vy = (-y1p - cyp) / ry
+        n = np.sqrt((ux * ux + uy * uy) * (vx * vx + vy * vy))
+        # Clipped, inaccuracies can fall slightly out of range.
+        d = np.minimum(np.maximum((ux * vx + uy * vy) / n, -1.0), 1.0)
+        angle = np.degrees(np.arccos(d))
+        angle[ux * vy - uy * vx < 0] *= -1
+        angle %= 360
+        angle[sweep_flag == 0] -= 360
+        sweep = np.radians(angle)
+        start_t = np.arctan2(uy, ux)
+        center = center[:, None]
+        rotate = (cos_r + 1j * sin_r)[:, None]
+        rx = rx[:, None]
+        ry = ry[:, None]
+
+        circular = rx[:, 0] == ry[:, 0]
+        if circular.any():
+            t = (start_t + sweep / 2)[:, None]
+            control = (center + rotate * (rx * np.cos(t) + 1j * ry * np.sin(t)))[:, 0]
+            info = np.full(len(rows), complex(TYPE_ARC, 0))
+            segments = np.column_stack((start, control, info, control, end))
+            self.segments[rows[circular]] = segments[circular]
+            if circular.all():
+                return
+        # Elliptical arcs as four quads, with control points at the slice middles.
+        t_slice = (sweep / 4)[:, None]
+        t = start_t[:, None] + t_slice * np.arange(5)
+        points = center + rotate * (rx * np.cos(t) + 1j * ry * np.sin(t))
+        points[:, 0] = start
+        points[:, 4] = end
+        t = (t[:, :-1] + t[:, 1:]) / 2
+        alpha = (4.0 - np.cos(t_slice)) / 3.0
+        control = center + alpha * rotate * (rx * np.cos(t) + 1j * ry * np.sin(t))
+        quads = np.empty(control.shape + (5,), dtype=complex)
+        quads[..., 0] = points[:, :-1]
+        quads[..., 1] = control
+        quads[..., 2] = complex(TYPE_QUAD, 0)
+        quads[..., 3] = control
+        quads[..., 4] = points[:, 1:]
+        elliptical = ~circular
+        self.segments[rows[elliptical, None] + np.arange(4)] = quads[elliptical]
+
     @classmethod
     def image(cls, pil_image, invert=False, vertical=False, bidirectional=True):
         g = cls()
@@ -1514,6 +1770,12 @@ class Geomstr:
     def hatch(cls, outer, angle, distance):
         """
         Create a hatch geometry from an outer shape, an angle (in radians) and distance (in units).
+
+        The intersections of every scanline with every edge of the segmented outline are
+        solved at once. This gives the same lines as stepping a Scanbeam through the
+        scanlines: an edge is active for the scanlines within (y_low, y_high] and the
+        actives of each scanline are paired from the left, alternating direction.
+
         @param outer:
         @param angle:
         @param distance:
@@ -1522,37 +1784,91 @@ class Geomstr:
         outlines = outer.segmented()
         path = outlines
         path.rotate(angle)
-        vm = Scanbeam(path)
-        y_min, y_max = vm.event_range()
-        vm.valid_low = y_min - distance
-        vm.valid_high = y_max + distance
-        vm.scanline_to(vm.valid_low)
-
-        forward = True
         geometry = cls()
+
+        segments = path.segments[: path.index]
+        segments = segments[segments[:, 2] == TYPE_LINE]
+        if len(segments) == 0:
+            return geometry
+        a = segments[:, 0]
+        b = segments[:, -1]
+        y_low = np.minimum(a.imag, b.imag)
+        y_high = np.maximum(a.imag, b.imag)
+        y_min = y_low.min()
+        y_max = y_high.max()
         if np.isinf(y_max):
             return geometry
-        while vm.current_is_valid_range():
-            vm.scanline_to(vm.scanline + distance)
-            y = vm.scanline
-            actives = vm.actives()
-
-            r = range(1, len(actives), 2) if forward else range(len(actives) - 1, 0, -2)
-            for i in r:
-                left_segment = actives[i - 1]
-                right_segment = actives[i]
-                left_segment_x = vm.x_intercept(left_segment)
-                right_segment_x = vm.x_intercept(right_segment)
-                if forward:
-                    geometry.line(
-                        complex(left_segment_x, y), complex(right_segment_x, y)
-                    )
-                else:
-                    geometry.line(
-                        complex(right_segment_x, y), complex(left_segment_x, y)
-                    )
-                geometry.end()
-            forward = not forward
+        valid_low = y_min - distance
+        valid_high = y_max + distance
+
+        # Scanlines are stepped by repeated addition, accumulated sequentially.
+        count = int((valid_high - valid_low) / distance) + 3
+        scanlines = np.cumsum(np.append(valid_low, np.full(count, distance)))
+        last = np.searchsorted(scanlines, valid_high, side="right")
+        while last >= len(scanlines):
+            count *= 2
+            scanlines = np.cumsum(np.append(valid_low, np.full(count, distance)))
+            last = np.searchsorted(scanlines, valid_high, side="right")
+        scanlines = scanlines[1 : last + 1]
+
+        # Every (scanline, edge) pair where the edge is active.
+        first = np.searchsorted(scanlines, y_low, side="right")
+        counts = np.searchsorted(scanlines, y_high, side="right") - first
+        edges = np.repeat(np.arange(len(segments)), counts)
+        if len(edges) == 0:
+            return geometry
+        offsets = np.cumsum(counts) - counts
+        scans = np.repeat(first - offsets, counts) + np.arange(len(edges))
+        y = scanlines[scans]
+
+        old_np_seterr = np.seterr(invalid="ignore", divide="ignore")
+        try:
+            # If horizontal slope is undefined. But, all x-ints are at x since x0=x1
+            m = (b.imag - a.imag) / (b.real - a.real)
+            y0 = a.imag - (m * a.real)
+            m = m[edges]
+            x = np.where(~np.isinf(m), (y - y0[edges]) / m, np.real(a[edges]))
+        finally:
+            np.seterr(**old_np_seterr)
+
+        order = np.lexsort((x, scans))
+        scans = scans[order]
+        x = x[order]
+        y = y[order]
+
+        # Rank of each intercept within its scanline, and the number of actives there.
+        starts = np.flatnonzero(np.diff(scans, prepend=-1))
+        actives = np.diff(np.append(starts, len(scans)))
+        rank = np.arange(len(scans)) - np.repeat(starts, actives)
+        n = np.repeat(actives, actives)
+        forward = scans % 2 == 0
+
+        # Forward scanlines pair (0, 1), (2, 3)... Backward scanlines pair from the end.
+        right = np.where(forward, rank % 2 == 1, (n - 1 - rank) % 2 == 0) & (rank >= 1)
+        right = np.flatnonzero(right)
+        left = right - 1
+        pair_forward = forward[right]
+        # Backward pairs are given in descending order within their scanline.
+        pair_order = np.lexsort(
+            (np.where(pair_forward, right, -right), scans[right])
+        )
+        left = left[pair_order]
+        right = right[pair_order]
+        pair_forward = pair_forward[pair_order]
+        left_points = x[left] + 1j * y[left]
+        right_points = x[right] + 1j * y[right]
+
+        lines = len(right)
+        geometry._ensure_capacity(2 * lines)
+        hatch = geometry.segments[: 2 * lines]
+        hatch[0::2, 0] = np.where(pair_forward, left_points, right_points)
+        hatch[0::2, 1] = 0
+        hatch[0::2, 2] = TYPE_LINE
+        hatch[0::2, 3] = 0
+        hatch[0::2, 4] = np.where(pair_forward, right_points, left_points)
+        hatch[1::2] = np.nan
+        hatch[1::2, 2] = TYPE_END
+        geometry.index = 2 * lines
         geometry.rotate(-angle)
         return geometry
 
@@ -1658,95 +1974,191 @@ class Geomstr:
         @param distance:
         @return:
         """
-        segments = list()
-        for point in self.as_equal_interpolated_points(distance=distance):
-            if point is None:
-                if segments:
-                    yield segments
-                    segments = list()
-            else:
-                segments.append(point)
-        if segments:
-            yield segments
+        points, breaks = self.as_equal_interpolated_arrays(distance=distance)
+        pos = 0
+        for b in [*breaks.tolist(), len(points)]:
+            if b > pos:
+                yield points[pos:b].tolist()
+            pos = b
 
-    def as_equal_interpolated_points(self, distance=100):
+    def as_equal_interpolated_points(self, distance=100, tolerance=None):
         """
         Regardless of specified distance this will always give the start and end points of each node within the
         geometry. It will not duplicate the nodes if the start of one is the end of another. If the start and end
         values do not line up, it will yield a None value to denote there is a broken path.
 
+        See as_equal_interpolated_arrays().
+
         @param distance:
+        @param tolerance: maximum distance between the curves and their flattening
         @return:
         """
-
-        at_start = True
-        end = None
-        for e in self.segments[: self.index]:
-            seg_type = int(e[2].real)
-            start = e[0]
-            if end != start and not at_start:
-                # Start point does not equal previous end point.
-                yield None
-                at_start = True
-                if seg_type == TYPE_END:
-                    # End segments, flag new start but should not be returned.
-                    continue
-            end = e[4]
-            if at_start:
-                yield start
-                at_start = False
-
-            if seg_type == TYPE_END:
-                at_start = True
-                continue
-            elif seg_type == TYPE_LINE:
-                pass
-            elif seg_type == TYPE_QUAD:
-                ts = np.linspace(0, 1, 1000)
-                pts = self._quad_position(e, ts)
-                distances = np.abs(pts[:-1] - pts[1:])
-                distances = np.cumsum(distances)
-                max_distance = distances[-1]
-                dist_values = np.linspace(
-                    0,
-                    max_distance,
-                    int(np.ceil(max_distance / distance)),
-                    endpoint=False,
-                )[1:]
-                near_t = np.searchsorted(distances, dist_values, side="right")
-                pts = pts[near_t]
-                yield from pts
-            elif seg_type == TYPE_CUBIC:
-                ts = np.linspace(0, 1, 1000)
-                pts = self._cubic_position(e, ts)
-                distances = np.abs(pts[:-1] - pts[1:])
-                distances = np.cumsum(distances)
-                max_distance = distances[-1]
-                dist_values = np.linspace(
-                    0,
-                    max_distance,
-                    int(np.ceil(max_distance / distance)),
-                    endpoint=False,
-                )[1:]
-                near_t = np.searchsorted(distances, dist_values, side="right")
-                pts = pts[near_t]
-                yield from pts
-            elif seg_type == TYPE_ARC:
-                ts = np.linspace(0, 1, 1000)
-                pts = self._arc_position(e, ts)
-                distances = np.abs(pts[:-1] - pts[1:])
-                distances = np.cumsum(distances)
-                max_distance = distances[-1]
-                dist_values = np.linspace(
-                    0,
-                    max_distance,
-                    int(np.ceil(max_distance / distance)),
-                    endpoint=False,
-                )[1:]
-                near_t = np.searchsorted(distances, dist_values, side="right")
-                pts = pts[near_t]
-                yield from pts
-            yield end
+        points, breaks = self.as_equal_interpolated_arrays(
+            distance=distance, tolerance=tolerance
+        )
+        pos = 0
+        for b in breaks.tolist():
+            yield from points[pos:b].tolist()
+            yield None
+            pos = b
+        yield from points[pos:].tolist()
+
+    def as_equal_interpolated_arrays(self, distance=100, tolerance=None):
+        """
+        Equally interpolated points of the geometry as a single array, the points of as_equal_interpolated_points()
+        without the None values. The breaks are the indexes of the points preceded by a None, a break equal to the
+        number of points is a None at the end.
+
+        The curves of all types are flattened at once. Each curve is evenly subdivided into as many parts as are
+        needed to stay within tolerance of the curve, the points are spaced evenly along the flattened curve.
+
+        @param distance: distance between the points along the curves
+        @param tolerance: maximum distance between the curves and their flattening, by default 1% of distance.
+        @return: complex array of points, int array of breaks
+        """
+        if tolerance is None:
+            tolerance = distance * 0.01
+        segments = self.segments[: self.index]
+        infos = np.real(segments[:, 2]).astype(int)
+        starts = segments[:, 0]
+        ends = segments[:, 4]
+        is_end = infos == TYPE_END
+
+        # Breaks (None) and start points, only the previous segment decides these.
+        after_end = np.ones(len(segments), dtype=bool)
+        after_end[1:] = is_end[:-1]
+        broken = np.zeros(len(segments), dtype=bool)
+        broken[1:] = ends[:-1] != starts[1:]
+        broken &= ~after_end
+        has_start = after_end | (broken & ~is_end)
+
+        # Interior points of the curves.
+        curves = np.flatnonzero(
+            (infos == TYPE_QUAD) | (infos == TYPE_CUBIC) | (infos == TYPE_ARC)
+        )
+        interior, interior_counts = self._equal_interpolated_curves(
+            segments[curves], infos[curves], distance, tolerance
+        )
+        counts = has_start.astype(int) + ~is_end
+        counts[curves] += interior_counts
+        offsets = np.cumsum(counts) - counts
+
+        points = np.empty(int(counts.sum()), dtype=complex)
+        points[offsets[has_start]] = starts[has_start]
+        if len(interior):
+            first = offsets[curves] + has_start[curves]
+            curve_offsets = np.cumsum(interior_counts) - interior_counts
+            positions = np.arange(len(interior)) + np.repeat(
+                first - curve_offsets, interior_counts
+            )
+            points[positions] = interior
+        points[(offsets + counts - 1)[~is_end]] = ends[~is_end]
+        return points, offsets[broken]
+
+    def _equal_interpolated_curves(self, curves, infos, distance, tolerance):
+        """
+        Evenly spaced interior points of the curves, with the spacing of as_equal_interpolated_points().
+
+        @param curves: quad, cubic and arc segments
+        @param infos: segment types of the curves
+        @param distance: distance between the points along the curves
+        @param tolerance: maximum distance between the curves and their flattening
+        @return: complex array of interior points, int array of the number of points of each curve.
+        """
+        count = len(curves)
+        if count == 0:
+            return np.zeros(0, dtype=complex), np.zeros(0, dtype=int)
+        start = curves[:, 0]
+        c1 = curves[:, 1]
+        c2 = curves[:, 3]
+        end = curves[:, 4]
+        quads = infos == TYPE_QUAD
+        cubics = infos == TYPE_CUBIC
+        arcs = np.flatnonzero(infos == TYPE_ARC)
+
+        # Bezier subdivisions, the chord error of n parts is at most max |B''| / (8 n^2).
+        bend = np.zeros(count)
+        bend[quads] = 2 * np.abs(start[quads] - 2 * c1[quads] + end[quads])
+        bend[cubics] = 6 * np.maximum(
+            np.abs(start[cubics] - 2 * c1[cubics] + c2[cubics]),
+            np.abs(c1[cubics] - 2 * c2[cubics] + end[cubics]),
+        )
+        parts = np.sqrt(bend / (8 * tolerance))
+        # Arc subdivisions, the chord error is r * (1 - cos(angle / 2)).
+        center = np.zeros(len(arcs), dtype=complex)
+        theta = np.zeros(len(arcs))
+        sweep = np.zeros(len(arcs))
+        for i, e in enumerate(curves[arcs]):
+            center[i] = self.arc_center(line=e)
+            theta[i] = self.angle(center[i], e[0])
+            sweep[i] = self.arc_sweep(line=e, center=center[i])
+        radius = np.abs(center - start[arcs])
+        valid = np.isfinite(center) & np.isfinite(sweep) & (radius > 0)
+        step = 2 * np.arccos(np.clip(1 - tolerance / radius[valid], -1, 1))
+        arc_parts = np.zeros(len(arcs))
+        arc_parts[valid] = np.abs(sweep[valid]) / step
+        parts[arcs] = arc_parts
+        parts[~np.isfinite(parts)] = 1
+        # Even, so that every other point flattens the curve in half as many parts.
+        parts = 2 * np.clip(np.ceil(parts / 2), 1, 1 << 15).astype(int)
+
+        # Flatten all curves at once, curve k has parts[k] + 1 points.
+        samples = parts + 1
+        first = np.cumsum(samples) - samples
+        last = first + parts
+        index = np.repeat(np.arange(count), samples)
+        t = (np.arange(len(index)) - first[index]) / parts[index]
+        pts = np.empty(len(index), dtype=complex)
+        q = quads[index]
+        k = index[q]
+        n_t = 1 - t[q]
+        pts[q] = n_t * n_t * start[k] + 2 * n_t * t[q] * c1[k] + t[q] * t[q] * end[k]
+        q = cubics[index]
+        k = index[q]
+        n_t = 1 - t[q]
+        pts[q] = (
+            n_t * n_t * n_t * start[k]
+            + 3 * n_t * t[q] * (n_t * c1[k] + t[q] * c2[k])
+            + t[q] * t[q] * t[q] * end[k]
+        )
+        arc_of = np.full(count, -1)
+        arc_of[arcs] = np.arange(len(arcs))
+        k = arc_of[index]
+        q = k >= 0
+        k = k[q]
+        with np.errstate(invalid="ignore", over="ignore"):
+            pts[q] = center[k] + radius[k] * np.exp(1j * (theta[k] + t[q] * sweep[k]))
+        # Clean endings, invalid arcs are taken as lines.
+        pts[first] = start
+        pts[last] = end
+
+        # Evenly spaced points along each flattened curve.
+        steps = np.abs(np.diff(pts))
+        steps[first[1:] - 1] = 0
+        traveled = np.zeros(len(pts))
+        np.cumsum(steps, out=traveled[1:])
+        length = traveled[last] - traveled[first]
+        # Flattened lengths fall short by about 1 / parts^2, extrapolate from half the parts.
+        halves = pts[(np.arange(len(pts)) - first[index]) % 2 == 0]
+        half_samples = parts // 2 + 1
+        half_first = np.cumsum(half_samples) - half_samples
+        half_steps = np.abs(np.diff(halves))
+        half_steps[half_first[1:] - 1] = 0
+        half_traveled = np.zeros(len(halves))
+        np.cumsum(half_steps, out=half_traveled[1:])
+        half_length = (
+            half_traveled[half_first + half_samples - 1] - half_traveled[half_first]
+        )
+        curve_length = np.maximum((4 * length - half_length) / 3, length)
+        spacing = np.ceil(curve_length / distance).astype(int)
+        counts = np.maximum(spacing - 1, 0)
+        curve = np.repeat(np.arange(count), counts)
+        j = np.arange(len(curve)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        targets = traveled[first[curve]] + length[curve] * j / spacing[curve]
+        interior = np.interp(targets, traveled, pts.real) + 1j * np.interp(
+            targets, traveled, pts.imag
+        )
+        return interior, counts
 
     def as_interpolated_segments(self, interpolate=100):
         """
@@ -1810,7 +2222,30 @@ class Geomstr:
                 at_start = True
 
     def segmented(self, distance=50):
-        return Geomstr.lines(*self.as_equal_interpolated_points(distance=distance))
+        """
+        Lines between the equally interpolated points, as Geomstr.lines() of as_equal_interpolated_points().
+
+        @param distance:
+        @return:
+        """
+        points, breaks = self.as_equal_interpolated_arrays(distance=distance)
+        if len(points) < 2:
+            return Geomstr()
+        # Lines between neighboring points without a break between them.
+        connected = np.ones(len(points) - 1, dtype=bool)
+        connected[breaks[breaks < len(points)] - 1] = False
+        lines = np.flatnonzero(connected)
+        segments = np.zeros((len(lines), 5), dtype=complex)
+        segments[:, 0] = points[lines]
+        segments[:, 2] = TYPE_LINE
+        segments[:, 4] = points[lines + 1]
+        # Each run of lines followed by a break is ended.
+        run = np.searchsorted(breaks, lines, side="right")
+        last = np.flatnonzero(np.append(run[1:] != run[:-1], True))
+        last = last[run[last] < len(breaks)]
+        end = (np.nan, np.nan, TYPE_END, np.nan, np.nan)
+        segments = np.insert(segments, last + 1, end, axis=0)
+        return Geomstr(segments)
 
     def _ensure_capacity(self, capacity):
         if self.capacity > capacity:
@@ -1,5 +1,7 @@
 import os
 
+from meerk40t.tools.fontcache import GlyphOutline, outline_cache_put
+
 JHFPARSER_VERSION = "0.0.1"
 
 """
@@ -52,6 +54,7 @@ class JhfFont:
     def __init__(self, filename):
         self.type = "Hershey"
         self.glyphs = dict()  # Glyph dictionary
+        self._outlines = dict()  # Rendered glyphs by (character, font_size)
         tempstr = os.path.basename(filename)
         fname, fext = os.path.splitext(tempstr)
         self.valid = False
@@ -258,31 +261,15 @@ class JhfFont:
                 # if cidx > 0:
                 #     path.new_path()
                 struct = self.glyphs[tchar]
-                nverts = struct["nverts"]
-                vertices = struct["vertices"]
                 offsetx += abs(struct["left"])
                 # offsetx += abs(struct["realleft"] - 1)
-                idx = 0
-                penup = True
-                lastx = 0
-                lasty = 0
-                while idx < nverts:
-                    leftchar = vertices[2 * idx]
-                    rightchar = vertices[2 * idx + 1]
-                    if leftchar == " " and rightchar == "R":
-                        # pen up
-                        penup = True
-                    else:
-                        leftval = scale * (offsetx + self.hershey_val(leftchar))
-                        rightval = scale * (offsety - self.hershey_val(rightchar))
-                        if penup:
-                            path.move(leftval, rightval)
-                            penup = False
-                        else:
-                            path.line(lastx, lasty, leftval, rightval)
-                        lastx = leftval
-                        lasty = rightval
-                    idx += 1
+                key = (tchar, font_size)
+                outline = self._outlines.get(key)
+                if outline is None:
+                    outline = GlyphOutline()
+                    self._render_glyph(outline, struct, scale, offsety)
+                    outline_cache_put(self._outlines, key, outline)
+                outline.replay(path, scale * offsetx)
                 cidx += 1
                 offsetx += struct["right"]
                 # offsetx += struct["realright"] + 1
@@ -290,3 +277,31 @@ class JhfFont:
                 # print(f"Char '{tchar}' (ord={ord(tchar)}) not in font...")
                 pass
         return
+
+    def _render_glyph(self, path, struct, scale, offsety):
+        """
+        Renders the glyph struct at the origin.
+        """
+        nverts = struct["nverts"]
+        vertices = struct["vertices"]
+        idx = 0
+        penup = True
+        lastx = 0
+        lasty = 0
+        while idx < nverts:
+            leftchar = vertices[2 * idx]
+            rightchar = vertices[2 * idx + 1]
+            if leftchar == " " and rightchar == "R":
+                # pen up
+                penup = True
+            else:
+                leftval = scale * self.hershey_val(leftchar)
+                rightval = scale * (offsety - self.hershey_val(rightchar))
+                if penup:
+                    path.move(leftval, rightval)
+                    penup = False
+                else:
+                    path.line(lastx, lasty, leftval, rightval)
+                lastx = leftval
+                lasty = rightval
+            idx += 1
@@ -0,0 +1,248 @@
+"""
+Point Index
+
+Uniform grid spatial index of points, such as the snap attraction points of the elements. The points are grouped by
+their owner, usually the node providing them, and each owner may be emphasized. Owners are updated, translated,
+scaled and removed individually, which only touches the grid cells holding the points of that owner. Queries look at
+the cells near the queried position, rather than every point.
+
+Points are stored as tuples of x, y and point type.
+"""
+
+from math import floor, inf
+
+POINT_INDEX_CELL_SIZE = 1000.0
+
+
+class PointIndex:
+    """
+    Uniform grid of owned points, answering box and nearest queries.
+    """
+
+    def __init__(self, cell_size=POINT_INDEX_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        # cell -> {owner: [points]}
+        self._cells = dict()
+        # owner -> {cell: [points]}
+        self._owners = dict()
+        self._emphasized = set()
+        self._count = 0
+        # Number of points the last query looked at.
+        self.visited = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, owner):
+        return owner in self._owners
+
+    def owners(self):
+        return self._owners.keys()
+
+    def clear(self):
+        self._cells.clear()
+        self._owners.clear()
+        self._emphasized.clear()
+        self._count = 0
+
+    def _cell(self, x, y):
+        size = self.cell_size
+        return floor(x / size), floor(y / size)
+
+    def update(self, owner, points, emphasized=None):
+        """
+        Sets the points of owner, replacing any previous points.
+
+        @param owner: hashable owner of the points
+        @param points: iterable of x, y, point type; points without position are skipped
+        @param emphasized: whether the owner is emphasized, None keeps the current state
+        @return:
+        """
+        self._remove_points(owner)
+        if emphasized is not None:
+            self.set_emphasized(owner, emphasized)
+        cells = dict()
+        size = self.cell_size
+        count = 0
+        for pt in points:
+            x = pt[0]
+            y = pt[1]
+            if x is None or y is None:
+                continue
+            key = (floor(x / size), floor(y / size))
+            pts = cells.get(key)
+            if pts is None:
+                cells[key] = [(x, y, pt[2])]
+            else:
+                pts.append((x, y, pt[2]))
+            count += 1
+        self._add_cells(owner, cells)
+        self._count += count
+
+    def remove(self, owner):
+        """
+        Removes the points of owner.
+        """
+        self._remove_points(owner)
+        self._owners.pop(owner, None)
+        self._emphasized.discard(owner)
+
+    def set_emphasized(self, owner, emphasized):
+        if emphasized:
+            self._emphasized.add(owner)
+        else:
+            self._emphasized.discard(owner)
+
+    def is_emphasized(self, owner):
+        return owner in self._emphasized
+
+    def points(self, owner):
+        """
+        Points of owner.
+        """
+        result = []
+        for pts in self._owners.get(owner, {}).values():
+            result.extend(pts)
+        return result
+
+    def translate(self, owner, dx, dy):
+        """
+        Moves the points of owner by dx, dy.
+        """
+        points = [(x + dx, y + dy, t) for x, y, t in self.points(owner)]
+        self.update(owner, points)
+
+    def scale(self, owner, sx, sy, ox=0.0, oy=0.0):
+        """
+        Scales the points of owner by sx, sy around ox, oy.
+        """
+        points = [
+            (ox + sx * (x - ox), oy + sy * (y - oy), t)
+            for x, y, t in self.points(owner)
+        ]
+        self.update(owner, points)
+
+    def _add_cells(self, owner, cells):
+        self._owners[owner] = cells
+        grid = self._cells
+        for key, pts in cells.items():
+            cell = grid.get(key)
+            if cell is None:
+                grid[key] = {owner: pts}
+            else:
+                cell[owner] = pts
+
+    def _remove_points(self, owner):
+        cells = self._owners.get(owner)
+        if not cells:
+            return
+        grid = self._cells
+        for key, pts in cells.items():
+            cell = grid[key]
+            del cell[owner]
+            if not cell:
+                del grid[key]
+            self._count -= len(pts)
+        self._owners[owner] = dict()
+
+    def _cells_within(self, x, y, distance):
+        """
+        Yields the occupied cells within distance of x, y.
+        """
+        x0, y0 = self._cell(x - distance, y - distance)
+        x1, y1 = self._cell(x + distance, y + distance)
+        grid = self._cells
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(grid):
+            # Fewer cells are occupied than covered by the query.
+            for (cx, cy), cell in grid.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    yield cell
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = grid.get((cx, cy))
+                if cell is not None:
+                    yield cell
+
+    def within(self, x, y, distance, skip_emphasized=False):
+        """
+        Points within the square of distance around x, y.
+
+        @param x:
+        @param y:
+        @param distance: maximum distance along each axis
+        @param skip_emphasized: whether the points of emphasized owners are skipped
+        @return: list of x, y, point type
+        """
+        found = []
+        visited = 0
+        emphasized = self._emphasized if skip_emphasized else ()
+        for cell in self._cells_within(x, y, distance):
+            for owner, pts in cell.items():
+                if owner in emphasized:
+                    continue
+                visited += len(pts)
+                for pt in pts:
+                    if abs(pt[0] - x) <= distance and abs(pt[1] - y) <= distance:
+                        found.append(pt)
+        self.visited = visited
+        return found
+
+    def nearest(self, x, y, distance=inf, skip_emphasized=False):
+        """
+        Nearest point to x, y within distance.
+
+        @param x:
+        @param y:
+        @param distance: maximum euclidean distance
+        @param skip_emphasized: whether the points of emphasized owners are skipped
+        @return: x, y, point type or None
+        """
+        self.visited = 0
+        if not self._cells:
+            return None
+        emphasized = self._emphasized if skip_emphasized else ()
+        size = self.cell_size
+        cx, cy = self._cell(x, y)
+        best = None
+        best_distance = distance * distance
+        ring = 0
+        grid = self._cells
+        checked = 0
+        visited = 0
+        while True:
+            # The nearest possible point of a ring is ring - 1 cells away.
+            reach = (ring - 1) * size
+            if ring and reach * reach > best_distance:
+                break
+            if checked >= len(grid):
+                break
+            if ring == 0:
+                cells = [grid[(cx, cy)]] if (cx, cy) in grid else []
+            elif 8 * ring > len(grid):
+                # Rings cover more cells than are occupied, check the occupied cells.
+                cells = grid.values()
+            else:
+                keys = [(cx + i, cy - ring) for i in range(-ring, ring + 1)]
+                keys += [(cx + i, cy + ring) for i in range(-ring, ring + 1)]
+                keys += [(cx - ring, cy + i) for i in range(-ring + 1, ring)]
+                keys += [(cx + ring, cy + i) for i in range(-ring + 1, ring)]
+                cells = [grid[key] for key in keys if key in grid]
+            for cell in cells:
+                checked += 1
+                for owner, pts in cell.items():
+                    if owner in emphasized:
+                        continue
+                    visited += len(pts)
+                    for pt in pts:
+                        dx = pt[0] - x
+                        dy = pt[1] - y
+                        d = dx * dx + dy * dy
+                        if d <= best_distance:
+                            best_distance = d
+                            best = pt
+            if 8 * ring > len(grid):
+                break
+            ring += 1
+        self.visited = visited
+        return best
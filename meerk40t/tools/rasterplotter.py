@@ -16,8 +16,16 @@ The TOP, RIGHT, LEFT, BOTTOM combined give you the starting corner.
 
 The rasters can either be BIDIRECTIONAL or UNIDIRECTIONAL meaning they raster on both swings
 or only on forward swing.
+
+The NumpyRasterPlotter yields exactly the same plot as the RasterPlotter, but converts the image
+into a NumPy array once and precomputes the scanline bounds and the run-length changes of each
+scanline, rather than reading the image one pixel at a time.
 """
 
+from bisect import bisect_right
+
+import numpy as np
+
 
 class RasterPlotter:
     def __init__(
@@ -545,3 +553,182 @@ class RasterPlotter:
             x = next_x
             y = next_y
             dx = -dx
+
+
+class NumpyRasterPlotter(RasterPlotter):
+    """
+    Vectorized RasterPlotter.
+
+    The data is a PIL image or a 2d array indexed [y, x]. The filter is applied once per distinct
+    pixel value, and pixel values are replaced by the index of their filtered value, so that the
+    bounds of every scanline and the run-length changes within each scanline can be computed
+    with NumPy. Filtered pixels are only looked up once per run rather than once per pixel.
+    """
+
+    def __init__(self, data, width, height, *args, filter=None, **kwargs):
+        if hasattr(data, "mode"):
+            # PIL image, mode "1" arrays would be boolean rather than 0/255.
+            if data.mode == "1":
+                data = data.convert("L")
+            data = np.asarray(data)
+        data = np.asarray(data)[:height, :width]
+        values, inverse = np.unique(data, return_inverse=True)
+        # Distinct raw values which filter to the same value belong to the same run.
+        filtered = list()
+        codes = dict()
+        lut = np.zeros(len(values), dtype=np.int64)
+        for i, v in enumerate(values.tolist()):
+            if filter is not None:
+                v = filter(v)
+            try:
+                code = codes[v]
+            except KeyError:
+                code = len(filtered)
+                codes[v] = code
+                filtered.append(v)
+            lut[i] = code
+        dtype = np.uint8 if len(filtered) <= 256 else np.int64
+        self._codes = lut.astype(dtype)[inverse.reshape(data.shape)]
+        self._values = filtered
+        self._row_cache = (None, None)
+        self._col_cache = (None, None)
+        self._row_bounds = None
+        self._col_bounds = None
+        RasterPlotter.__init__(self, data, width, height, *args, filter=filter, **kwargs)
+
+    def _skip_mask(self):
+        skip = [i for i, v in enumerate(self._values) if v == self.skip_pixel]
+        return ~np.isin(self._codes, skip)
+
+    @staticmethod
+    def _bounds(mask, axis):
+        """
+        Returns the first and last non-skipped index along axis for each scanline.
+        """
+        length = mask.shape[axis]
+        present = mask.any(axis=axis).tolist()
+        first = np.argmax(mask, axis=axis).tolist()
+        if axis == 1:
+            last = (length - 1 - np.argmax(mask[:, ::-1], axis=axis)).tolist()
+        else:
+            last = (length - 1 - np.argmax(mask[::-1, :], axis=axis)).tolist()
+        return [
+            (f, l) if p else (None, None) for p, f, l in zip(present, first, last)
+        ]
+
+    def row_bounds(self, y):
+        if not 0 <= y < self.height:
+            raise IndexError
+        if self._row_bounds is None:
+            self._row_bounds = self._bounds(self._skip_mask(), 1)
+        return self._row_bounds[y]
+
+    def col_bounds(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError
+        if self._col_bounds is None:
+            self._col_bounds = self._bounds(self._skip_mask(), 0)
+        return self._col_bounds[x]
+
+    def row_runs(self, y):
+        """
+        Returns the sorted x positions at which scanline y changes value.
+        """
+        if not 0 <= y < self.height:
+            raise IndexError
+        key, runs = self._row_cache
+        if key != y:
+            row = self._codes[y]
+            runs = (np.flatnonzero(row[1:] != row[:-1]) + 1).tolist()
+            self._row_cache = (y, runs)
+        return runs
+
+    def col_runs(self, x):
+        """
+        Returns the sorted y positions at which scanline x changes value.
+        """
+        if not 0 <= x < self.width:
+            raise IndexError
+        key, runs = self._col_cache
+        if key != x:
+            col = self._codes[:, x]
+            runs = (np.flatnonzero(col[1:] != col[:-1]) + 1).tolist()
+            self._col_cache = (x, runs)
+        return runs
+
+    def px(self, x, y):
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return self._values[self._codes[y, x]]
+        raise IndexError
+
+    def leftmost_not_equal(self, y):
+        return self.row_bounds(y)[0]
+
+    def rightmost_not_equal(self, y):
+        return self.row_bounds(y)[1]
+
+    def topmost_not_equal(self, x):
+        return self.col_bounds(x)[0]
+
+    def bottommost_not_equal(self, x):
+        return self.col_bounds(x)[1]
+
+    def nextcolor_left(self, x, y, default=None):
+        if x <= -1:
+            return default
+        if x == 0:
+            return -1
+        if x == self.width:
+            return self.width - 1
+        if self.width < x:
+            return self.width
+        runs = self.row_runs(y)
+        i = bisect_right(runs, x) - 1
+        if i >= 0:
+            return runs[i] - 1
+        return 0
+
+    def nextcolor_top(self, x, y, default=None):
+        if y <= -1:
+            return default
+        if y == 0:
+            return -1
+        if y == self.height:
+            return self.height - 1
+        if self.height < y:
+            return self.height
+        runs = self.col_runs(x)
+        i = bisect_right(runs, y) - 1
+        if i >= 0:
+            return runs[i] - 1
+        return 0
+
+    def nextcolor_right(self, x, y, default=None):
+        if x < -1:
+            return -1
+        if x == -1:
+            return 0
+        if x == self.width - 1:
+            return self.width
+        if self.width <= x:
+            return default
+        runs = self.row_runs(y)
+        i = bisect_right(runs, x)
+        if i < len(runs):
+            return runs[i]
+        return self.width - 1
+
+    def nextcolor_bottom(self, x, y, default=None):
+        if y < -1:
+            return -1
+        if y == -1:
+            return 0
+        if y == self.height - 1:
+            return self.height
+        if self.height <= y:
+            return default
+        runs = self.col_runs(x)
+        i = bisect_right(runs, y)
+        if i < len(runs):
+            return runs[i]
+        return self.height - 1
@@ -1,5 +1,7 @@
 from math import atan2, cos, isinf, sin, tau
 
+from meerk40t.tools.fontcache import GlyphOutline, outline_cache_put
+
 SHXPARSER_VERSION = "0.0.2"
 
 
@@ -204,6 +206,8 @@ class ShxFont:
         self._last_y = 0
         self._scale = 1
         self._stack = []
+        # Rendered glyphs with their resulting render state, by render state.
+        self._outlines = dict()
 
         self._parse(filename)
 
@@ -377,23 +381,70 @@ class ShxFont:
         for to_replace in replacer:
             # print (f"Replace all '{to_replace[0]}' with '{to_replace[1]}'")
             text = text.replace(to_replace[0], to_replace[1])
+        self._x = 0
+        self._y = 0
+        self._last_x = 0
+        self._last_y = 0
+        self._stack = []
         for letter in text:
             self._letter = letter
             try:
-                self._code = bytearray(reversed(self.glyphs[ord(letter)]))
+                glyph = self.glyphs[ord(letter)]
             except KeyError:
                 # Letter is not found.
                 continue
-            self._pen = True
-            while self._code:
-                try:
-                    self._parse_code()
-                except IndexError as e:
-                    raise ShxFontParseError("Stack Error during render.") from e
-            self._skip = False
+            x, y = self._x, self._y
+            key = (
+                letter,
+                font_size,
+                horizontal,
+                self._scale,
+                self._last_x - x,
+                self._last_y - y,
+            )
+            # Only glyphs without stack positions before and after are independent.
+            cacheable = not self._stack and not self._debug
+            cached = self._outlines.get(key) if cacheable else None
+            if cached is None:
+                cached = self._render_letter(glyph)
+                if cacheable and not self._stack:
+                    outline_cache_put(self._outlines, key, cached)
+            outline, last_x, last_y, self._scale = cached
+            outline.replay(path, x, y)
+            self._x = x + outline.advance[0]
+            self._y = y + outline.advance[1]
+            self._last_x = x + last_x
+            self._last_y = y + last_y
+            self._path = path
         if self._debug:
             print(f"Render Complete.\n\n\n")
 
+    def _render_letter(self, glyph):
+        """
+        Renders the glyph relative to the current position.
+
+        @return: outline, last position, scale after the glyph
+        """
+        outline = GlyphOutline()
+        x, y = self._x, self._y
+        self._path = outline
+        self._x = 0
+        self._y = 0
+        self._last_x -= x
+        self._last_y -= y
+        self._stack = [(sx - x, sy - y) for sx, sy in self._stack]
+        self._code = bytearray(reversed(glyph))
+        self._pen = True
+        while self._code:
+            try:
+                self._parse_code()
+            except IndexError as e:
+                raise ShxFontParseError("Stack Error during render.") from e
+        self._skip = False
+        self._stack = [(sx + x, sy + y) for sx, sy in self._stack]
+        outline.advance = (self._x, self._y)
+        return outline, self._last_x, self._last_y, self._scale
+
     def _parse_code(self):
         b = self.pop()
         direction = b & 0x0F
@@ -1,6 +1,8 @@
 import struct
 from io import BytesIO
 
+from meerk40t.tools.fontcache import GlyphOutline, outline_cache_put
+
 ON_CURVE_POINT = 1
 ARG_1_AND_2_ARE_WORDS = 1 << 0
 ARGS_ARE_XY_VALUES = 1 << 1
@@ -57,7 +59,25 @@ class TrueTypeFont:
         self.parse_hmtx()
         self.parse_loca()
         self.parse_cmap()
-        self.glyphs = list(self.parse_glyf())
+        # Glyphs are decoded on first use.
+        self._glyphs = {}
+        self._outlines = {}
+
+    @property
+    def glyphs(self):
+        return [self.glyph(i) for i in range(len(self._glyph_offsets) - 1)]
+
+    def glyph(self, index):
+        """
+        Returns the contours of the glyph at index, decoding it on first use.
+        """
+        try:
+            return self._glyphs[index]
+        except KeyError:
+            pass
+        glyph = list(self._parse_glyph_index(index))
+        self._glyphs[index] = glyph
+        return glyph
 
     def render(self, path, text, horizontal=True, font_size=12.0):
         scale = font_size / self.units_per_em
@@ -67,54 +87,57 @@ class TrueTypeFont:
             index = self._character_map.get(c, 0)
             advance_x = self.horizontal_metrics[index][0]
             advance_y = 0
-            glyph = self.glyphs[index]
-            path.new_path()
-            for contour in glyph:
-                if len(contour) == 0:
-                    continue
-                contour = list(contour)
-                curr = contour[-1]
-                next = contour[0]
-                if curr[2] & ON_CURVE_POINT:
+            key = (index, font_size)
+            outline = self._outlines.get(key)
+            if outline is None:
+                outline = GlyphOutline()
+                self._render_glyph(outline, self.glyph(index), scale)
+                outline_cache_put(self._outlines, key, outline)
+            outline.replay(path, offset_x * scale, offset_y * scale)
+            offset_x += advance_x
+            offset_y += advance_y
+
+    @staticmethod
+    def _render_glyph(path, glyph, scale):
+        """
+        Renders the contours of glyph at the origin.
+        """
+        path.new_path()
+        for contour in glyph:
+            if len(contour) == 0:
+                continue
+            contour = list(contour)
+            curr = contour[-1]
+            next = contour[0]
+            if curr[2] & ON_CURVE_POINT:
+                path.move(curr[0] * scale, curr[1] * scale)
+            else:
+                if next[2] & ON_CURVE_POINT:
+                    path.move(next[0] * scale, next[1] * scale)
+                else:
                     path.move(
-                        (offset_x + curr[0]) * scale, (offset_y + curr[1]) * scale
+                        (curr[0] + next[0]) / 2 * scale,
+                        (curr[1] + next[1]) / 2 * scale,
                     )
+            for i in range(len(contour)):
+                prev = curr
+                curr = next
+                next = contour[(i + 1) % len(contour)]
+                if curr[2] & ON_CURVE_POINT:
+                    path.line(None, None, curr[0] * scale, curr[1] * scale)
                 else:
-                    if next[2] & ON_CURVE_POINT:
-                        path.move(
-                            (offset_x + next[0]) * scale, (offset_y + next[1]) * scale
-                        )
-                    else:
-                        path.move(
-                            (offset_x + (curr[0] + next[0]) / 2) * scale,
-                            (offset_y + (curr[1] + next[1]) / 2) * scale,
-                        )
-                for i in range(len(contour)):
-                    prev = curr
-                    curr = next
-                    next = contour[(i + 1) % len(contour)]
-                    if curr[2] & ON_CURVE_POINT:
-                        path.line(
-                            None,
-                            None,
-                            (offset_x + curr[0]) * scale,
-                            (offset_y + curr[1]) * scale,
-                        )
-                    else:
-                        next2 = next
-                        if not next[2] & ON_CURVE_POINT:
-                            next2 = (curr[0] + next[0]) / 2, (curr[1] + next[1]) / 2
-                        path.quad(
-                            None,
-                            None,
-                            (offset_x + curr[0]) * scale,
-                            (offset_y + curr[1]) * scale,
-                            (offset_x + next2[0]) * scale,
-                            (offset_y + next2[1]) * scale,
-                        )
-                path.close()
-            offset_x += advance_x
-            offset_y += advance_y
+                    next2 = next
+                    if not next[2] & ON_CURVE_POINT:
+                        next2 = (curr[0] + next[0]) / 2, (curr[1] + next[1]) / 2
+                    path.quad(
+                        None,
+                        None,
+                        curr[0] * scale,
+                        curr[1] * scale,
+                        next2[0] * scale,
+                        next2[1] * scale,
+                    )
+            path.close()
 
     def parse_ttf(self, font_path, require_checksum=True):
         with open(font_path, "rb") as f:
@@ -7,13 +7,18 @@ from meerk40t.core.cutcode.cutcode import CutCode
 from meerk40t.core.cutcode.linecut import LineCut
 from meerk40t.core.cutcode.quadcut import QuadCut
 from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.core.cutplan import (
+    inner_first_ident,
+    short_travel_cutcode,
+    short_travel_cutcode_indexed,
+)
 from meerk40t.core.node.elem_image import ImageNode
 from meerk40t.core.node.elem_path import PathNode
 from meerk40t.core.node.op_cut import CutOpNode
 from meerk40t.core.node.op_engrave import EngraveOpNode
 from meerk40t.core.node.op_image import ImageOpNode
 from meerk40t.core.node.op_raster import RasterOpNode
-from meerk40t.svgelements import Matrix, Path, Point, SVGImage
+from meerk40t.svgelements import Matrix, Path, Point, Rect, SVGImage
 
 
 class TestCutcode(unittest.TestCase):
@@ -416,3 +421,203 @@ class TestCutcode(unittest.TestCase):
                 self.assertNotEqual(y_dir, ry_dir)
             else:
                 self.assertNotEqual(x_dir, rx_dir)
+
+    def test_cutcode_short_travel_indexed(self):
+        """
+        The spatial index travel optimization must pick the same order as the linear
+        greedy scan, including passes, complete paths and grouped inner burns.
+
+        @return:
+        """
+
+        def random_cutcode(seed, passes):
+            random.seed(seed)
+            laserop = CutOpNode()
+            for i in range(24):
+                x = random.randint(0, 5000)
+                y = random.randint(0, 5000)
+                if i % 4 == 0:
+                    laserop.add_node(PathNode(path=Path(Rect(x, y, 400, 400))))
+                    laserop.add_node(
+                        PathNode(path=Path(Rect(x + 100, y + 100, 50, 50)))
+                    )
+                    continue
+                path = Path()
+                path.move((x, y))
+                for j in range(random.randint(1, 5)):
+                    path.line((random.randint(0, 5000), random.randint(0, 5000)))
+                if random.random() < 0.3:
+                    path.closed()
+                laserop.add_node(PathNode(path=path))
+            return inner_first_ident(
+                CutCode(laserop.as_cutobjects(passes=passes))
+            )
+
+        for seed in range(2):
+            for complete_path in (False, True):
+                for grouped_inner in (False, True):
+                    passes = 1 + seed % 2
+                    linear = short_travel_cutcode(
+                        random_cutcode(seed, passes),
+                        complete_path=complete_path,
+                        grouped_inner=grouped_inner,
+                    )
+                    indexed = short_travel_cutcode_indexed(
+                        random_cutcode(seed, passes),
+                        complete_path=complete_path,
+                        grouped_inner=grouped_inner,
+                    )
+                    self.assertEqual(
+                        [(c.start, c.end) for c in linear.flat()],
+                        [(c.start, c.end) for c in indexed.flat()],
+                    )
+
+    def test_cutcode_short_travel_indexed_inner_first(self):
+        """
+        With inner first, the indexed travel optimization must recalculate the permitted
+        groups only for the groups whose burn state changed. The work per group must not
+        grow with the number of groups.
+
+        @return:
+        """
+        import time
+        from unittest import mock
+
+        from meerk40t.core.cutplan import _AllowedGroups
+
+        def nested_rects(count):
+            laserop = CutOpNode()
+            for i in range(count):
+                x = (i % 50) * 1000
+                y = (i // 50) * 1000
+                laserop.add_node(PathNode(path=Path(Rect(x, y, 800, 800))))
+                laserop.add_node(PathNode(path=Path(Rect(x + 200, y + 200, 400, 400))))
+            cutcode = CutCode(laserop.as_cutobjects())
+            # Link the pairs directly, identification is quadratic itself.
+            for outer, inner in zip(cutcode[::2], cutcode[1::2]):
+                outer.contains = [inner]
+                inner.inside = [outer]
+            cutcode.constrained = True
+            return cutcode
+
+        for grouped_inner in (False, True):
+            linear = short_travel_cutcode(nested_rects(20), grouped_inner=grouped_inner)
+            indexed = short_travel_cutcode_indexed(
+                nested_rects(20), grouped_inner=grouped_inner
+            )
+            self.assertEqual(
+                [(c.start, c.end) for c in linear.flat()],
+                [(c.start, c.end) for c in indexed.flat()],
+            )
+
+        update = _AllowedGroups._update
+        updates = list()
+        for count in (100, 1000):
+            cutcode = nested_rects(count)
+            with mock.patch.object(
+                _AllowedGroups, "_update", autospec=True, side_effect=update
+            ) as counted:
+                t = time.time()
+                short_travel_cutcode_indexed(cutcode, grouped_inner=True)
+                print(f"Inner first {count} nested pairs in {time.time() - t:.3f}s")
+            updates.append(counted.call_count / len(cutcode))
+        self.assertEqual(updates[0], updates[1])
+
+    def test_cutcode_statistics(self):
+        """
+        The columnar statistics must match a direct walk over the cutcode, and be dropped when
+        the cutcode is modified.
+
+        @return:
+        """
+        random.seed(5)
+        fast = {"speed": 20, "native_speed": 500, "native_rapid_speed": 2000}
+        slow = {"speed": 30}
+
+        def random_line(settings):
+            return LineCut(
+                Point(random.randint(0, 5000), random.randint(0, 5000)),
+                Point(random.randint(0, 5000), random.randint(0, 5000)),
+                settings=settings,
+            )
+
+        cutcode = CutCode([random_line(fast if i % 3 else slow) for i in range(50)])
+        cutcode._start_x, cutcode._start_y = 100, 200
+
+        def expected(stop_at, include_start):
+            cuts = list(cutcode.flat())[:stop_at]
+            travel = sum(
+                Point.distance(cuts[i - 1].end, cuts[i].start)
+                for i in range(1, len(cuts))
+            )
+            if include_start:
+                travel += Point.distance(cutcode.start, cuts[0].start)
+            length = sum(c.length() for c in cuts)
+            duration = 0
+            for c in cuts:
+                speed = c.settings.get("native_speed", c.settings["speed"] * 39.3701)
+                duration += c.length() / speed
+            return travel, length, duration
+
+        for stop_at in (1, 10, 50):
+            for include_start in (False, True):
+                travel, length, duration = expected(stop_at, include_start)
+                self.assertAlmostEqual(
+                    cutcode.length_travel(include_start, stop_at=stop_at), travel
+                )
+                self.assertAlmostEqual(cutcode.length_cut(stop_at=stop_at), length)
+                self.assertAlmostEqual(cutcode.duration_cut(stop_at=stop_at), duration)
+                self.assertAlmostEqual(
+                    cutcode.duration_travel(stop_at=stop_at),
+                    expected(stop_at, False)[0] / 2000,
+                )
+                stats = cutcode.provide_statistics(include_start)
+                item = stats[stop_at - 1]
+                self.assertAlmostEqual(item["total_distance_travel"], travel)
+                self.assertAlmostEqual(item["total_distance_cut"], length)
+
+        stats = cutcode.provide_statistics()
+        self.assertEqual(len(stats), 50)
+        for previous, item in zip(stats, stats[1:]):
+            self.assertAlmostEqual(item["time_at_start"], previous["time_at_end_of_burn"])
+        self.assertIs(cutcode.statistics(), cutcode.statistics())
+
+        cutcode.append(random_line(fast))
+        self.assertEqual(len(cutcode.provide_statistics()), 51)
+        self.assertAlmostEqual(cutcode.length_travel(), expected(51, False)[0])
+        cutcode.reordered([~i for i in reversed(range(len(cutcode)))])
+        self.assertAlmostEqual(cutcode.length_travel(), expected(51, False)[0])
+        del cutcode[:]
+        self.assertEqual(cutcode.provide_statistics()[-1]["total_time_cut"], 0)
+        self.assertEqual(cutcode.length_travel(True), 0)
+
+    def test_cutcode_statistics_speed(self):
+        """
+        Times repeated statistics queries over a large cutcode.
+
+        @return:
+        """
+        import time
+
+        random.seed(6)
+        settings = {"speed": 20, "native_speed": 500, "native_rapid_speed": 2000}
+        cutcode = CutCode(
+            [
+                LineCut(
+                    Point(random.random() * 5000, random.random() * 5000),
+                    Point(random.random() * 5000, random.random() * 5000),
+                    settings=settings,
+                )
+                for i in range(20000)
+            ]
+        )
+        t = time.time()
+        stats = cutcode.provide_statistics()
+        build = time.time() - t
+        t = time.time()
+        for i in range(0, 20000, 20):
+            cutcode.length_travel(stop_at=i)
+            cutcode.duration_cut(stop_at=i)
+            stats[i]["time_at_end_of_burn"]
+        queries = time.time() - t
+        print(f"Statistics of 20000 cuts built in {build:.3f}s, queried in {queries:.3f}s")
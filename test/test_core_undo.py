@@ -0,0 +1,245 @@
+import random
+import time
+import unittest
+from test import bootstrap
+
+from meerk40t.core.undos import Undo
+
+
+class TestUndo(unittest.TestCase):
+    def test_undo_redo_console(self):
+        """
+        Tests undo and redo restore the tree, with references intact.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            kernel.console("element* classify\n")
+            elements.undo.mark("one")
+            kernel.console("circle 3cm 3cm 1cm\n")
+            elements.undo.mark("two")
+            self.assertEqual(len(list(elements.elems())), 2)
+            kernel.console("undo\n")
+            self.assertEqual(len(list(elements.elems())), 1)
+            for op in elements.ops():
+                for ref in op.children:
+                    if ref.type != "reference":
+                        continue
+                    self.assertIn(ref.node, list(elements.elems()))
+                    self.assertIn(ref, ref.node._references)
+            kernel.console("redo\n")
+            self.assertEqual(len(list(elements.elems())), 2)
+            entries = []
+
+            @kernel.console_command("test_undolist", input_type=None)
+            def undolist_capture(**kwargs):
+                entries.extend(elements.undo.undolist())
+
+            kernel.console("undolist\n")
+            kernel.console("test_undolist\n")
+            self.assertTrue(any(e.startswith("*") for e in entries))
+        finally:
+            kernel()
+
+    def test_undo_shares_unchanged_nodes(self):
+        """
+        Tests that a mark only visits and copies the nodes changed since the previous mark,
+        and undo and redo only copy the nodes which differ, whatever the size of the tree.
+        Benchmarks mark time against the size of the tree.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            elements.do_undo = False
+            work = []
+            for size in (200, 2000):
+                elements.elem_branch.remove_all_children()
+                for i in range(size):
+                    elements.elem_branch.add(
+                        type="elem rect", x=i, y=i, width=10, height=10
+                    )
+                t = time.time()
+                elements._tree.backup_tree()
+                backup_time = time.time() - t
+                t = time.time()
+                undo = Undo(elements, elements._tree)
+                full_time = time.time() - t
+                self.assertGreater(undo.visited, size)
+                nodes = list(elements.elems())
+                nodes[0].width = 20
+                nodes[0].modified()
+                visited, copied = undo.visited, undo.copied
+                t = time.time()
+                undo.mark("edit")
+                edit_time = time.time() - t
+                print(
+                    f"\n{size} nodes: whole tree backup {backup_time:.4f}s, "
+                    f"initial mark {full_time:.4f}s, single edit mark {edit_time:.4f}s"
+                )
+                mark_work = (undo.visited - visited, undo.copied - copied)
+                first, second = undo._undo_stack[-2:]
+                self.assertIsNot(first.state, second.state)
+                branches = [
+                    (a, b)
+                    for a, b in zip(first.state[3], second.state[3])
+                    if a is not b
+                ]
+                self.assertEqual(len(branches), 1)
+                shared = [a is b for a, b in zip(branches[0][0][3], branches[0][1][3])]
+                self.assertEqual(shared.count(False), 1)
+
+                copied = undo.copied
+                self.assertTrue(undo.undo())
+                self.assertEqual(list(elements.elems())[0].width, 10)
+                self.assertIs(list(elements.elems())[1], nodes[1])
+                self.assertTrue(undo.redo())
+                self.assertEqual(list(elements.elems())[0].width, 20)
+                work.append(mark_work + (undo.copied - copied,))
+                elements._tree.unlisten(undo)
+            self.assertEqual(work[0], work[1])
+            self.assertEqual(work[0], (2, 1, 2))
+        finally:
+            kernel()
+
+    def test_undo_attribute_edits(self):
+        """
+        Tests attributes set without a tree notification are kept by the next mark.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            elements.do_undo = False
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            undo = Undo(elements, elements._tree)
+            node = list(elements.elems())[0]
+            node.label = "edited"
+            setattr(node, "stroke_width", 5.0)
+            undo.mark("label")
+            kernel.console("circle 3cm 3cm 1cm\n")
+            undo.mark("circle")
+            self.assertTrue(undo.undo())
+            node = list(elements.elems())[0]
+            self.assertEqual(node.label, "edited")
+            self.assertEqual(node.stroke_width, 5.0)
+            self.assertTrue(undo.undo())
+            self.assertIsNone(list(elements.elems())[0].label)
+            elements._tree.unlisten(undo)
+        finally:
+            kernel()
+
+    def test_undo_structure_edits(self):
+        """
+        Tests undo and redo restore every state of a series of random edits, including
+        structure changes made without a notification.
+        """
+
+        def describe(tree):
+            nodes = []
+            for node in tree.flat():
+                if node is tree:
+                    continue
+                referenced = None
+                if node.type == "reference":
+                    self.assertIn(node, node.node._references)
+                    referenced = node.node._parent.type, node.node.x
+                nodes.append(
+                    (
+                        node.type,
+                        node._parent.type,
+                        sorted((k, repr(v)) for k, v in node.node_dict.items()),
+                        referenced,
+                    )
+                )
+            return nodes
+
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            elements.do_undo = False
+            random.seed(3)
+            undo = Undo(elements, elements._tree)
+            states = [describe(elements._tree)]
+            for step in range(60):
+                nodes = list(elements.elems())
+                action = random.randrange(6) if nodes else 0
+                if action == 0:
+                    node = elements.elem_branch.add(
+                        type="elem rect", x=step, y=1, width=5, height=5
+                    )
+                    list(elements.ops())[0].add_reference(node)
+                elif action == 1:
+                    random.choice(nodes).label = f"label {step}"
+                elif action == 2:
+                    node = random.choice(nodes)
+                    node.matrix.post_translate(3, 3)
+                    node.modified()
+                elif action == 3:
+                    group = elements.elem_branch.add(type="group")
+                    for node in nodes[:2]:
+                        group.append_child(node)
+                elif action == 4:
+                    elements.elem_branch.reverse()
+                else:
+                    random.choice(nodes).remove_node(fast=True)
+                undo.mark(str(step))
+                states.append(describe(elements._tree))
+            for i in range(len(states) - 2, -1, -1):
+                self.assertTrue(undo.undo())
+                self.assertEqual(describe(elements._tree), states[i])
+            for i in range(1, len(states)):
+                self.assertTrue(undo.redo())
+                self.assertEqual(describe(elements._tree), states[i])
+            elements._tree.unlisten(undo)
+        finally:
+            kernel()
+
+    def test_undo_notifies_structure(self):
+        """
+        Tests tree listeners are notified that undo and redo replaced the tree.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            notified = []
+
+            class Listener:
+                def structure_changed(self, node, **kwargs):
+                    notified.append(node)
+
+            listener = Listener()
+            elements.listen_tree(listener)
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            elements.undo.mark("rect")
+            kernel.console("circle 3cm 3cm 1cm\n")
+            elements.undo.mark("circle")
+            kernel.console("undo\n")
+            self.assertEqual(notified, [elements._tree])
+            kernel.console("redo\n")
+            self.assertEqual(len(notified), 2)
+            elements.unlisten_tree(listener)
+        finally:
+            kernel()
+
+    def test_undo_memory_budget(self):
+        """
+        Tests the oldest states are evicted when over the levels or memory budget.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            elements.do_undo = False
+            undo = Undo(elements, elements._tree, levels=3)
+            for i in range(10):
+                elements.elem_branch.add(type="elem rect", x=i, y=i, width=1, height=1)
+                undo.mark(f"add {i}")
+            self.assertEqual(len(undo._undo_stack), 3)
+            self.assertEqual(str(undo._undo_stack[-1]), "add 9")
+            undo.levels = 0
+            undo.budget = 1
+            undo.mark("budget")
+            self.assertEqual(len(undo._undo_stack), 1)
+            self.assertFalse(undo.has_undo())
+            elements._tree.unlisten(undo)
+        finally:
+            kernel()
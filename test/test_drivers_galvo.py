@@ -164,3 +164,166 @@ class TestDriverGalvoRotary(unittest.TestCase):
             data = f.read()
         self.assertNotEqual(lmc_rect, data)
         self.assertEqual(lmc_rect_rotary, data)
+
+
+def legacy_geometry(driver, geom):
+    """
+    Geometry loop of the driver writing every jump and mark as a single list command.
+    """
+    from meerk40t.tools.geomstr import Geomstr
+
+    con = driver.connection
+    con._light_speed = None
+    con._dark_speed = None
+    con._goto_speed = None
+    con.program_mode()
+    driver._list_bits = con._port_bits
+    g = Geomstr()
+    for segment_type, start, c1, c2, end, sets in geom.as_lines():
+        con.set_settings(sets)
+        if segment_type == "line":
+            last_x, last_y = con.get_last_xy()
+            x, y = start.real, start.imag
+            if last_x != x or last_y != y:
+                con.goto(x, y)
+            con.mark(end.real, end.imag)
+        elif segment_type in ("quad", "cubic", "arc"):
+            last_x, last_y = con.get_last_xy()
+            x, y = start.real, start.imag
+            if last_x != x or last_y != y:
+                con.goto(x, y)
+            g.clear()
+            if segment_type == "quad":
+                g.quad(start, c1, end)
+            elif segment_type == "cubic":
+                g.cubic(start, c1, c2, end)
+            else:
+                g.arc(start, c1, end)
+            interp = driver.service.interpolate
+            for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
+                con.mark(p.real, p.imag)
+        elif segment_type == "point":
+            driver._geometry_point(con, start, sets)
+    con.list_delay_time(int(driver.service.delay_end / 10.0))
+    driver._list_bits = None
+    con.rapid_mode()
+
+
+def galvo_packets(service, geometry, geom):
+    """
+    Runs the geometry function on a mock galvo driver and returns the list packets sent.
+    """
+    from meerk40t.balormk.driver import BalorDriver
+
+    packets = []
+    driver = BalorDriver(service, force_mock=True)
+    driver.connection.connect_if_needed()
+    connection = driver.connection.connection
+
+    def write(index, packet):
+        if len(packet) == 0xC00:
+            packets.append(bytes(packet))
+        connection.__class__.write(connection, index, packet)
+
+    connection.write = write
+    geometry(driver, geom)
+    driver.connection.rapid_mode()
+    return packets
+
+
+def galvo_geometry(count=2000, seed=5):
+    """
+    Random geometry of lines, curves and points over several settings.
+    """
+    import random
+
+    from meerk40t.tools.geomstr import Geomstr
+
+    r = random.Random(seed)
+    geom = Geomstr()
+    for key in range(3):
+        geom.settings(key, {"speed": 100 + 50 * key, "power": 300 + 200 * key})
+    geom.settings(3, {"function": "wait", "dwell_time": 5})
+    geom.settings(4, {"function": "goto"})
+
+    def pos():
+        return complex(r.uniform(0, 0xFFFF), r.uniform(0, 0xFFFF))
+
+    last = pos()
+    for i in range(count):
+        key = (i // 50) % 3
+        kind = r.random()
+        start = last if r.random() < 0.7 else pos()
+        end = pos()
+        if kind < 0.6:
+            geom.line(start, end, settings=key)
+        elif kind < 0.7:
+            # Moves out of range and to the same position are skipped.
+            geom.line(start, complex(-10, 0x10000), settings=key)
+            geom.line(start, start, settings=key)
+        elif kind < 0.8:
+            geom.quad(start, pos(), end, settings=key)
+        elif kind < 0.9:
+            geom.cubic(start, pos(), pos(), end, settings=key)
+        elif kind < 0.95:
+            geom.arc(start, pos(), end, settings=key)
+        else:
+            geom.point(end, settings=r.choice((3, 4)))
+        last = end
+    return geom
+
+
+class TestDriverGalvoListCompiler(unittest.TestCase):
+    def test_galvo_geometry_packets(self):
+        """
+        Test that the list compiler sends the same list packets as writing every move as a single list command.
+        """
+        from meerk40t.balormk.driver import BalorDriver
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            service = kernel.device
+            service.interpolate = 200
+            geom = galvo_geometry()
+            expected = galvo_packets(service, legacy_geometry, geom)
+            packets = galvo_packets(service, BalorDriver.geometry, geom)
+            self.assertGreater(len(expected), 10)
+            self.assertEqual(len(expected), len(packets))
+            for i, (p0, p1) in enumerate(zip(expected, packets)):
+                self.assertEqual(p0, p1, f"packet {i}")
+        finally:
+            kernel()
+
+    def test_galvo_geometry_speed(self):
+        """
+        Test the speed of sending the list packets of a geometry.
+        """
+        import time
+
+        from meerk40t.balormk.driver import BalorDriver
+        from meerk40t.tools.geomstr import Geomstr
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            service = kernel.device
+            geom = Geomstr()
+            geom.settings(0, {"speed": 100, "power": 500})
+            for i in range(50000):
+                y = (i // 100) * 100
+                x = 1000 + i % 100 * 500
+                geom.line(complex(x, y), complex(x + 400, y))
+            for name, geometry in (
+                ("single", legacy_geometry),
+                ("compiled", BalorDriver.geometry),
+            ):
+                t = time.time()
+                packets = galvo_packets(service, geometry, geom)
+                elapsed = time.time() - t
+                print(
+                    f"{name}: {len(packets)} list packets in {elapsed:.3f}s, "
+                    f"{len(packets) / elapsed:.0f} packets/s"
+                )
+        finally:
+            kernel()
@@ -1,7 +1,16 @@
 import os
+import re
+import time
 import unittest
 from test import bootstrap
 
+import numpy as np
+from PIL import Image
+
+from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.grbl.gcodejob import GcodeJob
+from meerk40t.svgelements import Matrix
+
 gcode_rect = """G90
 G94
 G21
@@ -149,3 +158,210 @@ class TestDriverGRBLRotary(unittest.TestCase):
             data = f.read()
         self.assertNotEqual(gcode_rect, data)
         self.assertEqual(gcode_rect_rotary, data)
+
+
+def mock_controller(kernel):
+    kernel.console("service device start -i grbl 0\n")
+    device = kernel.device
+    device.interface = "mock"
+    controller = device.controller
+    controller.update_connection()
+    controller.force_validate()
+    return controller
+
+
+def wait_sent(controller, timeout=30):
+    end = time.time() + timeout
+    while len(controller) and time.time() < end:
+        time.sleep(0.001)
+    return len(controller) == 0
+
+
+class TestDriverGRBLStreaming(unittest.TestCase):
+    def test_grbl_stream_throughput(self):
+        """
+        Streams gcode through the mock connection to the emulator, every line must be
+        acknowledged and the emulator must arrive at the final position.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            controller = mock_controller(kernel)
+            count = 5000
+            lines = ["G21\n", "G90\n", "M4 S500 F1000\n"]
+            lines.extend(
+                f"G1 X{i % 100}.5 Y{i % 37}.25 S{i % 1000}\n" for i in range(count)
+            )
+            lines.append("G1 X12.5 Y7.25\n")
+            t = time.time()
+            for line in lines:
+                controller.write(line)
+            self.assertTrue(wait_sent(controller))
+            elapsed = time.time() - t
+            print(f"Streamed {len(lines)} lines at {len(lines) / elapsed:.0f} lines/s")
+            job = controller.connection.emulator.job
+            self.assertAlmostEqual(job.x / job.scale, 12.5, places=3)
+            self.assertAlmostEqual(job.y / job.scale, 7.25, places=3)
+        finally:
+            kernel()
+
+    def test_grbl_stream_pause(self):
+        """
+        Lines are held while paused and in flight characters are counted per line.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            controller = mock_controller(kernel)
+            controller.realtime("!")
+            end = time.time() + 5
+            while not controller._paused and time.time() < end:
+                time.sleep(0.001)
+            controller.write("G21\n")
+            controller.write("G90\n")
+            time.sleep(0.1)
+            self.assertEqual(len(controller), 2)
+            controller.realtime("~")
+            self.assertTrue(wait_sent(controller))
+
+            controller._forward(b"G0 X1\nG0")
+            self.assertEqual(len(controller), 8)
+            controller._forward(b" Y1\n")
+            self.assertEqual(controller.get_forward_command(), b"G0 X1\n")
+            self.assertEqual(controller.get_forward_command(), b"G0 Y1\n")
+            self.assertEqual(len(controller), 0)
+            with self.assertRaises(ValueError):
+                controller.get_forward_command()
+        finally:
+            kernel()
+
+
+def grayscale_image(width=120, height=80):
+    yy, xx = np.mgrid[0:height, 0:width]
+    pixels = 127 + 120 * np.sin(xx / 13.0) * np.cos(yy / 7.0)
+    pixels = pixels.astype(np.uint8)
+    # Blank margins and scanlines.
+    pixels[:, :15] = 255
+    pixels[:, -10:] = 255
+    pixels[:8] = 255
+    pixels[40:45] = 255
+    return Image.fromarray(pixels, "L")
+
+
+class BurnRecorder:
+    def __init__(self):
+        self.plots = []
+
+    def plot(self, plot):
+        self.plots.append(plot)
+
+    def plot_start(self):
+        pass
+
+
+def emulated_burn(gcode):
+    """
+    Runs the gcode through the emulator job and returns the powered segments, merged along
+    each scanline.
+    """
+    recorder = BurnRecorder()
+    job = GcodeJob(driver=recorder, units_to_device_matrix=Matrix())
+    job.write_blob(gcode.encode())
+    while not job.execute(recorder):
+        pass
+    job.plot_commit()
+    burn = {}
+    for plot in recorder.plots:
+        for ox, oy, on, x, y in plot.plot:
+            if not on or (ox, oy) == (x, y):
+                continue
+            if oy == y:
+                burn.setdefault(("y", y), []).append((min(ox, x), max(ox, x), on))
+            elif ox == x:
+                burn.setdefault(("x", x), []).append((min(oy, y), max(oy, y), on))
+            else:
+                burn.setdefault(("d", ox, oy), []).append((x, y, on))
+    for key, segments in burn.items():
+        merged = []
+        for segment in sorted(segments):
+            if merged and merged[-1][1] == segment[0] and merged[-1][2] == segment[2]:
+                merged[-1] = (merged[-1][0], segment[1], segment[2])
+            else:
+                merged.append(segment)
+        burn[key] = merged
+    return burn
+
+
+class TestDriverGRBLPowerRuns(unittest.TestCase):
+    def raster_gcode(self, device, power_runs, **kwargs):
+        driver = device.driver
+        lines = []
+        driver.out_pipe = lines.append
+        device.raster_power_runs = power_runs
+        cut = RasterCut(
+            grayscale_image(),
+            1000,
+            2000,
+            30,
+            30,
+            settings={"power": 800, "speed": 100},
+            **kwargs,
+        )
+        driver.native_x = driver.native_y = 0
+        t = time.time()
+        driver.plot(cut)
+        driver.plot_start()
+        return "".join(lines), time.time() - t
+
+    def test_grbl_power_runs_burn(self):
+        """
+        Power runs must burn exactly what the plot planner output burns, in every raster
+        direction, while writing less gcode.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            device = kernel.device
+            for kwargs in (
+                {},
+                {"overscan": 200},
+                {"bidirectional": False},
+                {"horizontal": False},
+                {"start_minimum_x": False, "start_minimum_y": False},
+                {"inverted": True},
+            ):
+                planned, planned_time = self.raster_gcode(device, False, **kwargs)
+                runs, runs_time = self.raster_gcode(device, True, **kwargs)
+                burn = emulated_burn(runs)
+                self.assertTrue(burn)
+                self.assertEqual(emulated_burn(planned), burn)
+                self.assertLess(len(runs), len(planned))
+                self.assertLessEqual(len(runs.splitlines()), len(planned.splitlines()))
+                print(
+                    f"{kwargs}: {len(planned.splitlines())} lines, {len(planned)} bytes "
+                    f"in {planned_time:.3f}s; power runs {len(runs.splitlines())} lines, "
+                    f"{len(runs)} bytes in {runs_time:.3f}s"
+                )
+        finally:
+            kernel()
+
+    def test_grbl_power_runs_levels(self):
+        """
+        Quantized power levels cap the distinct S values and reduce the line count.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            device = kernel.device
+            device.raster_power_levels = 0
+            runs, _ = self.raster_gcode(device, True)
+            device.raster_power_levels = 4
+            quantized, _ = self.raster_gcode(device, True)
+            device.raster_power_levels = 0
+            powers = set(re.findall(r"S([0-9]+\.[0-9])", quantized))
+            self.assertLessEqual(powers, {"0.0", "266.7", "533.3", "800.0"})
+            self.assertLess(len(quantized.splitlines()), len(runs.splitlines()) / 2)
+            print(
+                f"Quantized to 4 levels: {len(runs.splitlines())} to "
+                f"{len(quantized.splitlines())} lines"
+            )
+        finally:
+            kernel()
@@ -1,4 +1,5 @@
 import os
+import time
 import unittest
 from test import bootstrap
 
@@ -480,3 +481,112 @@ class TestDriverLihuiyuOverrideSpeed(unittest.TestCase):
         finally:
             bootstrap.destroy(kernel)
             kernel()
+
+
+class EgvRecorder:
+    """
+    Output recording the data written to it, and forwarding it to an optional output.
+    """
+
+    def __init__(self, output=None):
+        self.output = output
+        self.data = bytearray()
+        self.realtime = bytearray()
+
+    def write(self, data):
+        if b"~" in data:
+            self.realtime += data
+        else:
+            self.data += data
+        if self.output is not None:
+            self.output.write(data)
+
+    def __len__(self):
+        if self.output is None:
+            return 0
+        return len(self.output)
+
+
+class TestDriverLihuiyuPipeline(unittest.TestCase):
+    def test_driver_egv_pipeline(self):
+        """
+        Test the pipeline forwards the queued data in order, realtime data directly and drops queued data on abort.
+        """
+        import threading
+
+        from meerk40t.lihuiyu.pipeline import EgvPipeline
+
+        recorder = EgvRecorder()
+        pipeline = EgvPipeline(recorder, capacity=64)
+        expected = bytearray()
+        for i in range(5000):
+            data = f"IB{i:03d}R{i:04x}S1P\n".encode()
+            expected += data
+            pipeline.write(data)
+        pipeline.write(b"~PN!\n~")
+        self.assertTrue(pipeline.flush(5))
+        self.assertEqual(recorder.data, expected)
+        self.assertEqual(recorder.realtime, b"~PN!\n~")
+
+        release = threading.Event()
+
+        class Blocking(EgvRecorder):
+            def write(self, data):
+                if b"~" not in data:
+                    release.wait(5)
+                super().write(data)
+
+        blocking = Blocking()
+        pipeline = EgvPipeline(blocking)
+        pipeline.write(b"IPP\n")
+        time.sleep(0.1)
+        pipeline.write(b"queued")
+        pipeline.write(b"~I*\n~")
+        release.set()
+        self.assertTrue(pipeline.flush(5))
+        # The data being forwarded is written, the queued data is dropped on abort.
+        self.assertEqual(blocking.data, b"IPP\n")
+        self.assertEqual(blocking.realtime, b"~I*\n~")
+
+    def test_driver_egv_pipeline_speed(self):
+        """
+        Test the speed of encoding a job for the mock controller directly and through the pipeline.
+        """
+        from meerk40t.core.laserjob import LaserJob
+        from meerk40t.lihuiyu.driver import LihuiyuDriver
+        from meerk40t.lihuiyu.pipeline import EgvPipeline
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i lhystudios 0\n")
+            kernel.console("operation* remove\n")
+            device = kernel.device
+            device.mock = True
+            device.buffer_limit = False
+            for i in range(40):
+                kernel.console(f"circle {1 + i % 8}cm {1 + i // 8}cm 4mm\n")
+            kernel.console(
+                "element* engrave -s 15 plan copy-selected preprocess validate blob preopt optimize\n"
+            )
+            items = list(kernel.planner.default_plan.plan)
+            encoded = []
+            for name, pipe in (("direct", None), ("pipeline", EgvPipeline)):
+                device.controller.abort()
+                recorder = EgvRecorder(device.controller)
+                driver = LihuiyuDriver(device)
+                driver.out_pipe = recorder if pipe is None else pipe(recorder)
+                t = time.time()
+                LaserJob(name, items, driver=driver).execute()
+                if pipe is not None:
+                    driver.out_pipe.flush()
+                elapsed = time.time() - t
+                encoded.append(bytes(recorder.data))
+                print(
+                    f"{name}: {len(recorder.data)} bytes in {elapsed:.3f}s, "
+                    f"{len(recorder.data) / elapsed:.0f} bytes/s"
+                )
+            device.controller.abort()
+            self.assertGreater(len(encoded[0]), 10000)
+            self.assertEqual(encoded[0], encoded[1])
+        finally:
+            kernel()
@@ -1,7 +1,14 @@
+import math
 import os
+import random
+import struct
+import time
 import unittest
+from functools import partial
 from test import bootstrap
 
+import numpy
+
 from PIL import Image, ImageDraw
 
 from meerk40t.core.node.elem_image import ImageNode
@@ -143,3 +150,173 @@ class TestDriverNewlyRotary(unittest.TestCase):
         self.assertNotEqual(hpgl_rect, data)
         self.assertEqual(hpgl_rect_rot, data)
         print(data)
+
+
+def legacy_scanline(controller, bits, right=False, left=False, top=False, bottom=False):
+    """
+    Scanline encoder which formats the bits as binary text, as used before packbits.
+    """
+    controller._commit_settings()
+    cmd = None
+    if left:
+        cmd = bytearray(b"YF")
+    elif right:
+        cmd = bytearray(b"YZ")
+    elif top:
+        cmd = bytearray(b"XF")
+    elif bottom:
+        cmd = bytearray(b"XZ")
+    if cmd is None:
+        return
+    bits = bits[::-1]
+    count = len(bits)
+    byte_length = int(math.ceil(count / 8))
+    cmd += struct.pack(">i", count)[1:]
+    binary = "".join([str(b) for b in bits])
+    cmd += int(binary, 2).to_bytes(byte_length, "little")
+    controller(cmd)
+    if left:
+        controller._last_x -= count
+    elif right:
+        controller._last_x += count
+    elif top:
+        controller._last_y -= count
+    elif bottom:
+        controller._last_y += count
+
+
+class TestDriverNewlyScanline(unittest.TestCase):
+    def test_driver_scanline_payload(self):
+        """
+        Packed scanlines must be byte-identical to the binary text encoder.
+        """
+        from meerk40t.newly.controller import scanline_payload
+
+        random.seed(2)
+        for count in (1, 7, 8, 9, 63, 64, 1001):
+            bits = [random.randint(0, 1) for _ in range(count)]
+            binary = "".join([str(b) for b in bits[::-1]])
+            expected = int(binary, 2).to_bytes(int(math.ceil(count / 8)), "little")
+            self.assertEqual(scanline_payload(bits), expected)
+
+    def test_driver_raster_packbits(self):
+        """
+        Rasters must produce the same commands as per pixel scanlines encoded as binary text,
+        in both directions, for both raster orientations and with split raster jogs.
+        """
+        from meerk40t.core.cutcode.rastercut import RasterCut
+        from meerk40t.newly.controller import NewlyController
+
+        random.seed(3)
+        image = Image.new("1", (97, 61), 1)
+        draw = ImageDraw.Draw(image)
+        for i in range(12):
+            x, y = random.randint(0, 90), random.randint(0, 55)
+            w, h = random.randint(2, 30), random.randint(2, 20)
+            draw.ellipse((x, y, x + w, y + h), 0)
+        draw.rectangle((0, 20, 96, 24), 1)
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i newly 0\n")
+            service = kernel.device
+            for horizontal in (True, False):
+                for bidirectional in (True, False):
+                    for max_raster_jog in (15, 1):
+                        service.max_raster_jog = max_raster_jog
+                        commands = []
+                        for legacy in (False, True):
+                            controller = NewlyController(service, force_mock=True)
+                            if legacy:
+                                scanline = partial(legacy_scanline, controller)
+                                controller.scanline = scanline
+                            cut = RasterCut(
+                                image.convert("L"),
+                                0,
+                                0,
+                                step_x=2,
+                                step_y=2,
+                                horizontal=horizontal,
+                                bidirectional=bidirectional,
+                                settings={"speed": 100},
+                            )
+                            if legacy:
+                                legacy_raster(controller, cut)
+                            else:
+                                controller.raster(cut)
+                            commands.append(b";".join(controller._command_buffer))
+                        self.assertEqual(commands[0], commands[1])
+                        self.assertIn(b"YZ" if horizontal else b"XZ", commands[0])
+        finally:
+            kernel()
+
+    def test_driver_scanline_speed(self):
+        """
+        Times the encoding of scanlines.
+        """
+        from meerk40t.newly.controller import scanline_payload
+
+        random.seed(4)
+        scanlines = [[random.randint(0, 1) for _ in range(2000)] for _ in range(200)]
+        t = time.time()
+        for bits in scanlines:
+            binary = "".join([str(b) for b in bits[::-1]])
+            int(binary, 2).to_bytes(250, "little")
+        legacy = time.time() - t
+        arrays = [numpy.array(bits, dtype=numpy.uint8) for bits in scanlines]
+        t = time.time()
+        for bits in arrays:
+            scanline_payload(bits)
+        packed = time.time() - t
+        print(
+            f"2000 pixel scanlines: {len(scanlines) / legacy:.0f}/s as text, "
+            f"{len(scanlines) / packed:.0f}/s packed"
+        )
+
+
+def legacy_raster(controller, raster_cut):
+    """
+    Raster which extends the scanline per pixel, as used before runs were collected.
+    """
+    scanline = []
+    increasing = True
+
+    def commit_scanline():
+        if scanline:
+            if raster_cut.horizontal:
+                if increasing:
+                    controller.scanline(scanline, right=True)
+                else:
+                    controller.scanline(scanline, left=True)
+            else:
+                if increasing:
+                    controller.scanline(scanline, bottom=True)
+                else:
+                    controller.scanline(scanline, top=True)
+            scanline.clear()
+
+    controller("IN")
+    controller._clear_settings()
+    previous_x, previous_y = raster_cut.plot.initial_position_in_scene()
+    controller._raster_jog(previous_x, previous_y, raster_cut)
+    max_raster_jog = controller.service.max_raster_jog
+    for x, y, on in raster_cut.plot.plot():
+        dx = x - previous_x
+        dy = y - previous_y
+        if not raster_cut.horizontal:
+            dx, dy = dy, dx
+        if dx < 0 and increasing or dx > 0 and not increasing:
+            commit_scanline()
+            increasing = not increasing
+        if dy != 0:
+            commit_scanline()
+            if abs(dy) > max_raster_jog:
+                controller._raster_jog(x, y, raster_cut)
+            else:
+                controller._relative = True
+                controller("PR")
+                controller._goto(x, y)
+        if dx != 0:
+            scanline.extend([int(on)] * abs(dx))
+        previous_x, previous_y = x, y
+    commit_scanline()
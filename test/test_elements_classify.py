@@ -1,8 +1,91 @@
+import time
 import unittest
+from itertools import product
 from random import Random
 from test import bootstrap
+from unittest.mock import patch
+
+from PIL import Image
 
 from meerk40t.core.elements.element_types import elem_nodes, op_nodes
+from meerk40t.svgelements import Color
+
+CLASSIFY_COLORS = (
+    None,
+    "black",
+    "white",
+    "red",
+    "#F00010",
+    "blue",
+    "#0008FF",
+    "lime",
+    "#808080",
+    "#123456",
+)
+
+CLASSIFY_OPTIONS = (
+    "classify_reverse",
+    "classify_fuzzy",
+    "classify_default",
+    "classify_autogenerate",
+    "classify_black_as_raster",
+)
+
+
+def add_classify_elements(elements, count, seed=1):
+    """
+    Adds elements of random types and random stroke and fill colors.
+    """
+    random = Random(seed)
+
+    def color():
+        c = random.choice(CLASSIFY_COLORS)
+        return None if c is None else Color(c)
+
+    nodes = []
+    for i in range(count):
+        r = random.randint(0, 5)
+        if r == 0:
+            node = elements.elem_branch.add(
+                type="elem rect", x=i, y=0, width=100, height=100
+            )
+        elif r == 1:
+            node = elements.elem_branch.add(
+                type="elem ellipse", cx=i, cy=0, rx=100, ry=100
+            )
+        elif r == 2:
+            node = elements.elem_branch.add(
+                type="elem line", x1=i, y1=0, x2=100, y2=100
+            )
+        elif r == 3:
+            node = elements.elem_branch.add(type="elem point", x=i, y=0)
+        elif r == 4:
+            node = elements.elem_branch.add(
+                type="elem image", image=Image.new("L", (4, 4))
+            )
+        else:
+            node = elements.elem_branch.add(
+                type="elem polyline", points=((i, 0), (i + 10, 10), (i, 20))
+            )
+        if hasattr(node, "stroke"):
+            node.stroke = color()
+        if hasattr(node, "fill"):
+            node.fill = color()
+        nodes.append(node)
+    return nodes
+
+
+def classification(elements, nodes):
+    """
+    Operations of the tree with the indexes of the nodes they reference.
+    """
+    index = {id(node): i for i, node in enumerate(nodes)}
+    result = []
+    for op in elements.ops():
+        color = getattr(op, "color", None)
+        refs = [index[id(ref.node)] for ref in op.children if ref.type == "reference"]
+        result.append((op.type, None if color is None else color.hexa, refs))
+    return result
 
 
 class TestElementClassification(unittest.TestCase):
@@ -95,3 +178,62 @@ class TestElementClassification(unittest.TestCase):
             self.assertEqual(len(results), 100)
         finally:
             kernel()
+
+
+class TestElementClassificationIndex(unittest.TestCase):
+    def classify(self, kernel, count, options, indexed=True, seed=1):
+        elements = kernel.elements
+        elements.clear_all()
+        for attr, value in zip(CLASSIFY_OPTIONS, options):
+            setattr(elements, attr, value)
+        for command in (
+            "cut -c red\n",
+            "engrave -c blue\n",
+            "raster -c black\n",
+            "engrave\n",
+            "imageop\n",
+        ):
+            kernel.console(command)
+        nodes = add_classify_elements(elements, count, seed=seed)
+        t = time.time()
+        if indexed:
+            elements.classify(nodes)
+        else:
+            # Unique keys, every node is classified on its own.
+            with patch("meerk40t.core.elements.elements.classify_key", id):
+                elements.classify(nodes)
+        return classification(elements, nodes), time.time() - t
+
+    def test_element_classification_index(self):
+        """
+        Test that classification with the index matches classifying every node on its own, for every combination of
+        the reverse, fuzzy, default, autogenerate and black as raster options.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            for options in product((False, True), repeat=len(CLASSIFY_OPTIONS)):
+                indexed, _ = self.classify(kernel, 300, options)
+                expected, _ = self.classify(kernel, 300, options, indexed=False)
+                self.assertEqual(indexed, expected, str(options))
+        finally:
+            kernel()
+
+    def test_element_classification_index_speed(self):
+        """
+        Test the speed of classifying 50k elements. Classifying every node on its own is timed on fewer elements, as
+        it slows down with the number of references in the operations.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            options = (False, True, True, True, False)
+            _, t_indexed = self.classify(kernel, 50000, options)
+            _, t_each = self.classify(kernel, 2000, options, indexed=False)
+            indexed = 50000 / t_indexed
+            each = 2000 / t_each
+            print(
+                f"classify: {each:.0f} elements/s for 2000 elements, "
+                f"indexed {indexed:.0f} elements/s for 50000 elements"
+            )
+            self.assertGreater(indexed, each)
+        finally:
+            kernel()
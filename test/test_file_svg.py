@@ -1,9 +1,78 @@
+import gzip
 import os
+import random
+import time
+import tracemalloc
 import unittest
 from test import bootstrap
+from unittest import mock
+from xml.etree.ElementTree import Element, ElementTree
 
+from PIL import Image
+
+from meerk40t.core.node import elem_image
 from meerk40t.core.node.op_engrave import EngraveOpNode
+from meerk40t.core.exceptions import BadFileError
+from meerk40t.core.svg_io import SVGLoader, SVGWriter
 from meerk40t.core.units import Length
+from meerk40t.svgelements import Color, Matrix, _pretty_print
+
+
+class TreeElement(Element):
+    def subelement(self, tag):
+        element = TreeElement(tag)
+        self.append(element)
+        return element
+
+
+def legacy_save(context, f, version="default"):
+    """
+    Saves by building the whole ElementTree and indenting it, encoding every image, as the svg writer did before
+    streaming.
+    """
+    images = list(context.elements.elem_branch.flat(types="elem image"))
+
+    class TreeStream:
+        root = None
+
+        def element(self, tag):
+            self.root = TreeElement(tag)
+            return self.root
+
+    for node in images:
+        node._png_base64 = None
+    stream = TreeStream()
+    SVGWriter._write_root(stream, context, version)
+    _pretty_print(stream.root)
+    with open(f, "wb") as output:
+        ElementTree(stream.root).write(output)
+    for node in images:
+        node._png_base64 = None
+
+
+def noise_image(size, seed):
+    r = random.Random(seed)
+    return Image.frombytes("L", (size, size), r.randbytes(size * size))
+
+
+def add_save_elements(kernel, images=2, size=64):
+    elements = kernel.elements
+    kernel.console("rect 1cm 1cm 2cm 3cm stroke red fill blue\n")
+    kernel.console("circle 5cm 5cm 1cm\n")
+    kernel.console("line 0 0 3cm 4cm\n")
+    kernel.console("polyline 1cm 1cm 2cm 2cm 3cm 1cm\n")
+    kernel.console('text "Fish & <chips> caf\u00e9"\n')
+    kernel.console("element* classify\n")
+    elements.note = 'Note with "quotes",\ttabs and\nlines & caf\u00e9'
+    for i in range(images):
+        elements.elem_branch.add(
+            type="elem image",
+            image=noise_image(size, i),
+            matrix=Matrix(f"translate({i * 1000}, 500)"),
+            dpi=500,
+            label=f"image <{i}>",
+        )
+    kernel.console("element* classify\n")
 
 
 class TestFileSVG(unittest.TestCase):
@@ -174,3 +243,308 @@ class TestFileSVG(unittest.TestCase):
             self.assertEqual(len(list(engrave[0].flat(types="effect wobble"))), 1)
         finally:
             kernel()
+
+
+class TestFileSVGSave(unittest.TestCase):
+    def test_save_svg_matches_tree(self):
+        """
+        Test the streamed svg is the same as the svg written from the whole tree, for every save version.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            add_save_elements(kernel)
+            for version in ("default", "plain", "compressed"):
+                name = f"test-stream-{version}.svg"
+                SVGWriter.save(kernel.root, name, version)
+                self.addCleanup(os.remove, name)
+                SVGWriter.save(kernel.root, name + "z", version)
+                self.addCleanup(os.remove, name + "z")
+                legacy_save(kernel.root, "legacy-" + name, version)
+                self.addCleanup(os.remove, "legacy-" + name)
+                with open("legacy-" + name, "rb") as f:
+                    expected = f.read()
+                with open(name, "rb") as f:
+                    self.assertEqual(f.read(), expected)
+                with gzip.open(name + "z", "rb") as f:
+                    self.assertEqual(f.read(), expected)
+                self.assertIn(b"caf&#233;", expected)
+                self.assertIn(b"Fish &amp; &lt;chips&gt;", expected)
+            kernel.console("element* delete\n")
+            kernel.console("load test-stream-default.svg\n")
+            self.assertEqual(len(list(kernel.elements.elem_branch.flat(types="elem image"))), 2)
+        finally:
+            kernel()
+
+    def test_save_svg_image_encoding(self):
+        """
+        Test the encoded image is kept while the image and dpi are unchanged, and shared by copies.
+        """
+        file1 = "test-images.svg"
+        self.addCleanup(os.remove, file1)
+        kernel = bootstrap.bootstrap()
+        try:
+            add_save_elements(kernel, images=1)
+            node = list(kernel.elements.elem_branch.flat(types="elem image"))[0]
+            with mock.patch(
+                "meerk40t.core.node.elem_image.png_base64",
+                wraps=elem_image.png_base64,
+            ) as encode:
+                SVGWriter.save(kernel.root, file1)
+                SVGWriter.save(kernel.root, file1)
+                self.assertEqual(encode.call_count, 1)
+                payload = node.png_base64()
+                self.assertIs(node.__copy__().png_base64(), payload)
+                self.assertEqual(encode.call_count, 1)
+                node.dpi = 250
+                SVGWriter.save(kernel.root, file1)
+                self.assertEqual(encode.call_count, 2)
+                node.image = noise_image(64, 10)
+                self.assertNotEqual(node.png_base64(), payload)
+                self.assertEqual(encode.call_count, 3)
+        finally:
+            kernel()
+
+    def test_save_svg_failure(self):
+        """
+        Test a save failing midway keeps the existing file and leaves no temporary file.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            add_save_elements(kernel, images=0)
+            for name in ("test-failure.svg", "test-failure.svgz"):
+                with open(name, "wb") as f:
+                    f.write(b"existing")
+                self.addCleanup(os.remove, name)
+
+                def write_root(stream, context, version):
+                    stream.element("svg").set("width", "10")
+                    raise OSError("disk full")
+
+                with mock.patch.object(SVGWriter, "_write_root", write_root):
+                    self.assertRaises(OSError, SVGWriter.save, kernel.root, name)
+                with open(name, "rb") as f:
+                    self.assertEqual(f.read(), b"existing")
+                self.assertFalse([f for f in os.listdir(".") if f.endswith(".tmp")])
+                SVGWriter.save(kernel.root, name)
+                self.assertNotEqual(os.path.getsize(name), len(b"existing"))
+            # New files are created with the usual permissions.
+            with open("test-failure-open.svg", "wb"):
+                pass
+            self.addCleanup(os.remove, "test-failure-open.svg")
+            SVGWriter.save(kernel.root, "test-failure-new.svg")
+            self.addCleanup(os.remove, "test-failure-new.svg")
+            self.assertEqual(
+                os.stat("test-failure-open.svg").st_mode,
+                os.stat("test-failure-new.svg").st_mode,
+            )
+        finally:
+            kernel()
+
+    def test_save_svg_speed(self):
+        """
+        Test the save time of a project of large images, saved from the tree and streamed, first and again.
+        """
+        file1 = "test-speed.svg"
+        self.addCleanup(os.remove, file1)
+        kernel = bootstrap.bootstrap()
+        try:
+            add_save_elements(kernel, images=8, size=1000)
+            t = time.time()
+            legacy_save(kernel.root, file1)
+            legacy = time.time() - t
+            t = time.time()
+            SVGWriter.save(kernel.root, file1)
+            first = time.time() - t
+            t = time.time()
+            SVGWriter.save(kernel.root, file1)
+            again = time.time() - t
+            print(
+                f"8 images of 1000x1000 saved: tree {legacy:.3f}s, "
+                f"streamed {first:.3f}s, streamed again {again:.3f}s"
+            )
+            self.assertLess(again, first)
+        finally:
+            kernel()
+
+
+def describe_tree(kernel):
+    """
+    Description of the loaded nodes, their bounds and the references of the operations.
+    """
+    elements = kernel.elements
+    nodes = []
+    for branch in (elements.elem_branch, elements.reg_branch):
+        for node in branch.flat():
+            if node.type == "file":
+                continue
+            bounds = node.bounds
+            if bounds is not None:
+                bounds = tuple(round(v, 3) for v in bounds)
+            nodes.append((node.type, node.id, node.label, bounds))
+    ops = [
+        (op.type, op.id, [ref.node.id for ref in op.children if ref.type == "reference"])
+        for op in elements.op_branch.flat()
+        if op.type != "reference"
+    ]
+    return nodes, ops
+
+
+def load_svg_file(pathname, stream):
+    """
+    Loads the file into a new kernel, streamed or from the whole parsed svg.
+    """
+    kernel = bootstrap.bootstrap()
+    try:
+        kernel.elements.classify_new = False
+        with mock.patch("meerk40t.core.svg_io.svg_uses", return_value=not stream):
+            SVGLoader.load(kernel.root, kernel.elements, pathname)
+        return describe_tree(kernel)
+    finally:
+        kernel()
+
+
+SVG_STRUCTURE = """<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="100mm" height="100mm"
+viewBox="0 0 100 100">
+<style>.thick { stroke-width: 3; stroke: blue }</style>
+<defs><clipPath id="clip"><rect x="0" y="0" width="50" height="50"/></clipPath></defs>
+<g id="outer" transform="translate(10, 10)">
+<rect id="r1" class="thick" x="1" y="2" width="10" height="20" fill="red"/>
+<g id="inner" transform="scale(2)">
+<circle id="c1" cx="5" cy="5" r="3" clip-path="url(#clip)"/>
+<path id="p1" d="M 0 0 L 10 10 Q 20 0 30 10 Z"/>
+</g>
+</g>
+<g id="hidden" visibility="hidden"><line id="l1" x1="0" y1="0" x2="10" y2="20" stroke="black"/></g>
+<text id="t1" x="5" y="90">Label</text>
+<polyline id="pl1" points="0,0 10,10 20,0" stroke="green" fill="none"/>
+</svg>"""
+
+
+class TestFileSVGLoad(unittest.TestCase):
+    def test_load_svg_stream_project(self):
+        """
+        Test a saved project loads the same streamed as from the whole parsed svg.
+        """
+        file1 = "test-load-project.svg"
+        kernel = bootstrap.bootstrap()
+        try:
+            add_save_elements(kernel)
+            kernel.console("rect 5cm 5cm 1cm 1cm\n")
+            kernel.console("element* classify\n")
+            kernel.console("element* group\n")
+            kernel.console(f"save {file1}\n")
+            self.addCleanup(os.remove, file1)
+        finally:
+            kernel()
+        streamed = load_svg_file(file1, True)
+        self.assertEqual(streamed, load_svg_file(file1, False))
+        nodes, ops = streamed
+        self.assertIn("elem image", [node[0] for node in nodes])
+        self.assertTrue(any(refs for op in ops for refs in op[2]))
+
+    def test_load_svg_stream_structure(self):
+        """
+        Test styles, definitions, nested groups, regmarks and text load the same streamed.
+        """
+        file1 = "test-load-structure.svg"
+        with open(file1, "w") as f:
+            f.write(SVG_STRUCTURE)
+        self.addCleanup(os.remove, file1)
+        streamed = load_svg_file(file1, True)
+        self.assertEqual(streamed, load_svg_file(file1, False))
+        ids = [node[1] for node in streamed[0]]
+        for ident in ("outer", "r1", "inner", "c1", "p1", "t1", "pl1", "l1"):
+            self.assertIn(ident, ids)
+
+    def test_load_svg_use(self):
+        """
+        Test files with <use> objects are parsed whole, with the use definitions.
+        """
+        file1 = "test-load-use.svg"
+        with open(file1, "w") as f:
+            f.write(
+                SVG_STRUCTURE.replace(
+                    "</svg>", '<use xlink:href="#r1" x="40" y="40"/></svg>'
+                )
+            )
+        self.addCleanup(os.remove, file1)
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console(f"load {file1}\n")
+            rects = list(kernel.elements.elem_branch.flat(types="elem rect"))
+            self.assertEqual(len(rects), 2)
+        finally:
+            kernel()
+
+    def test_load_svg_stream_malformed(self):
+        """
+        Test a truncated file raises BadFileError, without leaving the nodes read before the error.
+        """
+        file1 = "test-load-truncated.svg"
+        with open(file1, "w") as f:
+            f.write(SVG_STRUCTURE[: SVG_STRUCTURE.index("<text")])
+        self.addCleanup(os.remove, file1)
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            kernel.console("element* delete\n")
+            with self.assertRaises(BadFileError):
+                SVGLoader.load(kernel.root, elements, file1)
+            self.assertEqual(len(list(elements.elem_branch.flat())), 1)
+            self.assertEqual(len(list(elements.reg_branch.flat())), 1)
+        finally:
+            kernel()
+
+    def test_load_svg_speed(self):
+        """
+        Test the load time and peak memory of a project of elements referenced by operations, streamed and from
+        the whole parsed svg. The project has 5k elements if MEERK40T_BENCHMARK is set, 200 otherwise.
+        """
+        count = 5000 if os.environ.get("MEERK40T_BENCHMARK") else 200
+        file1 = "test-load-speed.svg"
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            for i in range(count):
+                elements.elem_branch.add(
+                    type="elem rect",
+                    x=(i % 100) * 1000,
+                    y=(i // 100) * 1000,
+                    width=800,
+                    height=800,
+                    stroke=Color(("red", "blue", "black")[i % 3]),
+                )
+            elements.classify(list(elements.elems()))
+            SVGWriter.save(kernel.root, file1)
+            self.addCleanup(os.remove, file1)
+        finally:
+            kernel()
+        results = {}
+        for stream in (False, True):
+            kernel = bootstrap.bootstrap()
+            try:
+                elements = kernel.elements
+                with mock.patch("meerk40t.core.svg_io.svg_uses", return_value=not stream):
+                    t = time.time()
+                    SVGLoader.load(kernel.root, elements, file1)
+                    loaded = time.time() - t
+                references = len(list(elements.op_branch.flat(types="reference")))
+                self.assertGreaterEqual(references, count)
+                elements.elem_branch.remove_all_children(fast=True)
+                elements.op_branch.remove_all_children(fast=True)
+                with mock.patch("meerk40t.core.svg_io.svg_uses", return_value=not stream):
+                    tracemalloc.start()
+                    SVGLoader.load(kernel.root, elements, file1)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                results[stream] = loaded, peak, references
+            finally:
+                kernel()
+        print(
+            f"{count} elements loaded: whole {results[False][0]:.2f}s "
+            f"{results[False][1] / 1e6:.1f}MB peak, "
+            f"streamed {results[True][0]:.2f}s {results[True][1] / 1e6:.1f}MB peak"
+        )
+        self.assertEqual(results[True][2], results[False][2])
+        self.assertLess(results[True][1], results[False][1])
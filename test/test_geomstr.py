@@ -9,10 +9,21 @@ import numpy as np
 
 from meerk40t.fill.fills import scanline_fill
 from meerk40t.fill.patterns import set_diamond1, set_line
-from meerk40t.svgelements import Arc, CubicBezier, Line, Matrix, QuadraticBezier
+from meerk40t.svgelements import (
+    Arc,
+    CubicBezier,
+    Line,
+    Matrix,
+    Path,
+    QuadraticBezier,
+)
 from meerk40t.tools.geomstr import (
+    TYPE_ARC,
+    TYPE_CUBIC,
+    TYPE_END,
     TYPE_LINE,
     TYPE_POINT,
+    TYPE_QUAD,
     BeamTable,
     Clip,
     Geomstr,
@@ -124,6 +135,135 @@ def random_segment(path, i=100, point=True, line=True, quad=True, cubic=True, ar
         )
 
 
+def fixed_equal_interpolated_points(path, distance):
+    """
+    Equally interpolated points of path, sampling each curve at 1000 fixed positions.
+
+    This is the sampling as_equal_interpolated_points() used before the curves were flattened in batches.
+    """
+    at_start = True
+    end = None
+    for e in path.segments[: path.index]:
+        seg_type = int(e[2].real)
+        start = e[0]
+        if end != start and not at_start:
+            yield None
+            at_start = True
+            if seg_type == TYPE_END:
+                continue
+        end = e[4]
+        if at_start:
+            yield start
+            at_start = False
+        if seg_type == TYPE_END:
+            at_start = True
+            continue
+        samples = fixed_samples(path, e)
+        if samples is not None:
+            distances = np.cumsum(np.abs(samples[:-1] - samples[1:]))
+            max_distance = distances[-1]
+            dist_values = np.linspace(
+                0,
+                max_distance,
+                int(np.ceil(max_distance / distance)),
+                endpoint=False,
+            )[1:]
+            yield from samples[np.searchsorted(distances, dist_values, side="right")]
+        yield end
+
+
+def fixed_samples(path, e, count=1000):
+    seg_type = int(e[2].real)
+    ts = np.linspace(0, 1, count)
+    if seg_type == TYPE_QUAD:
+        return path._quad_position(e, ts)
+    if seg_type == TYPE_CUBIC:
+        return path._cubic_position(e, ts)
+    if seg_type == TYPE_ARC:
+        return path._arc_position(e, ts)
+    return None
+
+
+def random_path_d(r, count=20, arcs=True, circular=False):
+    """
+    Random svg path data, mixing absolute and relative commands, implicit repeats and compacted numbers.
+    """
+
+    def number(low=-100.0, high=100.0):
+        v = r.uniform(low, high)
+        return r.choice((f"{v:.3f}", f"{v:g}", f"{v:.2e}", f"{round(v)}", f"{v:.1f}"))
+
+    def join(values):
+        text = values[0]
+        for v in values[1:]:
+            if v.startswith("-"):
+                text += r.choice(("", " ", ","))
+            else:
+                text += r.choice((" ", ",", " , ", "\n"))
+            text += v
+        return text
+
+    arities = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "Z": 0}
+    if arcs:
+        arities["A"] = 7
+    parts = [f"M{join([number(), number()])}"]
+    for i in range(count):
+        command = r.choice(list(arities))
+        arity = arities[command]
+        if r.random() < 0.5:
+            command = command.lower()
+        if arity == 0:
+            parts.append(command)
+            continue
+        args = []
+        for j in range(r.randint(1, 3)):
+            if arity == 7:
+                rx = r.uniform(1, 50)
+                ry = rx if circular else rx * r.uniform(0.2, 0.8)
+                args.append(
+                    f"{rx} {ry} {number(0, 360)} {r.randint(0, 1)} {r.randint(0, 1)} "
+                    + join([number(), number()])
+                )
+            else:
+                args.append(join([number() for k in range(arity)]))
+        parts.append(command + r.choice(("", " ")) + " ".join(args))
+    return r.choice(("", " ")).join(parts)
+
+
+def scanbeam_hatch(outer, angle, distance):
+    """
+    Reference hatch stepping a Scanbeam through each scanline.
+    """
+    path = outer.segmented()
+    path.rotate(angle)
+    vm = Scanbeam(path)
+    y_min, y_max = vm.event_range()
+    vm.valid_low = y_min - distance
+    vm.valid_high = y_max + distance
+    vm.scanline_to(vm.valid_low)
+
+    forward = True
+    geometry = Geomstr()
+    if np.isinf(y_max):
+        return geometry
+    while vm.current_is_valid_range():
+        vm.scanline_to(vm.scanline + distance)
+        y = vm.scanline
+        actives = vm.actives()
+        r = range(1, len(actives), 2) if forward else range(len(actives) - 1, 0, -2)
+        for i in r:
+            left_x = vm.x_intercept(actives[i - 1])
+            right_x = vm.x_intercept(actives[i])
+            if forward:
+                geometry.line(complex(left_x, y), complex(right_x, y))
+            else:
+                geometry.line(complex(right_x, y), complex(left_x, y))
+            geometry.end()
+        forward = not forward
+    geometry.rotate(-angle)
+    return geometry
+
+
 class TestGeomstr(unittest.TestCase):
     """These tests ensure the basic functions of the Geomstr elements."""
 
@@ -605,6 +745,114 @@ class TestGeomstr(unittest.TestCase):
         for d in distances:
             self.assertAlmostEqual(d, 5, delta=1)
 
+    def test_geomstr_equal_interpolated_compatible(self):
+        """
+        Test the flattened curves giving the points of the fixed sampling. Points of the fixed sampling are off by up
+        to one sample, and curves of nearly a whole number of distances may differ by a point.
+        @return:
+        """
+        for i in range(300):
+            path = Geomstr()
+            random_segment(path, i=1000, point=False, line=False)
+            e = path.segments[0]
+            samples = fixed_samples(path, e)
+            steps = np.abs(np.diff(samples))
+            # The fixed samples themselves fall short of long arcs.
+            fine = np.sum(np.abs(np.diff(fixed_samples(path, e, count=10000))))
+            for distance in (2, 10, 50):
+                expected = list(fixed_equal_interpolated_points(path, distance))
+                points = list(path.as_equal_interpolated_points(distance))
+                spaces = np.sum(steps) / distance
+                if abs(spaces - round(spaces)) < 0.05:
+                    continue
+                if np.ceil(spaces) != np.ceil(fine / distance):
+                    continue
+                self.assertEqual(len(points), len(expected))
+                self.assertEqual(points[0], e[0])
+                self.assertEqual(points[-1], e[4])
+                for p, q in zip(points, expected):
+                    self.assertAlmostEqual(
+                        abs(p - q), 0, delta=np.max(steps) + distance * 0.02
+                    )
+
+    def test_geomstr_equal_interpolated_breaks(self):
+        """
+        Test the starts, ends and breaks of the points against the fixed sampling, for disjoint and ended runs.
+        @return:
+        """
+        for i in range(50):
+            path = Geomstr()
+            for j in range(30):
+                k = random.randint(0, 5)
+                if k == 0:
+                    path.end()
+                elif k == 1 and path.index:
+                    last = path.segments[path.index - 1][4]
+                    if not np.isnan(last):
+                        path.line(last, random_point())
+                else:
+                    random_segment(path)
+            # Without interior points, everything is exact, even nan starts of double ends.
+            expected = list(fixed_equal_interpolated_points(path, math.inf))
+            points = list(path.as_equal_interpolated_points(math.inf))
+            self.assertEqual(len(points), len(expected))
+            for p, q in zip(points, expected):
+                if q is None:
+                    self.assertIsNone(p)
+                elif np.isnan(q):
+                    self.assertTrue(np.isnan(p))
+                else:
+                    self.assertEqual(p, q)
+
+            points = list(path.as_equal_interpolated_points(5))
+            pts, breaks = path.as_equal_interpolated_arrays(5)
+            self.assertEqual(len(pts) + len(breaks), len(points))
+            segments = list(path.as_equal_interpolated_segments(5))
+            self.assertEqual(sum(len(s) for s in segments), len(pts))
+
+            segmented = path.segmented(5)
+            lines = Geomstr.lines(*points)
+            self.assertEqual(segmented.index, lines.index)
+            self.assertTrue(
+                np.array_equal(
+                    segmented.segments[: segmented.index],
+                    lines.segments[: lines.index],
+                    equal_nan=True,
+                )
+            )
+
+    def test_geomstr_equal_interpolated_speed(self):
+        """
+        Test the speed of equally interpolating 20000 beziers, against the fixed sampling.
+        @return:
+        """
+        path = Geomstr()
+        for i in range(10000):
+            path.quad(random_point(1000), random_point(1000), random_point(1000))
+            path.cubic(
+                random_point(1000),
+                random_point(1000),
+                random_point(1000),
+                random_point(1000),
+            )
+        for distance in (1, 10):
+            t = time.time()
+            expected = list(fixed_equal_interpolated_points(path, distance))
+            t0 = time.time() - t
+            t = time.time()
+            points = list(path.as_equal_interpolated_points(distance))
+            t1 = time.time() - t
+            t = time.time()
+            path.as_equal_interpolated_arrays(distance)
+            t2 = time.time() - t
+            self.assertAlmostEqual(
+                len(points), len(expected), delta=len(expected) * 0.001
+            )
+            print(
+                f"{len(points)} points at distance {distance}: fixed {t0:.3f}s, "
+                f"flattened {t1:.3f}s, arrays {t2:.3f}s"
+            )
+
     # def test_geomstr_cubic_equal_distances(self):
     #     for i in range(5):
     #         start = random_point()
@@ -1472,6 +1720,155 @@ class TestGeomstr(unittest.TestCase):
         gs = Geomstr.svg("M0,0 h100 v100 h-100 v-100 z")
         self.assertEqual(gs.raw_length(), 400.0)
 
+    def test_geomstr_svg_path_d(self):
+        """
+        Test path data parsed into segments directly against parsing the svgelements path.
+        """
+        paths = [
+            "",
+            "M0,0",
+            "M0,0 h100 v100 h-100 v-100 z",
+            "m10 10 20 20 -5 5z m 1 1 l 2 2 L 3 3 4 4 H 9 h 1 2 V 8 v 1 2 Z",
+            "M0 0 L 5 5 M5 5 L 9 9 M9 9 M9 9",
+            "M1 1 L 4 4 z M1 1 L 3 3 z",
+            "M1 1c1 2 3 4 5 6 7 8 9 10 11 12s1 1 2 2S 5 5 6 6C1 1 2 2 3 3",
+            "M1 1q1 2 3 4 5 6 7 8t1 1 2 2T 5 5 6 6Q1 1 2 2s1 1 2 2",
+            "M1 1c1 2 3 4 5 6q1 1 2 2t1 1s2 2 3 3l1 1t4 4s1 1 2 2",
+            "M-1-2-3.5.5.5-1e2,1E+2 3e-1L.1.2+3,+4",
+            "M0,0\t10,10\n20,20\r30,30\x0c40,40",
+        ]
+        r = random.Random(5)
+        paths.extend(random_path_d(r, arcs=False) for i in range(300))
+        for d in paths:
+            with self.subTest(d=d):
+                expected = Geomstr.svg(Path(d))
+                gs = Geomstr.svg(d)
+                self.assertTrue(
+                    np.array_equal(
+                        gs.segments[: gs.index],
+                        expected.segments[: expected.index],
+                        equal_nan=True,
+                    )
+                )
+        # Elliptical arcs are converted to quads.
+        paths = [
+            "M0 0 A 10 20 30 1 0 15 5 a 5 3 0 0 1 10 0 -5 -3 45 1 1 -10 0",
+            "M0 0 A 1 2 0 0 0 100 100 a 2 1 10 1 1 50 50",
+        ]
+        paths.extend(random_path_d(r) for i in range(300))
+        for d in paths:
+            with self.subTest(d=d):
+                expected = Geomstr.svg(Path(d))
+                gs = Geomstr.svg(d)
+                self.assertEqual(gs.index, expected.index)
+                self.assertTrue(
+                    np.allclose(
+                        gs.segments[: gs.index],
+                        expected.segments[: expected.index],
+                        equal_nan=True,
+                    )
+                )
+
+    def test_geomstr_svg_path_d_arcs(self):
+        """
+        Test circular arcs, and arcs without a valid svg parameterization.
+        """
+        r = random.Random(6)
+        for i in range(200):
+            d = random_path_d(r, circular=True)
+            with self.subTest(d=d):
+                gs = Geomstr.svg(d)
+                arcs = [s for s in Path(d) if isinstance(s, Arc)]
+                segments = gs.segments[: gs.index]
+                segments = segments[segments[:, 2].real == TYPE_ARC]
+                self.assertEqual(len(segments), len(arcs))
+                for segment, arc in zip(segments, arcs):
+                    self.assertEqual(segment[0], complex(arc.start))
+                    self.assertEqual(segment[4], complex(arc.end))
+                    self.assertAlmostEqual(segment[1], complex(arc.point(0.5)))
+                    for t in np.linspace(0, 1, 11):
+                        self.assertAlmostEqual(
+                            Geomstr(np.array([segment])).position(0, t),
+                            complex(arc.point(t)),
+                            delta=1e-4,
+                        )
+        # Zero radius and zero length arcs.
+        gs = Geomstr.svg("M0 0 A 0 5 0 0 0 10 10 A 5 0 0 0 0 20 20 a 5 5 0 0 0 0 0")
+        arc = complex(TYPE_ARC, 0)
+        expected = [
+            (0, 0, arc, 0, 10 + 10j),
+            (10 + 10j, 10 + 10j, arc, 10 + 10j, 20 + 20j),
+            (20 + 20j, 20 + 20j, arc, 20 + 20j, 20 + 20j),
+        ]
+        self.assertTrue(np.array_equal(gs.segments[: gs.index], expected))
+
+    def test_geomstr_svg_path_d_fallback(self):
+        """
+        Test path data left to the svgelements parser.
+        """
+        paths = [
+            # Compacted arc flags.
+            "M0 0a5 5 0 1110 10",
+            "M0 0a5 5 0 01.5 3",
+            # Numbers and commands not tokenized plainly.
+            "M0 0 L 10 10 20 20 30",
+            "M0 0 V",
+            "M0 0 A",
+            "L 10 10",
+            "M0 0 x 10 10",
+            "M 0 0 z 10",
+        ]
+        for d in paths:
+            with self.subTest(d=d):
+                self.assertIsNone(Geomstr._svg_path_d(d))
+                try:
+                    expected = Geomstr.svg(Path(d))
+                except Exception as e:
+                    self.assertRaises(type(e), Geomstr.svg, d)
+                    continue
+                gs = Geomstr.svg(d)
+                self.assertTrue(
+                    np.array_equal(
+                        gs.segments[: gs.index],
+                        expected.segments[: expected.index],
+                        equal_nan=True,
+                    )
+                )
+
+    def test_geomstr_svg_path_d_speed(self):
+        """
+        Test the speed of parsing path data, for an icon set and a cad export.
+        """
+        r = random.Random(7)
+        icons = [random_path_d(r, count=12) for i in range(1000)]
+        cad = []
+        for i in range(5):
+            cad.append(
+                "M0 0 "
+                + " ".join(
+                    f"L{r.uniform(0, 1e5):.4f},{r.uniform(0, 1e5):.4f}"
+                    for j in range(5000)
+                )
+                + " "
+                + " ".join(
+                    f"A{r.uniform(10, 500):.4f},{r.uniform(10, 500):.4f} 0 0 1 "
+                    f"{r.uniform(0, 1e5):.4f},{r.uniform(0, 1e5):.4f}"
+                    for j in range(500)
+                )
+                + "Z"
+            )
+        for name, paths in (("icons", icons), ("cad", cad)):
+            t = time.time()
+            for d in paths:
+                Geomstr.svg(Path(d))
+            t_path = time.time() - t
+            t = time.time()
+            for d in paths:
+                Geomstr.svg(d)
+            t_path_d = time.time() - t
+            print(f"Svg {name}: svgelements {t_path:.3f}s, path data {t_path_d:.3f}s")
+            self.assertLess(t_path_d, t_path)
+
     def test_geomstr_near(self):
         """
         Test geomstr near command to find number of segment points within a given range.
@@ -1803,6 +2200,52 @@ class TestGeomstr(unittest.TestCase):
         executed = list(g.as_lines())
         self.assertEqual(len(executed), 12)
 
+    def test_geomstr_hatch_scanbeam(self):
+        """
+        Test that the hatch gives the same lines as stepping a scanbeam.
+        """
+        shapes = [
+            Geomstr.rect(0, 0, 100, 100),
+            Geomstr.circle(50, 50, 50),
+            Geomstr.lines(0, 0, 100, 0, 0, 100, 0, 0),
+            Geomstr(),
+        ]
+        for i in range(20):
+            g = Geomstr()
+            for j in range(random.randint(1, 4)):
+                pts = [random_pointi(100) for k in range(random.randint(3, 9))]
+                pts.append(pts[0])
+                g.append(Geomstr.lines(*pts))
+            shapes.append(g)
+        for shape in shapes:
+            for angle in (0, tau / 8, tau / 4, 0.3, tau / 3):
+                for distance in (1.0, 3.3, 7):
+                    expected = scanbeam_hatch(copy(shape), angle, distance)
+                    hatch = Geomstr.hatch(copy(shape), angle, distance)
+                    self.assertEqual(expected.index, hatch.index)
+                    self.assertTrue(
+                        np.array_equal(
+                            expected.segments[: expected.index],
+                            hatch.segments[: hatch.index],
+                            equal_nan=True,
+                        )
+                    )
+
+    def test_geomstr_hatch_speed(self):
+        """
+        Test the speed of the hatch for a dense fill of a large shape.
+        """
+        g = Geomstr.circle(5000, 5000, 5000)
+        g.append(Geomstr.circle(5000, 5000, 2000))
+        t = time.time()
+        expected = scanbeam_hatch(copy(g), 0.3, 5.0)
+        t_scanbeam = time.time() - t
+        t = time.time()
+        hatch = Geomstr.hatch(copy(g), 0.3, 5.0)
+        t_hatch = time.time() - t
+        self.assertEqual(expected.index, hatch.index)
+        print(f"Hatch: scanbeam {t_scanbeam:.3f}s, vectorized {t_hatch:.3f}s")
+
     # def test_geomstr_hatch(self):
     #     gs = Geomstr.svg(
     #         "M 207770.064517,235321.124952 C 206605.069353,234992.732685 205977.289179,234250.951228 205980.879932,233207.034699 C 205983.217733,232527.380908 206063.501616,232426.095743 206731.813533,232259.66605 L 207288.352862,232121.071081 L 207207.998708,232804.759538 C 207106.904585,233664.912764 207367.871267,234231.469286 207960.295387,234437.989447 C 208960.760372,234786.753419 209959.046638,234459.536445 210380.398871,233644.731075 C 210672.441667,233079.98258 210772.793626,231736.144349 210569.029382,231118.732625 C 210379.268508,230543.75153 209783.667018,230128.095713 209148.499972,230127.379646 C 208627.98084,230126.79283 208274.720902,230294.472682 207747.763851,230792.258962 C 207377.90966,231141.639128 207320.755956,231155.543097 206798.920578,231023.087178 C 206328.09633,230903.579262 206253.35266,230839.656219 206307.510015,230602.818034 C 206382.366365,230275.460062 207158.299204,225839.458855 207158.299204,225738.863735 C 207158.299204,225701.269015 208426.401454,225670.509699 209976.304204,225670.509699 C 211869.528049,225670.509699 212794.309204,225715.990496 212794.309204,225809.099369 C 212794.309204,225885.323687 212726.683921,226357.175687 212644.030798,226857.659369 L 212493.752392,227767.629699 L 210171.516354,227767.629699 L 207849.280317,227767.629699 L 207771.086662,228324.677199 C 207728.080152,228631.053324 207654.900983,229067.454479 207608.466287,229294.457543 L 207524.039566,229707.190387 L 208182.568319,229381.288158 C 209664.399179,228647.938278 211467.922971,228893.537762 212548.92912,229975.888551 C 214130.813964,231559.741067 213569.470754,234195.253882 211455.779825,235108.237047 C 210589.985852,235482.206254 208723.891068,235589.992389 207770.064517,235321.124952 L 207770.064517,235321.124952Z"
@@ -1,9 +1,50 @@
+import time
 import unittest
 
+from meerk40t.core.node.elem_ellipse import EllipseNode
+from meerk40t.core.node.elem_line import LineNode
+from meerk40t.core.node.elem_path import PathNode
+from meerk40t.core.node.elem_point import PointNode
 from meerk40t.core.node.elem_polyline import PolylineNode
+from meerk40t.core.node.elem_rect import RectNode
+from meerk40t.svgelements import Matrix
 from meerk40t.tools.geomstr import Geomstr
 
 
+def uncached_geometry(node):
+    """
+    Transformed geometry of the node, built as as_geometry() did before it was cached.
+    """
+    if node.type == "elem rect":
+        g = Geomstr.rect(
+            node.x, node.y, node.width, node.height, rx=node.rx, ry=node.ry
+        )
+    elif node.type == "elem ellipse":
+        g = Geomstr.ellipse(node.rx, node.ry, node.cx, node.cy, 0, 12)
+    elif node.type == "elem line":
+        g = Geomstr.lines(node.x1, node.y1, node.x2, node.y2)
+    elif node.type == "elem point":
+        g = Geomstr()
+        g.point(complex(node.x, node.y))
+    else:
+        g = Geomstr(node.geometry)
+    g.transform(node.matrix)
+    return g
+
+
+def geometry_nodes():
+    path = Geomstr.lines(0, 0, 1000, 1000, 2000, 0)
+    path.cubic(complex(2000, 0), complex(2000, 500), complex(3000, 500), 3000)
+    return [
+        RectNode(x=100, y=200, width=3000, height=2000, rx=100, ry=100),
+        EllipseNode(cx=1000, cy=1000, rx=500, ry=300),
+        LineNode(x1=0, y1=0, x2=1000, y2=2000),
+        PointNode(x=500, y=500),
+        PolylineNode(Geomstr.lines(0, 0, 100, 100, 200, 0)),
+        PathNode(geometry=path),
+    ]
+
+
 class TestGeomstr(unittest.TestCase):
     """These tests ensure the basic functions of the Geomstr node types"""
 
@@ -16,3 +57,83 @@ class TestGeomstr(unittest.TestCase):
     def test_polynode_revalidate(self):
         node = PolylineNode(Geomstr.lines(0, 0, 1, 1, 2, 2, 3, 3, 4, 4))
         node.revalidate_points()
+
+
+class TestCachedGeometry(unittest.TestCase):
+    """These tests ensure the cached geometry of the nodes follows the changes of the nodes"""
+
+    def assertGeometry(self, node):
+        expected = uncached_geometry(node)
+        self.assertEqual(node.as_geometry(), expected)
+        self.assertEqual(node.geometry_view(), expected)
+        if node.type != "elem point":
+            self.assertEqual(node.bbox(), tuple(expected.bbox()))
+
+    def test_cached_geometry_changes(self):
+        for node in geometry_nodes():
+            self.assertGeometry(node)
+            node.matrix.post_translate(100, 50)
+            node.translated(100, 50)
+            self.assertGeometry(node)
+            node.matrix.post_scale(2, 0.5, 100, 100)
+            node.scaled(2, 0.5, 100, 100)
+            self.assertGeometry(node)
+            node.matrix.post_rotate(0.5)
+            node.modified()
+            self.assertGeometry(node)
+            # Changes of the matrix are picked up without notification.
+            node.matrix *= Matrix.skew_x(0.2)
+            self.assertGeometry(node)
+            if node.type == "elem rect":
+                node.width = 500
+            elif node.type == "elem ellipse":
+                node.rx = 100
+            elif node.type == "elem line":
+                node.x2 = -500
+            elif node.type == "elem point":
+                node.y = -200
+            else:
+                node.geometry.line(complex(0, 0), complex(-500, -500))
+            node.altered()
+            self.assertGeometry(node)
+
+    def test_cached_geometry_readonly(self):
+        for node in geometry_nodes():
+            view = node.geometry_view()
+            with self.assertRaises(ValueError):
+                view.transform(Matrix.scale(2))
+            geometry = node.as_geometry()
+            geometry.transform(Matrix.scale(2))
+            geometry.line(complex(0, 0), complex(1, 1))
+            # Changing the copy leaves the cache untouched.
+            self.assertGeometry(node)
+            view.line(complex(0, 0), complex(1, 1))
+            self.assertGeometry(node)
+
+    def test_cached_geometry_speed(self):
+        """
+        Test the speed of repeated geometry and bounds requests of unchanged nodes.
+        """
+        path = Geomstr()
+        for i in range(500):
+            path.cubic(
+                complex(i, 0), complex(i, 100), complex(i + 1, 100), complex(i + 1, 0)
+            )
+        node = PathNode(geometry=path)
+        node.matrix.post_scale(2)
+        count = 200
+        t = time.time()
+        for i in range(count):
+            g = uncached_geometry(node)
+            g.bbox()
+        uncached = (time.time() - t) / count
+        t = time.time()
+        for i in range(count):
+            node.geometry_view()
+            node.bbox()
+        cached = (time.time() - t) / count
+        print(
+            f"geometry and bbox of {len(path)} segments: "
+            f"uncached {uncached * 1000:.3f}ms, cached {cached * 1000:.4f}ms"
+        )
+        self.assertLess(cached, uncached)
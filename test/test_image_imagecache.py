@@ -0,0 +1,140 @@
+import threading
+import time
+import unittest
+from copy import copy
+from test import bootstrap
+
+from PIL import Image, ImageDraw
+
+from meerk40t.core.node.elem_image import ImageNode
+from meerk40t.image.imagecache import (
+    ImageCache,
+    ImageProcessPool,
+    image_cache,
+    image_pool,
+)
+
+
+def make_image(size=512):
+    image = Image.new("RGBA", (size, size), "white")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((size // 8, size // 8, size * 7 // 8, size * 7 // 8), "black")
+    return image
+
+
+class TestImageCache(unittest.TestCase):
+    def test_imagecache_memoized(self):
+        """
+        Test that copies of an unchanged image node reuse the processed image, and that
+        changed settings process the image again.
+        """
+        image_cache.clear()
+        node = ImageNode(image=make_image(), dpi=500)
+        processed = node.active_image
+        hits = image_cache.hits
+        duplicate = copy(node)
+        self.assertIs(duplicate.active_image, processed)
+        self.assertEqual(image_cache.hits, hits + 1)
+        self.assertEqual(duplicate.bbox(), node.bbox())
+
+        duplicate.dpi = 250
+        duplicate.update(None)
+        self.assertIsNot(duplicate.active_image, processed)
+        self.assertLess(duplicate.active_image.width, processed.width)
+
+        node.operations.append({"name": "dither", "enable": False, "type": None})
+        node.update(None)
+        self.assertFalse(node.dither)
+        self.assertEqual(node.active_image.mode, "L")
+        reverted = ImageNode(image=node.image, dpi=500)
+        reverted.operations.append({"name": "dither", "enable": False, "type": None})
+        reverted.update(None)
+        self.assertIs(reverted.active_image, node.active_image)
+        self.assertFalse(reverted.dither)
+
+    def test_imagecache_budget(self):
+        """
+        Test the least recently used results are evicted beyond the memory budget.
+        """
+        cache = ImageCache(budget=3 * 100 * 100)
+        for i in range(3):
+            cache.put(i, (None, Image.new("L", (100, 100))))
+        self.assertIsNotNone(cache.get(0))
+        cache.put(3, (None, Image.new("L", (100, 100))))
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(1))
+        self.assertIsNotNone(cache.get(0))
+        cache.put(4, (None, Image.new("L", (1000, 1000))))
+        self.assertIsNone(cache.get(4))
+        self.assertEqual(cache.size, 3 * 100 * 100)
+
+    def test_imagecache_pool_stale(self):
+        """
+        Test that pending requests are replaced by newer requests of the same owner.
+        """
+        pool = ImageProcessPool(workers=2)
+        release = threading.Event()
+        ran = []
+        results = []
+
+        def blocked():
+            release.wait(5)
+            ran.append("blocked")
+            return "blocked"
+
+        def request(i):
+            def process():
+                ran.append(i)
+                return i
+
+            return process
+
+        pool.submit("a", blocked, result=results.append)
+        time.sleep(0.1)
+        for i in range(10):
+            pool.submit("a", request(i), result=results.append)
+        pool.submit("b", request("b"), result=results.append)
+        self.assertFalse(pool.wait(0.2))
+        release.set()
+        self.assertTrue(pool.wait(5))
+        self.assertEqual(sorted(map(str, ran)), ["9", "b", "blocked"])
+        # The blocked request was superseded while running.
+        self.assertNotIn("blocked", results)
+        self.assertIn(9, results)
+
+    def test_imagecache_update(self):
+        """
+        Test that image updates within a kernel are processed by the pool.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            image_cache.clear()
+            node = ImageNode(image=make_image(256))
+            for dpi in (100, 200, 300, 400, 500):
+                node.dpi = dpi
+                node.update(kernel.root)
+            self.assertTrue(image_pool.wait(10))
+            self.assertEqual(node.dpi, 500)
+            expected = ImageNode(image=make_image(256), dpi=500)
+            expected.update(None)
+            self.assertEqual(node.active_image.size, expected.active_image.size)
+            self.assertIsNone(node.message)
+        finally:
+            kernel()
+
+    def test_imagecache_speed(self):
+        """
+        Test the speed of repeated processing of unchanged images.
+        """
+        image = make_image(2000)
+        nodes = [ImageNode(image=image, dpi=500) for _ in range(10)]
+        t = time.time()
+        for node in nodes:
+            image_cache.clear()
+            node.update(None)
+        uncached = time.time() - t
+        t = time.time()
+        for node in nodes:
+            node.update(None)
+        cached = time.time() - t
+        print(f"Processed 10 image nodes in {uncached:.3f}s, memoized {cached:.3f}s")
@@ -0,0 +1,135 @@
+import time
+import unittest
+from test import bootstrap
+
+import numpy as np
+
+from meerk40t.core.cutplan import CutPlan
+from meerk40t.core.node.elem_path import PathNode
+from meerk40t.core.node.node import Fillrule
+from meerk40t.core.node.op_raster import RasterOpNode
+from meerk40t.image import rasterizer
+from meerk40t.svgelements import Color, Matrix
+from meerk40t.tools.geomstr import Geomstr
+
+
+def square_with_hole():
+    g = Geomstr.rect(0, 0, 10000, 10000)
+    g.append(Geomstr.rect(2500, 2500, 5000, 5000))
+    return g
+
+
+class TestRasterizer(unittest.TestCase):
+    def test_rasterizer_fillrule(self):
+        """
+        Test that fills follow the fill rule and strokes are drawn with the stroke width.
+        """
+        renderer = rasterizer.Rasterizer(None)
+        evenodd = PathNode(geometry=square_with_hole(), fill=Color("black"))
+        evenodd.fillrule = Fillrule.FILLRULE_EVENODD
+        nonzero = PathNode(geometry=square_with_hole(), fill=Color("black"))
+        nonzero.fillrule = Fillrule.FILLRULE_NONZERO
+        for node in (evenodd, nonzero):
+            node.stroke = None
+        image = renderer.make_raster([evenodd], evenodd.bounds, step_x=100, step_y=100)
+        self.assertEqual(image.size, (100, 100))
+        pixels = np.array(image.convert("L"))
+        self.assertEqual(pixels[50, 10], 0)
+        self.assertEqual(pixels[50, 50], 255)
+        image = renderer.make_raster([nonzero], nonzero.bounds, step_x=100, step_y=100)
+        pixels = np.array(image.convert("L"))
+        self.assertEqual(pixels[50, 10], 0)
+        self.assertEqual(pixels[50, 50], 0)
+
+        stroked = PathNode(
+            geometry=Geomstr.rect(0, 0, 10000, 10000),
+            stroke=Color("black"),
+            stroke_width=1000,
+        )
+        image = renderer.make_raster([stroked], stroked.bounds, step_x=100, step_y=100)
+        pixels = np.array(image.convert("L"))
+        self.assertEqual(pixels[55, 5], 0)
+        self.assertEqual(pixels[55, 55], 255)
+
+    def test_rasterizer_bands(self):
+        """
+        Test that rendering in bands gives the same raster as a single band.
+        """
+        renderer = rasterizer.Rasterizer(None)
+        node = PathNode(
+            geometry=Geomstr.circle(5000, 5000, 5000),
+            fill=Color("black"),
+            stroke=Color("red"),
+            stroke_width=500,
+        )
+        node.fillrule = Fillrule.FILLRULE_NONZERO
+        image = renderer.make_raster([node], node.paint_bounds, step_x=20, step_y=20)
+        band_pixels = rasterizer.BAND_PIXELS
+        try:
+            rasterizer.BAND_PIXELS = image.width * 7
+            banded = renderer.make_raster(
+                [node], node.paint_bounds, step_x=20, step_y=20
+            )
+        finally:
+            rasterizer.BAND_PIXELS = band_pixels
+        self.assertTrue(np.array_equal(np.array(image), np.array(banded)))
+        filled = np.mean(np.array(image.convert("L")) < 255)
+        self.assertAlmostEqual(filled, np.pi / 4, delta=0.05)
+
+    def test_rasterizer_mode(self):
+        """
+        Test that the raster is built in the smallest mode that holds its colors.
+        """
+        from PIL import Image
+
+        from meerk40t.core.node.elem_image import ImageNode
+
+        renderer = rasterizer.Rasterizer(None)
+        for color, mode in (("black", "1"), ("gray", "L"), ("red", "RGB")):
+            node = PathNode(geometry=square_with_hole(), fill=Color(color))
+            node.stroke = None
+            image = renderer.make_raster([node], node.bounds, step_x=100, step_y=100)
+            self.assertEqual(image.mode, mode)
+            rgb = Color(color).red, Color(color).green, Color(color).blue
+            self.assertEqual(image.convert("RGB").getpixel((10, 50)), rgb)
+        gray = ImageNode(
+            image=Image.new("L", (10, 10), 128), matrix=Matrix.scale(1000, 1000)
+        )
+        image = renderer.make_raster([gray], gray.bounds, step_x=100, step_y=100)
+        self.assertEqual(image.mode, "L")
+        # The image is dithered, so only its average gray is kept.
+        self.assertAlmostEqual(np.mean(np.array(image)), 128, delta=5)
+
+    def test_rasterizer_speed(self):
+        """
+        Test the speed of rendering a large filled shape.
+        """
+        renderer = rasterizer.Rasterizer(None)
+        node = PathNode(
+            geometry=Geomstr.circle(500000, 500000, 500000),
+            fill=Color("black"),
+            stroke=Color("black"),
+        )
+        t = time.time()
+        image = renderer.make_raster([node], node.paint_bounds, step_x=200, step_y=200)
+        print(f"Rendered {image.width}x{image.height} in {time.time() - t:.3f}s")
+
+    def test_rasterizer_raster_op(self):
+        """
+        Test that raster operations are rendered rather than stripped without a gui.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            rasterizer.plugin(kernel, "register")
+            self.assertIsNotNone(kernel.root.lookup("render-op/make_raster"))
+            laserop = RasterOpNode()
+            laserop.add_node(
+                PathNode(geometry=square_with_hole(), fill=Color("black"))
+            )
+            cutplan = CutPlan("a", kernel.root)
+            laserop.preprocess(kernel.root, Matrix(), cutplan)
+            cutplan.execute()
+            self.assertEqual(len(laserop.children), 1)
+            self.assertEqual(laserop.children[0].type, "elem image")
+        finally:
+            kernel()
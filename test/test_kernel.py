@@ -1,5 +1,10 @@
+import re
+import time
 import unittest
 from test import bootstrap
+from unittest import mock
+
+from meerk40t.kernel.registry import literal_prefix
 
 
 class TestKernel(unittest.TestCase):
@@ -198,3 +203,176 @@ class TestEchoCommand(unittest.TestCase):
                 kernel.console(echo + "\n")
         finally:
             kernel()
+
+
+class TestRegistry(unittest.TestCase):
+    def test_registry_prefix(self):
+        """
+        Tests literal prefixes of lookup patterns.
+        """
+        self.assertEqual(literal_prefix("path_updater/.*"), "path_updater/")
+        self.assertEqual(literal_prefix("command/elements.*"), "command/elements")
+        self.assertEqual(literal_prefix("command/None/plan"), "command/None/plan")
+        self.assertEqual(literal_prefix("command/ab?"), "command/a")
+        self.assertEqual(literal_prefix("command/a|b"), "")
+        self.assertEqual(literal_prefix("(?i)command"), "")
+
+    def test_registry_matches_regex_scan(self):
+        """
+        Tests the indexed registry gives the same results, in the same order, as
+        matching every registered path.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            patterns = [
+                "command/.*",
+                "command/elements/.*",
+                "command/None/.*",
+                "path_updater/.*",
+                "service/(.*)/active",
+                "format/.*",
+                "tree/.*",
+                "command/elements.*",
+                ".*",
+                "command/ab?",
+                "load/.*|save/.*",
+            ]
+            registries = [kernel._registered] + [
+                service._registered for domain, service in kernel.services_active()
+            ]
+            for registered in registries:
+                for pattern in patterns:
+                    match = re.compile(pattern)
+                    expected = [r for r in registered.keys() if match.match(r)]
+                    self.assertEqual(registered.match(pattern), expected)
+            kernel.register("registry_test/zz", 1)
+            kernel.register("registry_test/aa", 2)
+            kernel.unregister("registry_test/zz")
+            kernel.register("registry_test/zz", 3)
+            self.assertEqual(list(kernel.lookup_all("registry_test/.*")), [2, 3])
+        finally:
+            kernel()
+
+    def test_registry_lookup_all_benchmark(self):
+        """
+        Benchmarks lookup_all throughput against a fully booted plugin set.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            size = len(kernel._registered) + sum(
+                len(service._registered)
+                for domain, service in kernel.services_active()
+            )
+            count = 2000
+            t = time.time()
+            for i in range(count):
+                list(kernel.lookup_all("path_updater/.*"))
+            elapsed = time.time() - t
+            print(
+                f"\nlookup_all over {size} registered paths: "
+                f"{count / max(elapsed, 1e-9):.0f} lookups/s"
+            )
+        finally:
+            kernel()
+
+
+def scan_matches(kernel, input_type, command):
+    """
+    Commands matching the command, found by scanning the registry as the console did before dispatch tables.
+    """
+    matches = []
+    for funct, name, regex in kernel.find("command", input_type, ".*"):
+        if funct.regex:
+            if not re.compile(regex).match(command):
+                continue
+        elif regex != command:
+            continue
+        matches.append(funct)
+    return matches
+
+
+class TestConsoleDispatch(unittest.TestCase):
+    def test_console_dispatch_matches_scan(self):
+        """
+        Tests the dispatch tables give the same commands, in the same order, as scanning the registry.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            input_types = set()
+            names = {"element*", "element0", "operation*", "op3", "xyz", "", "0"}
+            for funct, path, name in kernel.find("command", ".*"):
+                parts = path.split("/")
+                input_types.add(parts[1])
+                names.add(name)
+            for input_type in input_types:
+                for name in names:
+                    self.assertEqual(
+                        kernel._console_matches(input_type, name),
+                        scan_matches(kernel, input_type, name),
+                    )
+        finally:
+            kernel()
+
+    def test_console_dispatch_register(self):
+        """
+        Tests commands are dispatched as soon as they are registered, and not once unregistered.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            called = []
+            kernel.console("echo ready\n")
+
+            @kernel.console_command("dispatch_test")
+            def dispatch_test(**kwargs):
+                called.append(1)
+
+            kernel.console("dispatch_test\n")
+            self.assertEqual(len(called), 1)
+            kernel.unregister("command/None/dispatch_test")
+            kernel.console("dispatch_test\n")
+            self.assertEqual(len(called), 1)
+            self.assertNotIn(dispatch_test, kernel._console_matches("None", "dispatch_test"))
+        finally:
+            kernel()
+
+    def test_console_dispatch_benchmark(self):
+        """
+        Benchmarks chained commands dispatched through the tables and by scanning the registry.
+        """
+        # Hatching adds an operation, slowing down planning, it goes last.
+        commands = (
+            "plan clear copy preprocess validate blob",
+            "element* list",
+            "element* hatch",
+        )
+        count = 100
+        rates = {}
+        for mode in ("scan", "table"):
+            kernel = bootstrap.bootstrap()
+            try:
+                # Without elements, the chains are mostly dispatch.
+                kernel.console(".element* delete\n")
+                matches = kernel._console_matches
+                if mode == "scan":
+
+                    def matches(input_type, command):
+                        return scan_matches(kernel, input_type, command)
+
+                ops = list(kernel.elements.ops())
+                with mock.patch.object(kernel, "_console_matches", matches):
+                    for command in commands:
+                        t = time.time()
+                        for i in range(count):
+                            kernel.console(f".{command}\n")
+                        rates[mode, command] = count / (time.time() - t)
+                # Remove the hatch operations, the operations are persistent.
+                for op in list(kernel.elements.ops()):
+                    if op not in ops:
+                        op.remove_node()
+            finally:
+                kernel()
+        for command in commands:
+            print(
+                f"{command}: scan {rates['scan', command]:.0f} commands/s, "
+                f"table {rates['table', command]:.0f} commands/s"
+            )
@@ -0,0 +1,186 @@
+import socket
+import threading
+import time
+import unittest
+from test import bootstrap
+
+
+def free_port(kind=socket.SOCK_STREAM):
+    s = socket.socket(socket.AF_INET, kind)
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+class Received:
+    """
+    Recv channel watcher collecting the data, optionally slow.
+    """
+
+    def __init__(self, delay=0.0):
+        self.data = bytearray()
+        self.delay = delay
+        self.event = threading.Event()
+        self.expected = 0
+
+    def __call__(self, data):
+        if self.delay:
+            time.sleep(self.delay)
+        self.data += data
+        if len(self.data) >= self.expected:
+            self.event.set()
+
+    def wait(self, count, timeout=10):
+        self.expected = count
+        self.event.clear()
+        if len(self.data) >= count:
+            return True
+        return self.event.wait(timeout)
+
+
+def client(port):
+    # The threaded server starts listening on its own thread.
+    for i in range(100):
+        try:
+            return socket.create_connection(("127.0.0.1", port), timeout=10)
+        except ConnectionRefusedError:
+            time.sleep(0.02)
+    return socket.create_connection(("127.0.0.1", port), timeout=10)
+
+
+def receive(connection, count):
+    data = b""
+    while len(data) < count:
+        chunk = connection.recv(count - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class TestNetworkServers(unittest.TestCase):
+    def test_tcp_server(self):
+        """
+        Test the data of several connections reaching the recv channel, and replies on the send channel reaching
+        every connection.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            root = kernel.root
+            port = free_port()
+            root.open_as("module/TCPServer", "test-tcp", port=port)
+            received = Received()
+            root.channel("test-tcp/recv", pure=True).watch(received)
+            first = client(port)
+            second = client(port)
+            first.sendall(b"hello ")
+            self.assertTrue(received.wait(6))
+            second.sendall(b"world")
+            self.assertTrue(received.wait(11))
+            self.assertEqual(bytes(received.data), b"hello world")
+            # Wait for both connections to watch the send channel.
+            send = root.channel("test-tcp/send", pure=True)
+            for i in range(100):
+                if len(send.watchers) == 2:
+                    break
+                time.sleep(0.01)
+            send(b"reply")
+            self.assertEqual(receive(first, 5), b"reply")
+            self.assertEqual(receive(second, 5), b"reply")
+            first.close()
+            second.close()
+            root.close("test-tcp")
+        finally:
+            kernel()
+
+    def test_udp_server(self):
+        """
+        Test packets reaching the recv channel and replies going to the last sender.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            root = kernel.root
+            port = free_port(socket.SOCK_DGRAM)
+            root.open_as("module/UDPServer", "test-udp", port=port)
+            received = Received()
+            root.channel("test-udp/recv").watch(received)
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sender.settimeout(10)
+            sender.sendto(b"packet", ("127.0.0.1", port))
+            self.assertTrue(received.wait(6))
+            self.assertEqual(bytes(received.data), b"packet")
+            root.channel("test-udp/send")(b"reply")
+            self.assertEqual(sender.recvfrom(1024)[0], b"reply")
+            sender.close()
+            root.close("test-udp")
+        finally:
+            kernel()
+
+    def test_tcp_server_backpressure(self):
+        """
+        Test that a slow recv channel holds reading, rather than the server buffering everything sent.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            root = kernel.root
+            port = free_port()
+            server = root.open_as(
+                "module/TCPServer",
+                "test-slow",
+                port=port,
+                read_size=1024,
+                recv_limit=4096,
+            )
+            received = Received(delay=0.01)
+            root.channel("test-slow/recv", pure=True).watch(received)
+            payload = bytes(range(256)) * 256
+            connection = client(port)
+            highest = 0
+
+            def sender():
+                connection.sendall(payload)
+
+            thread = threading.Thread(target=sender, daemon=True)
+            thread.start()
+            while not received.wait(len(payload), timeout=0.001):
+                highest = max(highest, len(server.feeder))
+            thread.join(10)
+            self.assertEqual(bytes(received.data), payload)
+            self.assertLessEqual(highest, 4096 + 1024)
+            connection.close()
+            root.close("test-slow")
+        finally:
+            kernel()
+
+    def test_tcp_server_speed(self):
+        """
+        Test the loopback throughput of the server against the threaded server.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            root = kernel.root
+            payload = b"\x55" * 0x100000
+            rates = {}
+            for module in ("module/ThreadedTCPServer", "module/TCPServer"):
+                port = free_port()
+                name = module.split("/")[1].lower()
+                root.open_as(module, name, port=port)
+                received = Received()
+                root.channel(f"{name}/recv", pure=True).watch(received)
+                # Packet logging is watched, as with the Ruida bridge.
+                root.channel(f"data-tcp-{port}").watch(lambda e: None)
+                connection = client(port)
+                t = time.time()
+                for i in range(32):
+                    connection.sendall(payload)
+                self.assertTrue(received.wait(32 * len(payload), timeout=60))
+                rates[module] = 32 / (time.time() - t)
+                connection.close()
+                root.close(name)
+            print(
+                f"tcp loopback: threaded {rates['module/ThreadedTCPServer']:.1f}MB/s, "
+                f"async {rates['module/TCPServer']:.1f}MB/s"
+            )
+        finally:
+            kernel()
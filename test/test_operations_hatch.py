@@ -1,6 +1,8 @@
 import unittest
 from test import bootstrap
 
+import numpy as np
+
 from meerk40t.core.cutcode.cutcode import CutCode
 from meerk40t.core.cutplan import CutPlan
 from meerk40t.core.node.effect_hatch import HatchEffectNode
@@ -55,3 +57,38 @@ class TestHatch(unittest.TestCase):
             self.assertEqual(len(g), 0)
         finally:
             kernel()
+
+    def test_operation_hatch_cache(self):
+        """
+        Test that the hatch geometry is cached until the hatch or its children change.
+
+        :return:
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            path = Path("M 0,0 L 10000,10000 L 0,20000 Z")
+            hatch = HatchEffectNode()
+            node = PathNode(path)
+            hatch.add_node(node)
+            g = hatch.as_geometry()
+            self.assertTrue(len(g))
+            cached = hatch._hatch_geometry
+            g2 = hatch.as_geometry()
+            self.assertIs(cached, hatch._hatch_geometry)
+            self.assertTrue(
+                np.array_equal(
+                    g.segments[: g.index], g2.segments[: g2.index], equal_nan=True
+                )
+            )
+
+            node.matrix.post_scale(2, 2)
+            node.modified()
+            self.assertIsNone(hatch._hatch_geometry)
+            g3 = hatch.as_geometry()
+            self.assertGreater(len(g3), len(g))
+
+            hatch.distance = "2mm"
+            g4 = hatch.as_geometry()
+            self.assertLess(len(g4), len(g3))
+        finally:
+            kernel()
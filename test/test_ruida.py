@@ -17,3 +17,125 @@ class TestRuida(unittest.TestCase):
         self.assertEqual(keys[b"K\x12\x96p"], 0x11)
         self.assertEqual(keys[b"-x\xf4\n"], 0x77)
         self.assertEqual(keys[b"\xb6\xefk\x91"], 0xEE)
+
+    def test_swizzle_codec(self):
+        """
+        Test that the swizzle tables and histogram match the per byte algorithms.
+        """
+        from meerk40t.ruida.rdjob import (
+            decode_bytes,
+            determine_magic_via_histogram,
+            encode_bytes,
+            swizzle_byte,
+            unswizzle_byte,
+        )
+
+        data = bytes(range(256)) * 4
+        for magic in (0x11, 0x38, 0x88):
+            encoded = encode_bytes(data, magic=magic)
+            self.assertEqual(encoded, bytes([swizzle_byte(b, magic) for b in data]))
+            self.assertEqual(
+                decode_bytes(encoded, magic=magic),
+                bytes([unswizzle_byte(b, magic) for b in encoded]),
+            )
+            self.assertEqual(decode_bytes(bytearray(encoded), magic=magic), data)
+
+        for blob in (b"\x01\x02\x02\x02\x03\x03\x03\x03", b"\x05", b"\x00\x07\x07"):
+            histogram = [0] * 256
+            prev = -1
+            for d in blob:
+                histogram[d] += 5 if prev == d else 1
+                prev = d
+            magic = histogram.index(max(histogram)) - 1
+            self.assertEqual(determine_magic_via_histogram(blob), magic)
+        self.assertIsNone(determine_magic_via_histogram(b""))
+        self.assertEqual(
+            determine_magic_via_histogram(encode_bytes(rd_commands(), 0x38)), 0x38
+        )
+
+    def test_stream_parser(self):
+        """
+        Test that streamed commands match commands parsed from the whole blob, however the data
+        is split.
+        """
+        from unittest import mock
+
+        from meerk40t.ruida.rdjob import RDJob, RDParser, encode_bytes, parse_commands
+
+        data = rd_commands()
+        expected = list(parse_commands(data))
+        self.assertEqual(b"".join(expected), data)
+        self.assertTrue(all(c[0] >= 0x80 for c in expected))
+        swizzled = encode_bytes(data, magic=0x88)
+        for chunk_size in (1, 3, 7, 1000, len(swizzled)):
+            parser = RDParser(0x88)
+            commands = list()
+            for i in range(0, len(swizzled), chunk_size):
+                commands.extend(parser.feed(memoryview(swizzled)[i : i + chunk_size]))
+            commands.extend(parser.flush())
+            self.assertEqual(commands, expected)
+
+        job = RDJob()
+        with mock.patch("meerk40t.ruida.rdjob.RD_BLOB_CHUNK_SIZE", 100):
+            job.write_blob(swizzled)
+        self.assertEqual(job.magic, 0x88)
+        self.assertEqual(job.get_contents(swizzled=False), data)
+        count = 0
+        while not job.execute(None):
+            count += 1
+            if count == 10:
+                # Executed commands are no longer part of the job.
+                pending = b"".join(expected[count:])
+                self.assertEqual(job.get_contents(swizzled=False), pending)
+                self.assertEqual(job.file_sum(), sum(pending))
+        self.assertEqual(count + 1, len(expected))
+
+    def test_codec_speed(self):
+        """
+        Test the throughput of encode, decode and parse.
+        """
+        import time
+
+        from meerk40t.ruida.rdjob import (
+            RDParser,
+            decode_bytes,
+            determine_magic_via_histogram,
+            encode_bytes,
+        )
+
+        data = rd_commands() * 200
+        mb = len(data) / 1e6
+        t = time.time()
+        swizzled = encode_bytes(data, magic=0x88)
+        encode = time.time() - t
+        t = time.time()
+        magic = determine_magic_via_histogram(swizzled)
+        decode_bytes(swizzled, magic)
+        decode = time.time() - t
+        t = time.time()
+        parser = RDParser(magic)
+        count = 0
+        for i in range(0, len(swizzled), 0x100000):
+            for command in parser.feed(swizzled[i : i + 0x100000]):
+                count += 1
+        parse = time.time() - t
+        print(
+            f"{mb:.1f}MB: encode {mb / encode:.0f}MB/s, decode {mb / decode:.0f}MB/s, "
+            f"parse {mb / parse:.0f}MB/s ({count} commands)"
+        )
+
+
+def rd_commands():
+    from meerk40t.ruida.rdjob import RDJob
+
+    job = RDJob()
+    job.speed_laser_1(100)
+    job.min_power_1(10)
+    job.max_power_1(50)
+    for i in range(2000):
+        job.move_abs_xy(i * 100, i * 50)
+        job.cut_rel_xy(i % 100, -(i % 50))
+        job.cut_rel_x(i % 30)
+        job.cut_abs_xy(i * 200, i * 10)
+    job.end_of_file()
+    return job.get_contents(swizzled=False)
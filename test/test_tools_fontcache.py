@@ -0,0 +1,106 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from meerk40t.tools.fontcache import FontCache, GlyphOutline
+from meerk40t.tools.jhfparser import JhfFont
+from meerk40t.tools.shxparser import ShxFont
+
+JHF_DATA = """   12  9MWOMOV RUMUV ROQUQ
+   13  7JZRFRN RNVRZVV
+   14  4NVRMRVUS
+"""
+
+SHX_GLYPHS = {
+    # pen down, vectors, octant arc, push, pen up, pop and xy displacement.
+    65: bytes(
+        [0x01, 0x14, 0x10, 0x0A, 0x02, 0x12, 0x05, 0x02, 0x2C, 0x01, 0x18, 0x06]
+        + [0x08, 3, 0xFE, 0x00]
+    ),
+    # divide and multiply vector.
+    66: bytes([0x02, 0x14, 0x01, 0x03, 2, 0x24, 0x04, 2, 0x1C, 0x02, 0x30, 0x00]),
+    # subshape.
+    67: bytes([0x01, 0x07, 65, 0x02, 0x20, 0x00]),
+}
+
+
+def write_shx(filename):
+    name = b"TEST\x00" + bytes([8, 2, 0])
+    table = struct.pack("<HH", 0, len(name))
+    body = name
+    for index, data in SHX_GLYPHS.items():
+        table += struct.pack("<HH", index, len(data))
+        body += data
+    header = b"AutoCAD-86 shapes 1.0\n\x1a\x00"
+    header += struct.pack("<HHH", 65, 67, len(SHX_GLYPHS) + 1)
+    with open(filename, "wb") as f:
+        f.write(header + table + body)
+
+
+def render(font, text, font_size=12.0):
+    outline = GlyphOutline()
+    font.render(outline, text, True, font_size)
+    return outline.commands
+
+
+class TestFontCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.jhf = os.path.join(self.directory.name, "test.jhf")
+        with open(self.jhf, "w") as f:
+            f.write(JHF_DATA)
+        self.shx = os.path.join(self.directory.name, "test.shx")
+        write_shx(self.shx)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fontcache_reuse(self):
+        """
+        Test that fonts are parsed once, reparsed when the file changes and evicted in
+        least recently used order.
+        """
+        cache = FontCache(size=2)
+        font = cache.get(JhfFont, self.jhf)
+        self.assertIs(font, cache.get(JhfFont, self.jhf))
+        self.assertIsNot(font, cache.get(ShxFont, self.shx))
+
+        info = os.stat(self.jhf)
+        os.utime(self.jhf, ns=(info.st_atime_ns, info.st_mtime_ns + 1000000000))
+        changed = cache.get(JhfFont, self.jhf)
+        self.assertIsNot(font, changed)
+        self.assertIs(changed, cache.get(JhfFont, self.jhf))
+        self.assertEqual(len(cache), 2)
+
+        other = os.path.join(self.directory.name, "other.jhf")
+        with open(other, "w") as f:
+            f.write(JHF_DATA)
+        cache.get(JhfFont, self.jhf)
+        cache.get(JhfFont, other)
+        self.assertEqual(len(cache), 2)
+        self.assertIs(changed, cache.get(JhfFont, self.jhf))
+
+    def test_fontcache_memoized_render(self):
+        """
+        Test that memoized glyph outlines render identically to freshly parsed fonts.
+        """
+        for fontclass, filename, text in (
+            (JhfFont, self.jhf, ' !"!  "'),
+            (ShxFont, self.shx, "ABCABBCA"),
+        ):
+            cache = FontCache()
+            font = cache.get(fontclass, filename)
+            for font_size in (12.0, 20.0, 12.0):
+                for t in (text, text[::-1], text):
+                    expected = render(fontclass(filename), t, font_size)
+                    self.assertTrue(expected)
+                    results = render(font, t, font_size)
+                    self.assertEqual(len(expected), len(results))
+                    for (c0, args0), (c1, args1) in zip(expected, results):
+                        self.assertEqual(c0, c1)
+                        for v0, v1 in zip(args0, args1):
+                            if v0 is None:
+                                self.assertIsNone(v1)
+                            else:
+                                self.assertAlmostEqual(v0, v1)
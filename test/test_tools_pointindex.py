@@ -0,0 +1,184 @@
+import random
+import time
+import unittest
+from math import hypot
+from test import bootstrap
+
+from meerk40t.tools.pointindex import PointIndex
+
+
+def random_owners(count, seed=1, size=1e6):
+    r = random.Random(seed)
+    owners = {}
+    for i in range(count):
+        x = r.uniform(0, size)
+        y = r.uniform(0, size)
+        owners[i] = [
+            (x + r.uniform(0, 5000), y + r.uniform(0, 5000), r.randint(0, 5))
+            for _ in range(9)
+        ]
+    return owners
+
+
+def brute_within(owners, emphasized, x, y, distance, skip_emphasized):
+    return sorted(
+        pt
+        for owner, pts in owners.items()
+        if not (skip_emphasized and owner in emphasized)
+        for pt in pts
+        if abs(pt[0] - x) <= distance and abs(pt[1] - y) <= distance
+    )
+
+
+def brute_nearest(owners, emphasized, x, y, skip_emphasized):
+    return min(
+        hypot(pt[0] - x, pt[1] - y)
+        for owner, pts in owners.items()
+        if not (skip_emphasized and owner in emphasized)
+        for pt in pts
+    )
+
+
+class TestPointIndex(unittest.TestCase):
+    def test_pointindex_queries(self):
+        """
+        Test the box and nearest queries against a scan of every point.
+        """
+        owners = random_owners(1000)
+        emphasized = set(range(0, 1000, 7))
+        index = PointIndex(1000)
+        for owner, pts in owners.items():
+            index.update(owner, pts, emphasized=owner in emphasized)
+        self.assertEqual(len(index), 9000)
+        r = random.Random(2)
+        for i in range(200):
+            x = r.uniform(-1e5, 1.1e6)
+            y = r.uniform(-1e5, 1.1e6)
+            distance = r.choice((10, 500, 2000, 50000))
+            skip = bool(i % 2)
+            self.assertEqual(
+                sorted(index.within(x, y, distance, skip_emphasized=skip)),
+                brute_within(owners, emphasized, x, y, distance, skip),
+            )
+            pt = index.nearest(x, y, skip_emphasized=skip)
+            self.assertAlmostEqual(
+                hypot(pt[0] - x, pt[1] - y),
+                brute_nearest(owners, emphasized, x, y, skip),
+            )
+        self.assertIsNone(index.nearest(-1e6, -1e6, distance=1000))
+        self.assertIsNone(PointIndex().nearest(0, 0))
+
+    def test_pointindex_incremental(self):
+        """
+        Test updating, translating, scaling and removing the points of single owners.
+        """
+        owners = random_owners(300)
+        emphasized = set()
+        index = PointIndex(2000)
+        for owner, pts in owners.items():
+            index.update(owner, pts)
+        r = random.Random(3)
+        for i in range(300):
+            owner = r.randrange(300)
+            action = i % 5
+            if action == 0:
+                dx, dy = r.uniform(-1e4, 1e4), r.uniform(-1e4, 1e4)
+                index.translate(owner, dx, dy)
+                owners[owner] = [(x + dx, y + dy, t) for x, y, t in owners[owner]]
+            elif action == 1:
+                sx, sy = r.uniform(-2, 2), r.uniform(0.5, 2)
+                ox, oy = r.uniform(0, 1e6), r.uniform(0, 1e6)
+                index.scale(owner, sx, sy, ox, oy)
+                owners[owner] = [
+                    (ox + sx * (x - ox), oy + sy * (y - oy), t)
+                    for x, y, t in owners[owner]
+                ]
+            elif action == 2:
+                pts = random_owners(1, seed=i)[0]
+                index.update(owner, pts)
+                owners[owner] = pts
+            elif action == 3:
+                index.remove(owner)
+                owners[owner] = []
+                emphasized.discard(owner)
+            else:
+                index.set_emphasized(owner, True)
+                emphasized.add(owner)
+        self.assertEqual(len(index), sum(len(pts) for pts in owners.values()))
+        for i in range(100):
+            x = r.uniform(0, 1e6)
+            y = r.uniform(0, 1e6)
+            for distance in (1000, 30000):
+                for pt, expected in zip(
+                    sorted(index.within(x, y, distance, skip_emphasized=True)),
+                    brute_within(owners, emphasized, x, y, distance, True),
+                ):
+                    self.assertAlmostEqual(pt[0], expected[0])
+                    self.assertAlmostEqual(pt[1], expected[1])
+
+    def test_pointindex_nodes(self):
+        """
+        Test translating and scaling the indexed points of nodes as the nodes are translated and scaled.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("rect 1cm 1cm 2cm 3cm\n")
+            kernel.console("circle 5cm 5cm 1cm\n")
+            nodes = list(kernel.elements.elems())
+            index = PointIndex(1000)
+
+            def points(node):
+                return sorted((pt[0], pt[1], pt[2]) for pt in node.points)
+
+            for node in nodes:
+                index.update(node, points(node))
+            for node in nodes:
+                node.matrix.post_translate(1500, -700)
+                node.translated(1500, -700)
+                index.translate(node, 1500, -700)
+                node.matrix.post_scale(2, 0.5, 1000, 1000)
+                node.scaled(2, 0.5, 1000, 1000)
+                index.scale(node, 2, 0.5, 1000, 1000)
+                for pt, expected in zip(sorted(index.points(node)), points(node)):
+                    self.assertAlmostEqual(pt[0], expected[0], delta=1e-6)
+                    self.assertAlmostEqual(pt[1], expected[1], delta=1e-6)
+        finally:
+            kernel()
+
+    def test_pointindex_speed(self):
+        """
+        Test that queries of an index of 100k points only look at the points near the
+        queried position, and time building and querying the index.
+        """
+        owners = random_owners(11112)
+        t = time.time()
+        index = PointIndex(1000)
+        for owner, pts in owners.items():
+            index.update(owner, pts)
+        built = time.time() - t
+        r = random.Random(4)
+        queries = [(r.uniform(0, 1e6), r.uniform(0, 1e6)) for _ in range(200)]
+        t = time.time()
+        visited = 0
+        for x, y in queries:
+            index.within(x, y, 500)
+            visited = max(visited, index.visited)
+        within = (time.time() - t) / len(queries)
+        # A scan would look at all 100k points, the query box covers at most 4 cells.
+        self.assertLess(visited, 100)
+        t = time.time()
+        visited = 0
+        for x, y in queries:
+            index.nearest(x, y)
+            visited = max(visited, index.visited)
+        nearest = (time.time() - t) / len(queries)
+        self.assertLess(visited, 100)
+        t = time.time()
+        for owner in range(1000):
+            index.translate(owner, 100, 100)
+        translated = (time.time() - t) / 1000
+        print(
+            f"{len(index)} points indexed in {built:.3f}s, "
+            f"within {within * 1000:.4f}ms, nearest {nearest * 1000:.4f}ms, "
+            f"translate {translated * 1000:.4f}ms"
+        )
@@ -1,10 +1,12 @@
+import random
 import time
 import unittest
+from itertools import product
 
 import numpy as np
 from PIL import Image, ImageDraw
 
-from meerk40t.tools.rasterplotter import RasterPlotter
+from meerk40t.tools.rasterplotter import NumpyRasterPlotter, RasterPlotter
 
 
 class TestRasterPlotter(unittest.TestCase):
@@ -27,3 +29,62 @@ class TestRasterPlotter(unittest.TestCase):
             i += 0
         print(i)
         print(f"\nTime taken to finish process {time.time() - t}\n")
+
+    def test_rasterplotter_numpy_matches(self):
+        """
+        Tests that the NumpyRasterPlotter yields the same plot as the RasterPlotter for every
+        traversal direction, bidirectional and overscan combination.
+
+        :return:
+        """
+        random.seed(4)
+        for i in range(8):
+            width = random.randint(1, 30)
+            height = random.randint(1, 30)
+            image = Image.new("L", (width, height), "white")
+            draw = ImageDraw.Draw(image)
+            for j in range(4):
+                x = random.randint(0, width)
+                y = random.randint(0, height)
+                draw.ellipse(
+                    (x, y, x + random.randint(1, width), y + random.randint(1, height)),
+                    random.choice((0, 0, 128, 200)),
+                )
+            if i % 4 == 0:
+                image = image.convert("1")
+            for inverted in (False, True):
+                if inverted:
+                    skip_pixel = 255
+
+                    def image_filter(pixel):
+                        return pixel / 255.0
+
+                else:
+                    skip_pixel = 0
+
+                    def image_filter(pixel):
+                        return (255 - pixel) / 255.0
+
+                for horizontal, start_y, start_x, bidirectional, overscan in product(
+                    (True, False), (True, False), (True, False), (True, False), (0, 3)
+                ):
+                    settings = dict(
+                        horizontal=horizontal,
+                        start_minimum_y=start_y,
+                        start_minimum_x=start_x,
+                        bidirectional=bidirectional,
+                        skip_pixel=skip_pixel,
+                        overscan=overscan,
+                        offset_x=5,
+                        offset_y=7,
+                        step_x=2,
+                        step_y=3,
+                        filter=image_filter,
+                    )
+                    plotter = RasterPlotter(image.load(), width, height, **settings)
+                    numpy_plotter = NumpyRasterPlotter(image, width, height, **settings)
+                    self.assertEqual(list(plotter.plot()), list(numpy_plotter.plot()))
+                    self.assertEqual(
+                        plotter.final_position_in_scene(),
+                        numpy_plotter.final_position_in_scene(),
+                    )